@@ -0,0 +1,134 @@
+"""
+Measures the bytes request and response compression save against the CPU time
+it costs, for firmware logs sent as text data, log file uploads and large list
+responses, using an in-process FakeTransport that accepts compressed bodies.
+
+    python benchmarks/compression.py
+    python benchmarks/compression.py --bandwidth 2 --text-kb 256
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialmfg as serial  # noqa: E402
+from serialmfg.testing import FakeSerialAPI, FakeTransport  # noqa: E402
+from serialmfg.utils import compression  # noqa: E402
+
+LIST_ROWS = 5000
+
+
+def _firmware_log(size, seed=0):
+    # Timestamped lines with repeated structure and varying values, like a flash tool's output
+    rng = random.Random(seed)
+    lines, length, i = [], 0, 0
+    while length < size:
+        line = (f"2024-05-01T12:{i // 600 % 60:02d}:{i // 10 % 60:02d}.{i % 10}00 [flash] "
+                f"block {i:05d} addr=0x{0x08000000 + i * 256:08x} crc=0x{rng.getrandbits(32):08x} "
+                f"{'ok' if rng.random() > 0.001 else 'RETRY'} {rng.uniform(1.1, 1.9):.3f}ms\n")
+        lines.append(line)
+        length += len(line)
+        i += 1
+    return "".join(lines)[:size]
+
+
+def configurations():
+    yield "none", None, None
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", "gzip", level
+    if compression.zstandard is not None:
+        for level in (1, 3, 9):
+            yield f"zstd-{level}", "zstd", level
+
+
+def run(name, codec, level, args, log_path, log_text):
+    """
+    Returns:
+    - A dictionary per scenario of bytes on the wire, compression CPU seconds and
+      mean wall time per operation
+    """
+    transport = FakeTransport(FakeSerialAPI(), compress_responses=codec is not None)
+    serial.set_transport(transport)
+    serial.Datasets.invalidate_cache()
+    serial.ComponentInstances.invalidate_cache()
+    serial.set_compression(codec, level=level, files=True)
+    transport.api.add_component_instance("SN-1", "Widget")
+    for i in range(LIST_ROWS):
+        transport.api.add_component_instance(f"UNIT-{i:05d}", "Widget")
+
+    def text():
+        entry = serial.ProcessEntries.create("process-1", component_instance_identifier="SN-1")
+        for i in range(args.text_points):
+            entry.add_text(f"Firmware log {i}", log_text)
+        entry.submit()
+
+    def upload():
+        entry = serial.ProcessEntries.create("process-1", component_instance_identifier="SN-1")
+        entry.add_file("Flash log", log_path)
+        entry.submit()
+
+    def listing():
+        serial.ComponentInstances.list({})
+
+    results = {}
+    for scenario, operation in (("text", text), ("upload", upload), (f"list/{LIST_ROWS}", listing)):
+        operation()  # warm up caches
+        transport.bytes_received = transport.bytes_sent = 0
+        serial.get_compression_stats().reset()
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            operation()
+        elapsed = time.perf_counter() - started
+        stats = serial.get_compression_stats().stats()
+        wire = (transport.bytes_received + transport.bytes_sent) / args.iterations
+        results[scenario] = {
+            "upload_bytes": transport.bytes_received / args.iterations,
+            "download_bytes": transport.bytes_sent / args.iterations,
+            "compress_ms": stats["seconds"] / args.iterations * 1000,
+            "wall_ms": elapsed / args.iterations * 1000,
+            # Time the bytes would take on a link of the given bandwidth
+            "link_ms": wire * 8 / (args.bandwidth * 1e6) * 1000,
+        }
+    serial.set_compression(None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--text-kb", type=int, default=64, help="Size of each firmware log text data point")
+    parser.add_argument("--text-points", type=int, default=4, help="Firmware logs per process entry")
+    parser.add_argument("--file-mb", type=float, default=4, help="Size of the uploaded log file")
+    parser.add_argument("--bandwidth", type=float, default=5.0,
+                        help="Link speed in Mbit/s used to estimate transfer time (default: 5, a metered LTE link)")
+    args = parser.parse_args()
+
+    serial.set_api_key("benchmark-key")
+    serial.set_base_url(FakeTransport.url)
+    log_text = _firmware_log(args.text_kb * 1024)
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "flash.log")
+        with open(log_path, "w") as f:
+            f.write(_firmware_log(int(args.file_mb * 1024 ** 2), seed=1))
+        runs = {name: run(name, codec, level, args, log_path, log_text) for name, codec, level in configurations()}
+    serial.set_transport(None)
+
+    print(f"{'scenario':<12} {'codec':<8} {'up KB':>9} {'down KB':>9} {'saved':>7} "
+          f"{'cpu ms':>8} {'wall ms':>8} {f'@{args.bandwidth:g}Mbit ms':>13}")
+    for scenario in runs["none"]:
+        baseline = runs["none"][scenario]
+        baseline_bytes = baseline["upload_bytes"] + baseline["download_bytes"]
+        for name, results in runs.items():
+            result = results[scenario]
+            saved = 1 - (result["upload_bytes"] + result["download_bytes"]) / baseline_bytes
+            print(f"{scenario:<12} {name:<8} {result['upload_bytes'] / 1024:9.1f} "
+                  f"{result['download_bytes'] / 1024:9.1f} {saved:7.1%} {result['compress_ms']:8.2f} "
+                  f"{result['wall_ms']:8.2f} {result['link_ms']:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures how long importing the library takes in a fresh interpreter, using
+python -X importtime, for a bare `import serialmfg` and for first use of the
+sync and asyncio clients. Modules the interpreter imports at startup are left
+out. Reports the median over several runs and the modules that took longest.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 20 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATEMENTS = {
+    "import serialmfg": "import serialmfg",
+    "serialmfg.ProcessEntries": "import serialmfg; serialmfg.ProcessEntries",
+    "serialmfg.aio": "import serialmfg.aio",
+}
+
+
+def import_times(statement):
+    """
+    Runs the statement in a fresh interpreter
+
+    Returns:
+    - A dictionary of module name to a tuple of its cumulative import time in
+      microseconds and whether it was imported directly by the statement, for
+      every module the statement imported
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True,
+                            env=env, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, indented by nesting depth
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        times[name.strip()] = (int(cumulative), name[1:] == name.strip())
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list")
+    args = parser.parse_args()
+    # Modules the interpreter imports at startup (site, .pth files) are not the library's
+    startup = set(import_times("pass"))
+    for label, statement in STATEMENTS.items():
+        try:
+            runs = [{name: time for name, time in import_times(statement).items() if name not in startup}
+                    for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{label}: failed ({e.stderr.strip().splitlines()[-1]})\n")
+            continue
+        totals = [sum(cumulative for cumulative, top_level in run.values() if top_level) for run in runs]
+        print(f"{label}: median {statistics.median(totals) / 1000:.1f} ms, {len(runs[0])} modules")
+        medians = {name: statistics.median(run.get(name, (0, False))[0] for run in runs) for name in runs[0]}
+        for name in sorted(medians, key=medians.get, reverse=True)[:args.top]:
+            print(f"  {medians[name] / 1000:8.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
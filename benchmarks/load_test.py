@@ -0,0 +1,435 @@
+"""
+Simulates many test stations driving one gateway host, to soak test the library.
+Each station creates a process entry, adds a mix of data and submits it on a
+fixed cadence. Every report interval the run prints entries/sec, cycle latency,
+errors, and the process's threads, open file descriptors and RSS, so leaks and
+thread churn show up as growth over time.
+
+By default requests go over HTTP to a MockSerialServer running in a separate
+process, so the threads, descriptors and memory reported are the library's own.
+--transport fake answers them in-process instead.
+
+    python benchmarks/load_test.py --stations 30 --duration 8h --cadence 30
+    python benchmarks/load_test.py --stations 10 --duration 5m --cadence 1 --mix number=50,file=2 --batch
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialmfg as serial  # noqa: E402
+from serialmfg.testing import FakeSerialAPI, FakeTransport, MockSerialServer  # noqa: E402
+
+DATA_KINDS = ("text", "number", "boolean", "file", "link")
+UNITS_PER_STATION = 20
+RESERVOIR_SIZE = 100000
+
+
+class _SlowAPI(FakeSerialAPI):
+    """A FakeSerialAPI that takes a fixed time to answer each request"""
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def handle(self, method, path, params=None, body=None):
+        time.sleep(self.latency)
+        return super().handle(method, path, params, body)
+
+
+def _serve(urls, stop, latency, trim_interval):
+    # Runs in the server process
+    api = _SlowAPI(latency) if latency else FakeSerialAPI()
+    api.add_component("Widget")
+    api.add_component("Child")
+    with MockSerialServer(api) as server:
+        urls.put(server.url)
+        while not stop.wait(trim_interval):
+            api.forget_history()
+
+
+def parse_duration(value):
+    """
+    Args:
+    - value: Seconds, or a number followed by s, m or h (e.g. 90s, 30m, 8h)
+
+    Returns:
+    - The duration in seconds
+    """
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def parse_mix(value):
+    """
+    Args:
+    - value: Comma separated kind=count pairs, e.g. text=10,number=40,file=1
+
+    Returns:
+    - A dictionary of data kind to data points added per entry
+    """
+    mix = {}
+    for pair in value.split(","):
+        kind, _, count = pair.partition("=")
+        if kind not in DATA_KINDS:
+            raise argparse.ArgumentTypeError(f"Unknown data kind {kind}, expected one of {', '.join(DATA_KINDS)}")
+        mix[kind] = int(count)
+    return mix
+
+
+def open_fds():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            pass
+    return None
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS where /proc is not available
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))]
+
+
+class LoadStats:
+    """
+    Thread-safe cycle counters, shared by every station
+    """
+    def __init__(self, seed=None):
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._interval = []
+        self.reservoir = []
+        self.completed = 0
+        self.errors = {}
+        self.overruns = 0
+        self._pending = []
+
+    def record(self, seconds):
+        with self._lock:
+            self.completed += 1
+            self._interval.append(seconds)
+            # Reservoir sampling keeps overall percentiles in bounded memory
+            if len(self.reservoir) < RESERVOIR_SIZE:
+                self.reservoir.append(seconds)
+            else:
+                index = self._random.randrange(self.completed)
+                if index < RESERVOIR_SIZE:
+                    self.reservoir[index] = seconds
+
+    def error(self, error):
+        name = type(error).__name__
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def overrun(self):
+        with self._lock:
+            self.overruns += 1
+
+    def add_pending(self, handle, started):
+        with self._lock:
+            self._pending.append((handle, started))
+
+    def collect_pending(self):
+        # Records background submissions that have finished since the last call
+        with self._lock:
+            pending, self._pending = self._pending, []
+        still_pending = []
+        for handle, started in pending:
+            if not handle.done():
+                still_pending.append((handle, started))
+            elif handle.status == handle.DONE:
+                self.record(handle.completed_at - started)
+            else:
+                self.error(handle.exception() if handle.status == handle.FAILED else serial.SubmitCancelled(""))
+        with self._lock:
+            self._pending.extend(still_pending)
+            return len(self._pending)
+
+    def take_interval(self):
+        with self._lock:
+            interval, self._interval = self._interval, []
+            return interval, sum(self.errors.values())
+
+
+class Station(threading.Thread):
+    """
+    A simulated test station, running create -> add_* -> submit every cadence seconds
+    """
+    def __init__(self, index, args, stats, stop, file_path):
+        super().__init__(name=f"station-{index}", daemon=True)
+        self.index = index
+        self.args = args
+        self.stats = stats
+        self.stop = stop
+        self.file_path = file_path
+        self.random = random.Random(args.seed * 1000 + index)
+
+    def setup(self):
+        units = [f"ST{self.index}-U{n}" for n in range(UNITS_PER_STATION)]
+        self.units = units if not self.args.new_units else []
+        self.children = [f"ST{self.index}-C{n}" for n in range(max(1, self.args.mix.get("link", 0)))]
+        serial.ComponentInstances.create_many(self.units, "Widget")
+        if self.args.mix.get("link"):
+            serial.ComponentInstances.create_many(self.children, "Child")
+
+    def cycle(self, number):
+        if self.args.new_units:
+            identifier = f"ST{self.index}-{number}-{self.random.getrandbits(32):08x}"
+            serial.ComponentInstances.create(identifier, "Widget")
+        else:
+            identifier = self.units[number % len(self.units)]
+        entry = serial.ProcessEntries.create("process-1", component_instance_identifier=identifier,
+                                             stream=self.args.stream)
+        mix = self.args.mix
+        for i in range(mix.get("text", 0)):
+            entry.add_text(f"Text {i % 10}", f"value {number}-{i}")
+        for i in range(mix.get("number", 0)):
+            entry.add_number(f"Number {i % 10}", self.random.uniform(0, 10), usl=10, lsl=0, unit="V")
+        for i in range(mix.get("boolean", 0)):
+            entry.add_boolean(f"Check {i % 10}", True, True)
+        for i in range(mix.get("file", 0)):
+            entry.add_file(f"File {i % 10}", self.file_path)
+        for i, child in enumerate(self.children[:mix.get("link", 0)]):
+            entry.add_link(f"Child {i % 10}", child, break_prior_links=True)
+        return entry
+
+    def run(self):
+        cadence = self.args.cadence
+        # Stagger the stations so they do not all start at once
+        next_start = time.monotonic() + self.random.uniform(0, cadence)
+        number = 0
+        while not self.stop.wait(max(0.0, next_start - time.monotonic())):
+            started = time.perf_counter()
+            # Background submissions report when they finished in wall clock time
+            wall_started = time.time()
+            try:
+                entry = self.cycle(number)
+                if self.args.submit_async:
+                    self.stats.add_pending(entry.submit_async(is_pass=True, batch=self.args.batch), wall_started)
+                else:
+                    entry.submit(is_pass=True, batch=self.args.batch)
+                    self.stats.record(time.perf_counter() - started)
+            except Exception as e:
+                self.stats.error(e)
+            number += 1
+            next_start += cadence * self.random.uniform(1 - self.args.jitter, 1 + self.args.jitter)
+            if next_start < time.monotonic():
+                # The cycle took longer than the cadence; start the next one now
+                self.stats.overrun()
+                next_start = time.monotonic()
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:7.1f}" if seconds is not None else "      -"
+
+
+def run(args):
+    """
+    Returns:
+    - A summary dictionary of the run and the list of interval samples
+    """
+    server = None
+    if args.transport == "fake":
+        transport = FakeTransport(_SlowAPI(args.latency) if args.latency else FakeSerialAPI())
+        transport.api.add_component("Widget")
+        transport.api.add_component("Child")
+        serial.set_transport(transport)
+        serial.set_base_url(FakeTransport.url)
+    else:
+        context = multiprocessing.get_context("spawn")
+        urls, server_stop = context.Queue(), context.Event()
+        server = context.Process(target=_serve, args=(urls, server_stop, args.latency, args.interval), daemon=True)
+        server.start()
+        serial.set_base_url(urls.get(timeout=30))
+    serial.set_api_key("load-test-key")
+    if args.workers:
+        serial.set_max_workers(args.workers)
+
+    file_descriptor, file_path = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(file_descriptor, "wb") as f:
+        f.write(os.urandom(args.file_size))
+
+    stats = LoadStats(args.seed)
+    stop = threading.Event()
+    stations = [Station(index, args, stats, stop, file_path) for index in range(args.stations)]
+    for station in stations:
+        station.setup()
+
+    samples = []
+    output = open(args.output, "w") if args.output else None
+    started = time.monotonic()
+    last = started
+    threads_created = 0
+    print(f"{'elapsed':>8} {'entries':>8} {'per sec':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'errors':>6} "
+          f"{'pending':>7} {'threads':>7} {'new':>4} {'fds':>5} {'rss MB':>8}")
+    for station in stations:
+        station.start()
+    seen_threads = {thread.ident for thread in threading.enumerate()}
+    try:
+        while True:
+            remaining = args.duration - (time.monotonic() - started)
+            if remaining <= 0 or stop.wait(min(args.interval, remaining)):
+                break
+            now = time.monotonic()
+            pending = stats.collect_pending()
+            interval, errors = stats.take_interval()
+            threads = {thread.ident for thread in threading.enumerate()}
+            new_threads = len(threads - seen_threads)
+            seen_threads |= threads
+            threads_created += new_threads
+            if args.transport == "fake":
+                transport.api.forget_history()
+            sample = {
+                "elapsed": now - started,
+                "entries": len(interval),
+                "entries_per_second": len(interval) / (now - last),
+                "p50_seconds": _percentile(interval, 50),
+                "p99_seconds": _percentile(interval, 99),
+                "max_seconds": max(interval) if interval else None,
+                "errors": errors,
+                "pending_submissions": pending,
+                "threads": len(threads),
+                "threads_created": new_threads,
+                "open_fds": open_fds(),
+                "rss_bytes": rss_bytes(),
+            }
+            last = now
+            samples.append(sample)
+            if output:
+                output.write(json.dumps(sample) + "\n")
+                output.flush()
+            print(f"{_format_duration(sample['elapsed']):>8} {sample['entries']:8d} "
+                  f"{sample['entries_per_second']:8.2f} {_ms(sample['p50_seconds'])} {_ms(sample['p99_seconds'])} "
+                  f"{_ms(sample['max_seconds'])} {errors:6d} {pending:7d} {sample['threads']:7d} {new_threads:4d} "
+                  f"{sample['open_fds'] if sample['open_fds'] is not None else '-':>5} "
+                  f"{(sample['rss_bytes'] or 0) / 1024 ** 2:8.1f}")
+    except KeyboardInterrupt:
+        print("Interrupted, stopping stations")
+    finally:
+        stop.set()
+        for station in stations:
+            station.join()
+        serial.drain_submissions(args.interval)
+        stats.collect_pending()
+        elapsed = time.monotonic() - started
+        if output:
+            output.close()
+        os.remove(file_path)
+        if server is not None:
+            server_stop.set()
+            server.join(5)
+
+    # Growth is measured from the first sample, once caches and pools have warmed up
+    first, final = (samples[0], samples[-1]) if samples else ({}, {})
+
+    def growth(key):
+        if first.get(key) is None or final.get(key) is None:
+            return None
+        return final[key] - first[key]
+
+    hours = (final.get("elapsed", 0) - first.get("elapsed", 0)) / 3600
+    rss_growth = growth("rss_bytes")
+    summary = {
+        "stations": args.stations,
+        "seconds": elapsed,
+        "entries": stats.completed,
+        "entries_per_second": stats.completed / elapsed if elapsed else 0.0,
+        "p50_seconds": _percentile(stats.reservoir, 50),
+        "p99_seconds": _percentile(stats.reservoir, 99),
+        "p999_seconds": _percentile(stats.reservoir, 99.9),
+        "errors": dict(stats.errors),
+        "overruns": stats.overruns,
+        "threads_created": threads_created,
+        "thread_growth": growth("threads"),
+        "fd_growth": growth("open_fds"),
+        "rss_growth_bytes": rss_growth,
+        "rss_growth_bytes_per_hour": rss_growth / hours if rss_growth is not None and hours else None,
+    }
+    return summary, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stations", type=int, default=30, help="Concurrent stations (default: 30)")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("5m"),
+                        help="How long to run, e.g. 90s, 30m, 8h (default: 5m)")
+    parser.add_argument("--cadence", type=float, default=30.0, help="Seconds between cycles per station (default: 30)")
+    parser.add_argument("--jitter", type=float, default=0.1,
+                        help="Random fraction the cadence varies by, so stations drift apart (default: 0.1)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("text=10,number=40,boolean=10,file=1,link=1"),
+                        help="Data points per entry (default: text=10,number=40,boolean=10,file=1,link=1)")
+    parser.add_argument("--file-size", type=int, default=64 * 1024, help="Bytes per uploaded file (default: 64KB)")
+    parser.add_argument("--new-units", action="store_true", help="Create a new component instance every cycle")
+    parser.add_argument("--batch", action="store_true", help="Submit data points in batches")
+    parser.add_argument("--stream", action="store_true", help="Stream data points as they are added")
+    parser.add_argument("--submit-async", action="store_true", help="Submit in the background with submit_async")
+    parser.add_argument("--workers", type=int, help="Size of the shared worker pool (default: config.max_workers)")
+    parser.add_argument("--transport", choices=("server", "fake"), default="server",
+                        help="HTTP to a mock server in another process, or an in-process fake (default: server)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stand-in API takes per request")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between reports (default: 60)")
+    parser.add_argument("--output", help="Write each report as a JSON line to this file")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for cadence jitter and data (default: 1)")
+    parser.add_argument("--max-rss-growth-mb", type=float, help="Exit non-zero if RSS grows by more than this")
+    parser.add_argument("--max-fd-growth", type=int, help="Exit non-zero if open file descriptors grow by more than this")
+    parser.add_argument("--max-thread-growth", type=int, help="Exit non-zero if the thread count grows by more than this")
+    args = parser.parse_args()
+
+    summary, samples = run(args)
+    print()
+    print(f"{summary['entries']} entries from {summary['stations']} stations in {_format_duration(summary['seconds'])}: "
+          f"{summary['entries_per_second']:.2f} entries/sec")
+    print(f"cycle latency p50 {_ms(summary['p50_seconds']).strip()} ms, p99 {_ms(summary['p99_seconds']).strip()} ms, "
+          f"p99.9 {_ms(summary['p999_seconds']).strip()} ms; {summary['overruns']} cycles overran the cadence")
+    print(f"errors: {summary['errors'] or 'none'}")
+    print(f"threads created {summary['threads_created']}, thread growth {summary['thread_growth']}, "
+          f"fd growth {summary['fd_growth']}, rss growth "
+          + (f"{summary['rss_growth_bytes'] / 1024 ** 2:.1f} MB" if summary['rss_growth_bytes'] is not None else "-")
+          + (f" ({summary['rss_growth_bytes_per_hour'] / 1024 ** 2:.1f} MB/hour)"
+             if summary['rss_growth_bytes_per_hour'] is not None else ""))
+
+    failures = []
+    if args.max_rss_growth_mb is not None and (summary["rss_growth_bytes"] or 0) > args.max_rss_growth_mb * 1024 ** 2:
+        failures.append("RSS growth")
+    if args.max_fd_growth is not None and (summary["fd_growth"] or 0) > args.max_fd_growth:
+        failures.append("file descriptor growth")
+    if args.max_thread_growth is not None and (summary["thread_growth"] or 0) > args.max_thread_growth:
+        failures.append("thread growth")
+    if failures:
+        print(f"FAILED: {', '.join(failures)} over the limit")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
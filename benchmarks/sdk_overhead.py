@@ -0,0 +1,229 @@
+"""
+Measures the library's own overhead against an in-process FakeTransport, so no
+sockets or server threads are involved, and no network latency unless --latency
+is given. Each scenario reports
+operations per second, p50/p99 latency per operation, threads created and peak
+traced memory. Results are saved as JSON under benchmarks/results so runs from
+different releases can be compared.
+
+    python benchmarks/sdk_overhead.py
+    python benchmarks/sdk_overhead.py --only submit --compare benchmarks/results/1.3.0.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialmfg as serial  # noqa: E402
+from serialmfg.testing import FakeSerialAPI, FakeTransport  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SUBMIT_SIZES = (10, 100, 1000)
+UPLOAD_SIZES = {"1KB": 1024, "1MB": 1024 ** 2, "16MB": 16 * 1024 ** 2}
+LIST_ROWS = 10000
+
+
+class Scenario:
+    """
+    A benchmark: setup() runs untimed before each operation and returns its
+    argument, and run(arg) is the timed operation
+    """
+    def __init__(self, name, run, setup=None, iterations=20):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda: None)
+        self.iterations = iterations
+
+
+def _new_entry(identifier="SN-1"):
+    return serial.ProcessEntries.create("process-1", component_instance_identifier=identifier)
+
+
+def _queue(kind, count, files):
+    def setup():
+        entry = _new_entry()
+        for i in range(count):
+            if kind == "text":
+                entry.add_text(f"Text {i % 10}", f"value {i}")
+            elif kind == "number":
+                entry.add_number(f"Number {i % 10}", i, usl=count, lsl=0)
+            elif kind == "boolean":
+                entry.add_boolean(f"Check {i % 10}", True, True)
+            elif kind == "file":
+                entry.add_file(f"File {i % 10}", files["1KB"])
+            elif kind == "link":
+                entry.add_link("Child", f"CHILD-{i}")
+        return entry
+    return setup
+
+
+def scenarios(transport, files):
+    api = transport.api
+    for i in range(max(SUBMIT_SIZES)):
+        api.add_component_instance(f"CHILD-{i}", "Child")
+    for i in range(LIST_ROWS):
+        api.process_entries[f"entry-{i}"] = {"id": f"entry-{i}", "process_id": "process-1",
+                                             "unique_identifier_id": "unit", "station_id": None, "operator_id": None,
+                                             "timestamp": "2024-01-01T00:00:00+00:00", "cycle_time": 12.5,
+                                             "is_pass": True, "is_complete": True, "upload_error": False,
+                                             "created_at": "2024-01-01T00:00:00+00:00"}
+    yield Scenario("create", lambda _: _new_entry(), iterations=500)
+    for kind in ("text", "number", "boolean", "file", "link"):
+        for count in SUBMIT_SIZES:
+            yield Scenario(f"submit/{kind}/{count}", lambda entry: entry.submit(), _queue(kind, count, files),
+                           iterations=max(3, 2000 // count))
+    for label in UPLOAD_SIZES:
+        def setup(label=label):
+            entry = _new_entry()
+            entry.add_file("Log", files[label])
+            return entry
+        yield Scenario(f"upload/{label}", lambda entry: entry.submit(), setup, iterations=10)
+    yield Scenario(f"list/{LIST_ROWS}", lambda _: serial.ProcessEntries.list({}), iterations=10)
+    yield Scenario(f"iter_list/{LIST_ROWS}", lambda _: sum(1 for _ in serial.ProcessEntries.iter_list()),
+                   iterations=10)
+    yield Scenario(f"stream_list/{LIST_ROWS}", lambda _: sum(1 for _ in serial.ProcessEntries.stream_list()),
+                   iterations=10)
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))]
+
+
+def measure(scenario):
+    """
+    Returns:
+    - A dictionary of ops/sec, p50/p99/mean latency in milliseconds, threads
+      created and peak traced memory in bytes
+    """
+    threads_before = {thread.ident for thread in threading.enumerate()}
+    scenario.run(scenario.setup())  # warm up caches and the worker pool
+    latencies = []
+    for _ in range(scenario.iterations):
+        arg = scenario.setup()
+        started = time.perf_counter()
+        scenario.run(arg)
+        latencies.append(time.perf_counter() - started)
+    threads_created = len({thread.ident for thread in threading.enumerate()} - threads_before)
+
+    # Memory is traced in a separate pass since tracing slows everything down
+    arg = scenario.setup()
+    tracemalloc.start()
+    try:
+        scenario.run(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "iterations": scenario.iterations,
+        "ops_per_second": len(latencies) / sum(latencies),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "threads_created": threads_created,
+        "peak_memory_bytes": peak,
+    }
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+        return version("serialmfg")
+    except Exception:
+        return "dev"
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change in ops/sec and p99 latency against a saved run
+
+    Returns:
+    - The names of scenarios that regressed by more than threshold percent
+    """
+    regressions = []
+    print(f"\nCompared with {baseline['label']} ({baseline['created_at']}):")
+    for name, result in results.items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        throughput = (result["ops_per_second"] / previous["ops_per_second"] - 1) * 100
+        p99 = (result["p99_ms"] / previous["p99_ms"] - 1) * 100 if previous["p99_ms"] else 0.0
+        regressed = throughput < -threshold or p99 > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<24} ops/s {throughput:+7.1f}%   p99 {p99:+7.1f}%{'   REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help="Only run scenarios whose name starts with this prefix")
+    parser.add_argument("--label", default=_version(), help="Name of the run, e.g. the release (default: installed version)")
+    parser.add_argument("--output", help="Where to save the results (default: benchmarks/results/<label>.json)")
+    parser.add_argument("--no-save", action="store_true", help="Do not save the results")
+    parser.add_argument("--compare", help="A saved results file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slowdown reported as a regression (default: 10)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds of simulated network latency per request (default: 0, overhead only)")
+    args = parser.parse_args()
+
+    serial.set_api_key("benchmark-key")
+    serial.set_base_url(FakeTransport.url)
+    transport = FakeTransport(FakeSerialAPI(), latency=args.latency)
+    serial.set_transport(transport)
+    transport.api.add_component_instance("SN-1", "Widget")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        files = {}
+        for label, size in UPLOAD_SIZES.items():
+            files[label] = os.path.join(directory, f"{label}.bin")
+            with open(files[label], "wb") as f:
+                f.write(os.urandom(size))
+        print(f"{'scenario':<24} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'threads':>8} {'peak MB':>8}")
+        for scenario in scenarios(transport, files):
+            if args.only and not scenario.name.startswith(args.only):
+                continue
+            result = results[scenario.name] = measure(scenario)
+            # Keep the fake's request log from growing across scenarios
+            transport.api.reset_request_log()
+            transport.api.process_entry_data.clear()
+            print(f"{scenario.name:<24} {result['ops_per_second']:10.1f} {result['p50_ms']:9.3f} "
+                  f"{result['p99_ms']:9.3f} {result['threads_created']:8d} "
+                  f"{result['peak_memory_bytes'] / 1024 ** 2:8.2f}")
+
+    run = {
+        "label": args.label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "max_workers": serial.config.max_workers,
+        "latency": args.latency,
+        "scenarios": results,
+    }
+    if not args.no_save:
+        output = args.output or os.path.join(RESULTS_DIR, f"{args.label}.json")
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"\nSaved results to {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares submitting process entries one request per data point against batched
+submission, using the local mock server.
+
+    python benchmarks/submit_batch.py --entries 20 --data-points 200
+"""
+import argparse
+import time
+import serialmfg as serial
+from serialmfg.testing import FakeSerialAPI, MockSerialServer
+
+
+def run(entries, data_points, batch, supports_batch=True):
+    """
+    Returns:
+    - A dictionary of request count, wall time and time per entry
+    """
+    with MockSerialServer(FakeSerialAPI(supports_batch=supports_batch)) as server:
+        serial.set_api_key("benchmark-key")
+        serial.set_base_url(server.url)
+        serial.Datasets.invalidate_cache()
+        for i in range(entries):
+            server.api.add_component_instance(f"SN-{i}", "Widget")
+        server.api.reset_request_log()
+        started = time.perf_counter()
+        for i in range(entries):
+            entry = serial.ProcessEntries.create("process-1", component_instance_identifier=f"SN-{i}")
+            for j in range(data_points):
+                entry.add_number(f"Measurement {j % 10}", j, usl=1000, lsl=0)
+            entry.submit(is_pass=True, batch=batch)
+        elapsed = time.perf_counter() - started
+        return {"requests": server.api.request_count(), "seconds": elapsed, "seconds_per_entry": elapsed / entries}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--data-points", type=int, default=200)
+    args = parser.parse_args()
+    for name, batch in (("per data point", False), ("batched", True)):
+        result = run(args.entries, args.data_points, batch)
+        print(f"{name:>15}: {result['requests']:6d} requests  {result['seconds']:7.2f}s  "
+              f"{result['seconds_per_entry'] * 1000:8.1f} ms/entry")
+
+
+if __name__ == "__main__":
+    main()
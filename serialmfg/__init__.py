@@ -1,24 +1,79 @@
 """serialmfg Module
-Exports 3 data classes (they are not initialized, and simply provide 
+Exports 6 data classes (they are not initialized, and simply provide 
 users with ways to access underlying data structures)
 ComponentInstances
 ProcessEntries
 Datasets
+Operators
+Components
+PartNumbers
 
 Exports 3 deprecated classes
 Serial (for managing connections)
 Identifier (for creating component instances)
 Process (for creating process entries)
 """
-from .identifier import Identifier
-from .serial import Serial 
-from .process import Process
-from .serial_resources.component_instance import ComponentInstances
-from .serial_resources.process_entry import ProcessEntries
-from .serial_resources.dataset import Datasets
-from .serial_resources.operator import Operators
+import importlib
 from . import config
-from .exceptions import SerialAPIException
+
+# Everything else is imported on first use (PEP 562), so `import serialmfg` does
+# not pay for requests, the resource modules or the deprecated classes until
+# they are needed. Maps each exported name to the module defining it.
+_LAZY_ATTRIBUTES = {
+    "Identifier": ".identifier",
+    "Serial": ".serial",
+    "Process": ".process",
+    "Components": ".serial_resources.component",
+    "ComponentInstances": ".serial_resources.component_instance",
+    "ProcessEntries": ".serial_resources.process_entry",
+    "Datasets": ".serial_resources.dataset",
+    "Operators": ".serial_resources.operator",
+    "PartNumbers": ".serial_resources.part_number",
+    "SerialAPIException": ".exceptions",
+    "SerialConnectionError": ".exceptions",
+    "get_worker_pool": ".worker_pool",
+    "set_max_workers": ".worker_pool",
+    "shutdown_worker_pool": ".worker_pool",
+    "configure_connection_pool": ".api_client",
+    "set_transport": ".api_client",
+    "RetryPolicy": ".retry",
+    "set_retry_policy": ".retry",
+    "enable_offline_queue": ".offline_queue",
+    "disable_offline_queue": ".offline_queue",
+    "get_offline_queue": ".offline_queue",
+    "RequestEvent": ".instrumentation",
+    "MetricsRegistry": ".instrumentation",
+    "add_request_hooks": ".instrumentation",
+    "remove_request_hooks": ".instrumentation",
+    "get_metrics_registry": ".instrumentation",
+    "SubmitHandle": ".submission",
+    "SubmitCancelled": ".submission",
+    "drain_submissions": ".submission",
+    "pending_submissions": ".submission",
+    "set_serializer": ".utils.serialization",
+    "set_compression": ".utils.compression",
+    "get_compression_stats": ".utils.compression",
+}
+
+# Submodules that were importable as attributes, e.g. serial.api_client.APIClient
+_LAZY_SUBMODULES = {"aio", "api_client", "exceptions", "identifier", "instrumentation", "offline_queue", "process",
+                    "retry", "serial", "serial_resources", "submission", "testing", "utils", "worker_pool"}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache it so __getattr__ is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
 
 def set_api_key(key):
     config.api_key = key
@@ -30,4 +85,4 @@ def set_station_id(id):
     config.station_id = id
 
 # Export the functions so that they can be used as serial.set_api_key, etc.
-__all__ = ['set_api_key', 'set_base_url', 'set_station_id', 'SerialAPIException', ...]
+__all__ = ['set_api_key', 'set_base_url', 'set_station_id', 'set_max_workers', 'get_worker_pool', 'shutdown_worker_pool', 'configure_connection_pool', 'set_transport', 'set_retry_policy', 'RetryPolicy', 'enable_offline_queue', 'disable_offline_queue', 'get_offline_queue', 'RequestEvent', 'MetricsRegistry', 'add_request_hooks', 'remove_request_hooks', 'get_metrics_registry', 'SubmitHandle', 'SubmitCancelled', 'drain_submissions', 'pending_submissions', 'set_serializer', 'set_compression', 'get_compression_stats', 'SerialAPIException', 'SerialConnectionError', ...]
@@ -0,0 +1,25 @@
+"""serialmfg.aio Module
+Exports asyncio versions of the serialmfg data classes. Every method that talks
+to the API is a coroutine, and `await entry.submit()` sends queued data as
+concurrent coroutines instead of threads. Requires aiohttp.
+AsyncAPIClient
+Components
+ComponentInstances
+ProcessEntries
+Datasets
+PartNumbers
+Operators
+"""
+from .api_client import AsyncAPIClient
+from .component import Components
+from .component_instance import ComponentInstances
+from .process_entry import ProcessEntries
+from .dataset import Datasets
+from .part_number import PartNumbers
+from .operator import Operators
+
+async def close():
+    """
+    Closes the asyncio client's HTTP session
+    """
+    await AsyncAPIClient().close()
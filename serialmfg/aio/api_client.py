@@ -0,0 +1,256 @@
+"""
+This file contains the AsyncAPIClient class, the asyncio counterpart of APIClient.
+It requires the optional aiohttp dependency (pip install serialmfg[async]).
+"""
+import asyncio
+import time
+from .. import config
+from ..api_client import SingletonMeta
+from ..exceptions import SerialAPIException, SerialConnectionError
+from ..instrumentation import RequestEvent, request_finished, request_started
+from ..retry import RetryBudget, RetryStats, endpoint_template, get_retry_policy
+from ..utils.compression import compress_body, compress_upload
+from ..utils.multipart import CHUNK_SIZE, MultipartEncoder, UploadStats, file_size
+from ..utils.serialization import JSONArrayParser, get_serializer
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - depends on the environment
+    aiohttp = None
+
+
+def _encode_params(params):
+    # aiohttp rejects None and bool query values, requests drops None and stringifies the rest
+    if not params:
+        return None
+    return {key: value if isinstance(value, (str, int, float)) and not isinstance(value, bool) else str(value)
+            for key, value in params.items() if value is not None}
+
+
+class AsyncAPIClient(metaclass=SingletonMeta):
+    def __init__(self):
+        # The init method should only be called once.
+        if aiohttp is None:
+            raise ImportError("The asyncio client requires aiohttp. Install it with `pip install serialmfg[async]`")
+        if not config.api_key or not config.base_url:
+            raise ValueError("API client requires an API key and base URL")
+
+        self._session = None
+        self._loop = None
+        self.upload_stats = UploadStats()
+        self.retry_stats = RetryStats()
+        self.retry_budget = RetryBudget(config.retry_budget_ratio, config.retry_budget_reserve)
+
+    async def _get_session(self):
+        # aiohttp sessions are bound to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is not loop:
+            await self._close_stale_session()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=config.pool_maxsize or config.max_workers,
+                                             force_close=not config.keep_alive)
+            timeout = aiohttp.ClientTimeout(sock_connect=config.connect_timeout, sock_read=config.read_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._loop = loop
+        return self._session
+
+    async def _close_stale_session(self):
+        """
+        Closes a session left open on another event loop, e.g. by an earlier
+        asyncio.run() that did not await close(), so its connections are not leaked
+        """
+        session, loop = self._session, self._loop
+        self._session = None
+        if loop.is_running():
+            # The loop is running in another thread, which must close its own session
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+        else:
+            await session.close()
+
+    def _headers(self):
+        return {'Authorization': f'Bearer {config.api_key}'}
+
+    async def make_api_request(self, endpoint, method, params=None, data=None, files=None):
+        if method not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
+            print(f"{method} is not supported by the serial python library")
+            return None
+        event = RequestEvent(method, endpoint_template(endpoint), endpoint)
+        request_started(event)
+        started = time.perf_counter()
+        try:
+            return await self._make_api_request(endpoint, method, params, data, files, event)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.seconds = time.perf_counter() - started
+            request_finished(event)
+
+    async def iter_api_request(self, endpoint, params=None):
+        """
+        The asyncio counterpart of APIClient.iter_api_request
+
+        Args:
+        - endpoint: List endpoint, e.g. /processes/entries
+        - params?: Query parameters
+
+        Returns:
+        - An async generator of the list's items
+        """
+        event = RequestEvent("GET", endpoint_template(endpoint), endpoint)
+        request_started(event)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await self._make_api_request(endpoint, "GET", params, None, None, event, stream=True)
+            parser = JSONArrayParser()
+            try:
+                async for chunk in response.content.iter_chunked(config.stream_chunk_size):
+                    event.bytes_received += len(chunk)
+                    for item in parser.feed(chunk):
+                        yield item
+                parser.close()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise SerialConnectionError(f"API request failed: {e}") from e
+            except ValueError as e:
+                raise SerialAPIException(f"API request failed: invalid list response ({e})",
+                                         status_code=response.status) from e
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            if response is not None:
+                response.release()
+            event.seconds = time.perf_counter() - started
+            request_finished(event)
+
+    async def _make_api_request(self, endpoint, method, params, data, files, event, stream=False):
+        policy = get_retry_policy(endpoint)
+        template = event.endpoint
+        # Remember where each file starts so a retried upload can rewind it
+        file_positions = [fileobj.tell() for _, fileobj, _ in files.values()] if files else None
+        self.retry_budget.deposit()
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            event.retries = attempt
+            event.status = None
+            try:
+                result = await self._send(endpoint, method, params, data, files, file_positions, event, stream)
+            except SerialAPIException as e:
+                status, retry_after, error = e.status_code, getattr(e, "retry_after", None), e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, retry_after, error = None, None, e
+            else:
+                if attempt:
+                    self.retry_stats.record_outcome(template, True)
+                return result
+            delay = policy.get_delay(method, attempt, time.monotonic() - started, status=status,
+                                     retry_after=retry_after,
+                                     connect_error=isinstance(error, aiohttp.ClientConnectorError),
+                                     error=status is None)
+            budget_exhausted = delay is not None and not self.retry_budget.withdraw()
+            if delay is None or budget_exhausted:
+                if attempt or budget_exhausted:
+                    self.retry_stats.record_outcome(template, False, budget_exhausted)
+                if isinstance(error, SerialAPIException):
+                    raise error
+                raise SerialConnectionError(f"API request failed: {error}") from error
+            self.retry_stats.record_retry(template, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(self, endpoint, method, params=None, data=None, files=None, file_positions=None, event=None,
+                    stream=False):
+        session = await self._get_session()
+        url = f"{config.base_url}{endpoint}"
+        if method == "POST" and files:
+            for (_, fileobj, _), position in zip(files.values(), file_positions):
+                fileobj.seek(position)
+            return await self._post_files(session, url, files, event)
+        kwargs = {"headers": self._headers()}
+        if method == "GET":
+            kwargs["params"] = _encode_params(params)
+        elif data is not None:
+            # Encoded here rather than with json= so the body size is known
+            kwargs["data"], encoding = compress_body(get_serializer().dumps(data))
+            kwargs["headers"]["Content-Type"] = "application/json"
+            if encoding:
+                kwargs["headers"]["Content-Encoding"] = encoding
+            if event is not None:
+                event.bytes_sent += len(kwargs["data"])
+        if stream:
+            # Left open for the caller to read; only an error response is read here
+            response = await session.request(method, url, **kwargs)
+            if response.ok:
+                if event is not None:
+                    event.status = response.status
+                return response
+            async with response:
+                return await self._handle_response(response, event)
+        async with session.request(method, url, **kwargs) as response:
+            return await self._handle_response(response, event)
+
+    async def _post_files(self, session, url, files, event=None):
+        if config.compress_files and config.compression:
+            body = compress_upload(MultipartEncoder(files))
+            if body.content_encoding:
+                return await self._post_compressed(session, url, body, event)
+        form = aiohttp.FormData()
+        size = 0
+        for field_name, (file_name, fileobj, content_type) in files.items():
+            size += file_size(fileobj)
+            form.add_field(field_name, fileobj, filename=file_name, content_type=content_type)
+        if event is not None:
+            event.bytes_sent += size
+        started = time.perf_counter()
+        ok = False
+        try:
+            async with session.post(url, data=form, headers=self._headers()) as response:
+                ok = response.ok
+                return await self._handle_response(response, event)
+        finally:
+            self.upload_stats.record(size, time.perf_counter() - started, ok)
+
+    async def _post_compressed(self, session, url, body, event=None):
+        # Files are read and compressed on the default executor, off the event loop
+        loop = asyncio.get_running_loop()
+
+        async def chunks():
+            while True:
+                chunk = await loop.run_in_executor(None, body.read, CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+        headers = {**self._headers(), "Content-Type": body.content_type, "Content-Encoding": body.content_encoding}
+        started = time.perf_counter()
+        ok = False
+        try:
+            async with session.post(url, data=chunks(), headers=headers) as response:
+                ok = response.ok
+                return await self._handle_response(response, event)
+        finally:
+            if event is not None:
+                event.bytes_sent += body.bytes_read
+            self.upload_stats.record(body.bytes_read, time.perf_counter() - started, ok)
+
+    async def _handle_response(self, response, event=None):
+        body = await response.read()
+        if event is not None:
+            event.status = response.status
+            event.bytes_received += len(body)
+        if not response.ok:
+            error = SerialAPIException(f"API request failed: {body.decode('utf-8', 'replace')}",
+                                       status_code=response.status)
+            error.retry_after = response.headers.get("Retry-After")
+            raise error
+        return get_serializer().loads(body)
+
+    async def close(self):
+        """
+        Closes the underlying HTTP session
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
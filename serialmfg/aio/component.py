@@ -0,0 +1,62 @@
+"""
+This file contains the asyncio Components class. It shares its component cache
+with the blocking Components class.
+"""
+from .api_client import AsyncAPIClient
+from ..serial_resources import component as sync_component
+from ..serial_resources.component import Component, ComponentNotFound
+from ..utils.single_flight import AsyncSingleFlight
+
+# Concurrent lookups of the same component share a single request
+_component_flight = AsyncSingleFlight()
+
+class Components:
+    """
+    A class for asyncio component data methods
+    """
+    @staticmethod
+    async def get(name):
+        """
+        Gets a component by name. Components are cached after the first lookup.
+
+        Args:
+        - name: User facing name for the component
+
+        Returns:
+        - A component Python object
+        """
+        component = sync_component._component_cache.get(name)
+        if component is None:
+            component, shared = await _component_flight.do(name, Components._fetch_component, name)
+        return component
+
+    @staticmethod
+    async def _fetch_component(name):
+        client = AsyncAPIClient()
+        components = await client.make_api_request("/components", "GET", params={"name": name})
+        if len(components) == 0:
+            raise ComponentNotFound(f"Component with name {name} does not exist")
+        component = Component(components[0])
+        sync_component._component_cache.set(name, component)
+        return component
+
+    @staticmethod
+    async def prefetch(names=None):
+        """
+        Loads every component in one request and caches them, so later lookups
+        by name do not call the API
+
+        Args:
+        - names?: Only cache the components with these names
+
+        Returns:
+        - The number of components cached
+        """
+        client = AsyncAPIClient()
+        components = [Component(component) for component in await client.make_api_request("/components", "GET")]
+        if names is not None:
+            names = set(names)
+            components = [component for component in components if component.name in names]
+        for component in components:
+            sync_component._component_cache.set(component.name, component)
+        return len(components)
@@ -0,0 +1,211 @@
+"""
+This file contains the asyncio ComponentInstance and ComponentInstances classes.
+Component instance lookups share the blocking ComponentInstances cache.
+"""
+import asyncio
+from .api_client import AsyncAPIClient
+from .component import Components
+from .part_number import PartNumbers
+from ..exceptions import SerialAPIException
+from ..utils.pagination import aiter_pages
+from ..utils.single_flight import AsyncSingleFlight
+from ..serial_resources import component_instance as sync_component_instance
+from ..serial_resources.component_instance import ComponentInstanceRecord as SyncComponentInstanceRecord, ComponentInstances as SyncComponentInstances
+from ..serial_resources.component_instance_link import ComponentInstanceLink
+
+# Concurrent lookups of the same component instance share a single request
+_component_instance_flight = AsyncSingleFlight()
+
+class ComponentInstance:
+    """
+    A component instance object, as defined at
+    https://docs.serial.io/api-reference/component-instances/get-component-instance
+    """
+    def __init__(self, component_instance_data):
+        """
+        Args:
+        - component_instance_data: A component instance object, as defined at
+        https://docs.serial.io/api-reference/component-instances/get-component-instance
+        
+        Returns:
+        - A component instance python object, which holds the api object at data,
+        its links created during this session at created_links, and the client
+        """
+        self.client = AsyncAPIClient()
+        self.data = component_instance_data
+        self.created_links = []
+
+    async def add_link(self, link_name, child_identifier, break_prior_links=False, process_entry=None):
+        """
+        Creates a link between this component instance and a child at a specific
+        process_entry
+
+        Args: 
+        - link_name: User facing name for the link
+        - child_identifier: Identifier for the child component instance to be linked
+        - break_prior_links?: Boolean for whether to break prior links
+        - process_entry: The process entry the link is created at
+
+        Returns:
+        - New component instance link
+        """
+        child_component_instance = await self.client.make_api_request(
+            "/components/instances", "GET", params={"identifier": child_identifier})
+        if len(child_component_instance) == 0:
+            raise SerialAPIException(f"Component instance with identifier {child_identifier} does not exist")
+        link_dataset = await self.client.make_api_request("/datasets", "GET", params={"name": link_name})
+        if len(link_dataset) == 0:
+            raise SerialAPIException(f"Dataset with name {link_name} does not exist")
+        data = {
+                "parent_component_instance_id": self.data["id"],
+                "child_component_instance_id": child_component_instance[0]["id"],
+                "dataset_id": link_dataset[0]["id"],
+                "process_entry_id": process_entry.id,
+                "break_prior_links": break_prior_links,
+                }
+        new_link = ComponentInstanceLink(
+            await self.client.make_api_request("/components/instances/links", "PUT", data=data))
+        self.created_links.append(new_link)
+        return new_link
+
+class ComponentInstanceRecord(SyncComponentInstanceRecord):
+    """
+    A read-only component instance returned by ComponentInstances.list and
+    iter_list. Adding a link promotes it to a full asyncio ComponentInstance.
+    """
+    __slots__ = ()
+    _full_class = ComponentInstance
+
+class ComponentInstances:
+    """
+    A class for asyncio component instance data methods
+    """
+    @staticmethod
+    async def get(identifier=None, id=None):
+        """
+        Gets a component instance, if it exists
+        
+        Args:
+        - identifier: Component's user facing identifier
+        - id?: Component instance id
+
+        Returns:
+        - A component instance object 
+        """
+        if identifier or id:
+            instance = sync_component_instance._cached_component_instance(identifier, id)
+            if instance is None:
+                instance, shared = await _component_instance_flight.do(
+                    (identifier, id), ComponentInstances._fetch_component_instance, identifier, id)
+            return ComponentInstance(dict(instance))
+        return ComponentInstance(await ComponentInstances._fetch_component_instance(identifier, id))
+
+    @staticmethod
+    async def get_many(identifiers):
+        """
+        Gets several component instances at once, looking up the ones that are
+        not cached concurrently
+
+        Args:
+        - identifiers: Component instance identifiers
+
+        Returns:
+        - A dictionary of identifier to component instance object. Identifiers
+        that could not be found are left out.
+        """
+        identifiers = list(dict.fromkeys(identifiers))
+        instances = await asyncio.gather(*(ComponentInstances.get(identifier) for identifier in identifiers),
+                                         return_exceptions=True)
+        return {identifier: instance for identifier, instance in zip(identifiers, instances)
+                if not isinstance(instance, BaseException)}
+
+    @staticmethod
+    async def _fetch_component_instance(identifier=None, id=None):
+        client = AsyncAPIClient()
+        params = {}
+        if identifier:
+            params["identifier"] = identifier
+        if id:
+            params["id"] = id
+        returned_instances = await client.make_api_request("/components/instances", "GET", params=params)
+        if len(returned_instances) == 0:
+            raise SerialAPIException(f"Component instance with identifier {identifier} does not exist")
+        if len(returned_instances) > 1:
+            raise SerialAPIException(f"Multiple component instances with identifier {identifier} exist. Please contact Serial support.")
+        sync_component_instance._cache_component_instance(returned_instances[0])
+        return returned_instances[0]
+
+    @staticmethod
+    async def create(identifier, component_name, part_number=None):
+        """
+        Creates a component instance
+        
+        Args:
+        - identifier: Component's user facing identifier
+        - component_name: User facing name for the component
+        - part_number?: Part number for the component instance
+            
+        Returns:
+        - A component instance, as defined at 
+        https://docs.serial.io/api-reference/component-instances/get-component-instance
+        """
+        client = AsyncAPIClient()
+        component_id = (await Components.get(component_name)).id
+        data = {
+                "component_id": component_id,
+                "identifier": identifier,
+                }
+        if part_number:
+            part_number = await PartNumbers.get_or_create_part_number(part_number, component_id)
+            data["part_number_id"] = part_number.data["id"]
+        instance = await client.make_api_request("/components/instances", "PUT", data=data)
+        SyncComponentInstances.invalidate_cache(identifier=identifier)
+        sync_component_instance._cache_component_instance(instance)
+        return ComponentInstance(dict(instance))
+
+    @staticmethod
+    async def list(query_params):
+        """
+        Lists component instances
+
+        Args:
+        - query_params: A dictionary of query parameters, as defined at
+        https://docs.serial.io/api-reference/component-instances/get-component-instance
+
+        Returns:
+        - A list of read-only component instance records
+        """
+        client = AsyncAPIClient()
+        instances = await client.make_api_request("/components/instances", "GET", params=query_params)
+        return [ComponentInstanceRecord(instance) for instance in instances]
+
+    @staticmethod
+    async def iter_list(query_params=None, page_size=None, prefetch=True):
+        """
+        Iterates over component instances a page at a time
+
+        Args:
+        - query_params?: A dictionary of query parameters, as for list
+        - page_size?: Component instances per request (defaults to config.list_page_size)
+        - prefetch?: Whether to fetch the next page while the current one is consumed
+
+        Returns:
+        - An async generator of read-only component instance records
+        """
+        async for page in aiter_pages(AsyncAPIClient(), "/components/instances", query_params, page_size, prefetch):
+            for instance in page:
+                yield ComponentInstanceRecord(instance)
+
+    @staticmethod
+    async def stream_list(query_params=None):
+        """
+        Lists component instances with a single request, decoding each record as it arrives
+
+        Args:
+        - query_params?: A dictionary of query parameters, as for list
+
+        Returns:
+        - An async generator of read-only component instance records
+        """
+        async for instance in AsyncAPIClient().iter_api_request("/components/instances", params=query_params):
+            yield ComponentInstanceRecord(instance)
@@ -0,0 +1,90 @@
+"""
+This file contains the asyncio Datasets class. It shares its dataset cache with
+the blocking Datasets class, so a dataset resolved by either API is cached for both.
+"""
+from .api_client import AsyncAPIClient
+from ..serial_resources import dataset as sync_dataset
+from ..serial_resources.dataset import Dataset, DatasetNotFound
+from ..utils.single_flight import AsyncSingleFlight
+
+# Concurrent resolutions of the same dataset share a single get/create round trip
+_dataset_flight = AsyncSingleFlight()
+
+class Datasets:
+    """
+    A class for asyncio dataset data methods
+    """
+    @staticmethod
+    async def get(name, data_type, process_id):
+        """
+        Gets a dataset, if it exists
+        
+        Args:
+        - name: Dataset name
+        - data_type: Dataset data type
+        - process_id: Process ID
+
+        Returns:
+        - A dataset Python object 
+        """
+        client = AsyncAPIClient()
+        query_params = {"name": name, "type": data_type, "process_id": process_id}
+        dataset_data = await client.make_api_request("/datasets", "GET", params=query_params)
+        if dataset_data and len(dataset_data) > 0:
+            return Dataset(dataset_data[0])
+        else:
+            raise DatasetNotFound(f"Dataset {name} of type {data_type} not found")
+
+    @staticmethod
+    async def create(name, data_type, process_id, extra_params=None):
+        """
+        Creates a dataset, if it does not exist
+        
+        Args:
+        - name: Dataset name
+        - data_type: Dataset data type
+        - process_id: Process ID
+        - extra_params?: Extra parameters. Valid options are: usl, lsl, & unit
+
+        Returns:
+        - A dataset Python object 
+        """
+        client = AsyncAPIClient()
+        query_params = {"name": name, "type": data_type, "process_id": process_id}
+        if extra_params:
+            query_params.update(extra_params)
+        return Dataset(await client.make_api_request("/datasets", "PUT", data=query_params))
+
+    @staticmethod
+    async def get_or_create_dataset(name, data_type, process_id, extra_params=None):
+        """
+        Gets a dataset, if it exists, otherwise creates it
+        
+        Args:
+        - name: Dataset name
+        - data_type?: Dataset data type
+        - process_id?: Process ID
+        - extra_params?: Extra parameters. Valid options are: usl, lsl, & unit
+
+        Returns:
+        - A tuple of a dataset Python object and "found" or "created"
+        """
+        key = (name, data_type, process_id)
+        dataset = sync_dataset._dataset_cache.get(key)
+        if dataset is not None:
+            return dataset, "found"
+        (dataset, status), shared = await _dataset_flight.do(
+            key, Datasets._resolve_dataset, name, data_type, process_id, extra_params)
+        if shared:
+            # Only the caller that actually created the dataset should see "created"
+            status = "found"
+        return dataset, status
+
+    @staticmethod
+    async def _resolve_dataset(name, data_type, process_id, extra_params=None):
+        try:
+            dataset, status = await Datasets.get(name, data_type, process_id), "found"
+        except DatasetNotFound:
+            dataset, status = await Datasets.create(name, data_type, process_id, extra_params), "created"
+        sync_dataset._dataset_cache.set((name, data_type, process_id), dataset)
+        return dataset, status
@@ -0,0 +1,71 @@
+"""
+This module contains the asyncio Operators class. It shares its operator cache
+with the blocking Operators class.
+"""
+from .api_client import AsyncAPIClient
+from ..exceptions import SerialAPIException
+from ..serial_resources import operator as sync_operator
+from ..utils.single_flight import AsyncSingleFlight
+
+# Concurrent lookups of the same operator share a single request
+_operator_flight = AsyncSingleFlight()
+
+class Operator:
+    """
+    An operator Python object
+    """
+
+    def __init__(self, operator_data):
+        """ 
+        Args:
+            operator_data (dict): The operator data.
+        """
+        self.data = operator_data
+
+class Operators:
+    """
+    This class contains the asyncio data methods for operators 
+    """
+
+    @staticmethod
+    async def get(first_name=None, last_name=None, pin=None):
+        """
+        Get operators. Operators that were looked up or prefetched recently
+        are returned from the operator cache.
+
+        Args:
+            first_name (str): The first name of the operator.
+            last_name (str): The last name of the operator.
+            pin (str): The pin of the operator.
+        Returns:
+            A single operator object
+        """
+        params = sync_operator._operator_params(first_name, last_name, pin)
+        key = sync_operator._operator_key(params)
+        operator_data = sync_operator._operator_cache.get(key)
+        if operator_data is None:
+            operator_data, shared = await _operator_flight.do(key, Operators._fetch_operator, params)
+        return Operator(dict(operator_data))
+
+    @staticmethod
+    async def _fetch_operator(params):
+        client = AsyncAPIClient()
+        operator_data = await client.make_api_request('/operators', "GET", params=params)
+        if len(operator_data) == 0:
+            raise SerialAPIException("No operator found")
+        if len(operator_data) > 1:
+            raise SerialAPIException("Multiple operators found")
+        sync_operator._operator_cache.set(sync_operator._operator_key(params), operator_data[0])
+        return operator_data[0]
+
+    @staticmethod
+    async def prefetch():
+        """
+        Loads the operator roster in one request and caches every operator by
+        PIN, by first and last name, and by name and PIN
+
+        Returns:
+            The number of operators cached
+        """
+        client = AsyncAPIClient()
+        return sync_operator._cache_roster(await client.make_api_request('/operators', "GET"))
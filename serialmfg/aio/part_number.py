@@ -0,0 +1,99 @@
+"""
+This file contains the asyncio PartNumbers class. It shares its part number
+cache with the blocking PartNumbers class.
+"""
+from .api_client import AsyncAPIClient
+from ..exceptions import SerialAPIException
+from ..serial_resources import part_number as sync_part_number
+from ..serial_resources.part_number import PartNumber, PartNumberNotFound
+from ..utils.single_flight import AsyncSingleFlight
+
+# Concurrent resolutions of the same part number share a single get/create round trip
+_part_number_flight = AsyncSingleFlight()
+
+class PartNumbers:
+    """
+    A class for asyncio part number data methods
+    """
+    @staticmethod
+    async def get(part_number, component_id=None):
+        """
+        Get part number data
+
+        Args:
+        - part_number (str): Part Number
+        - component_id? (str): Component ID - only part numbers of this component are returned;
+          may be needed if part number is not unique
+
+        Returns:
+        - A PartNumber object
+        """
+        client = AsyncAPIClient()
+        query_params = {
+            'part_number': part_number
+        }
+        if component_id:
+            query_params['component_id'] = component_id
+        response = await client.make_api_request('/part-numbers', 'GET', query_params)
+        if component_id:
+            # Part numbers are cached per component, so never return another component's
+            response = [data for data in response if data.get('component_id') == component_id]
+        if not response:
+            raise PartNumberNotFound('Part Number not found')
+        if len(response) > 1 and not component_id:
+            raise SerialAPIException('Multiple Part Numbers found. Please specify a component ID')
+        return PartNumber(response[0])
+
+    @staticmethod
+    async def create(part_number, component_id, description=None):
+        """
+        Create a part number
+
+        Args:
+        - part_number (str): Part Number
+        - component_id (str): Component ID
+        - description? (str): Description
+
+        Returns:
+        - A PartNumber object
+        """
+        client = AsyncAPIClient()
+        data = {
+            'part_number': part_number,
+            'component_id': component_id
+        }
+        if description:
+            data['description'] = description
+        response = await client.make_api_request('/part-numbers', 'POST', data=data)
+        if not response:
+            raise SerialAPIException('Part Number not created')
+        return PartNumber(response)
+
+    @staticmethod
+    async def get_or_create_part_number(part_number, component_id, description=None):
+        """
+        Get or create a part number
+
+        Args:
+        - part_number (str): Part Number
+        - component_id (str): Component ID
+        - description? (str): Description
+
+        Returns:
+        - A PartNumber object
+        """
+        result = sync_part_number._part_number_cache.get((part_number, component_id))
+        if result is not None:
+            return result
+        result, shared = await _part_number_flight.do(
+            (part_number, component_id), PartNumbers._resolve_part_number, part_number, component_id, description)
+        return result
+
+    @staticmethod
+    async def _resolve_part_number(part_number, component_id, description=None):
+        try:
+            result = await PartNumbers.get(part_number, component_id)
+        except PartNumberNotFound:
+            result = await PartNumbers.create(part_number, component_id, description)
+        sync_part_number._part_number_cache.set((part_number, component_id), result)
+        return result
@@ -0,0 +1,285 @@
+"""
+This module contains the asyncio ProcessEntry and ProcessEntries classes.
+Data is queued with the same add_* methods as the blocking ProcessEntry, and
+`await entry.submit()` sends every queued data point as concurrent coroutines.
+"""
+import asyncio
+from .api_client import AsyncAPIClient
+from .component_instance import ComponentInstances
+from .dataset import Datasets
+from .. import config
+from ..exceptions import SerialAPIException
+from ..serial_resources.process_entry import ProcessEntryBase, ProcessEntryRecord as SyncProcessEntryRecord
+from ..utils.pagination import aiter_pages
+from ..utils.time_formatting import is_iso_timestamp
+
+class ProcessEntry(ProcessEntryBase):
+    """
+    An asyncio process entry Python object
+    """
+    def __init__(self, process_entry_data):
+        """
+        Args:
+        - process_entry_data: A process entry object, as defined at
+        https://docs.serial.io/api-reference/process-entries/get-process-entry
+
+        Returns:
+        - A process entry Python object, which holds the api object at data, the process id at process_id and the id at id
+        """
+        super().__init__(process_entry_data)
+        self.client = AsyncAPIClient()
+        self._stream_semaphore = None
+
+    def _stream_queued(self):
+        # Streamed data is sent as tasks on the running event loop
+        if not self._streaming:
+            return
+        if self._stream_semaphore is None:
+            self._stream_semaphore = asyncio.Semaphore(config.max_workers)
+        for handler, item in self._drain_queues():
+            self._streamed.append(asyncio.ensure_future(self._run_limited(self._stream_semaphore, handler, item)))
+
+    @staticmethod
+    async def _run_limited(semaphore, handler, item):
+        async with semaphore:
+            try:
+                await handler(item)
+            except Exception as e:
+                print(f"An error occurred: {e}")
+                return e
+            return None
+
+    async def _process_queue(self):
+        """
+        Process all queued data submissions as concurrent coroutines, at most
+        config.max_workers at a time, after waiting for any streamed data.
+        """
+        semaphore = asyncio.Semaphore(config.max_workers)
+        streamed, self._streamed = self._streamed, []
+        tasks = self._drain_queues()
+        await self._resolve_link_children(tasks)
+        results = await asyncio.gather(*streamed, *(self._run_limited(semaphore, handler, item) for handler, item in tasks))
+        errors = [error for error in results if error is not None]
+        if errors:
+            raise SerialAPIException(f"An error occurred: {errors[0]}")
+
+    async def _put_data(self, data):
+        return await self.client.make_api_request(f"/processes/entries/{self.id}", "PUT", data=data)
+
+    async def _process_single_text_data(self, text_data):
+        dataset, status = await Datasets.get_or_create_dataset(text_data['dataset_name'], "TEXT", self.process_id)
+        return await self._put_data(self._text_payload(text_data, dataset))
+
+    async def _process_single_numerical_data(self, number_data):
+        dataset, status = await Datasets.get_or_create_dataset(
+            number_data['dataset_name'], "NUMERICAL", self.process_id, self._numerical_dataset_params(number_data))
+        return await self._put_data(self._numerical_payload(number_data, dataset))
+
+    async def _process_single_file_data(self, file_data):
+        return await self._upload_file(file_data['dataset_name'], file_data['path'], file_data.get('file_name'), "FILE")
+
+    async def _upload_file(self, dataset_name, path, file_name, dataset_type):
+        """
+        Uploads a file to the serial server
+
+        Args:
+        - dataset_name: User facing name of the dataset
+        - path: Path to the file on your file system
+        - file_name: None-able argument to override the file name
+        - dataset_type: Type of dataset to be uploaded (IMAGE or FILE)
+        """
+        file_name, mimetype, dataset_type = self._upload_details(path, file_name, dataset_type)
+        # Opened off the event loop; aiohttp reads the file in its executor as it is sent
+        file = await asyncio.to_thread(open, path, 'rb')
+        try:
+            files = {'file': (file_name, file, mimetype)}
+            storage_object = await self.client.make_api_request("/files", "POST", files=files)
+        finally:
+            file.close()
+        dataset, status = await Datasets.get_or_create_dataset(dataset_name, dataset_type, self.process_id)
+        return await self._put_data(self._upload_payload(dataset_type, dataset, storage_object, file_name))
+
+    async def _process_single_boolean_data(self, boolean_data):
+        dataset, status = await Datasets.get_or_create_dataset(boolean_data['dataset_name'], "BOOLEAN", self.process_id)
+        return await self._put_data(self._boolean_payload(boolean_data, dataset))
+
+    async def _resolve_link_children(self, tasks):
+        """
+        Looks up the child component instances of every queued link at once,
+        before the links are created, so each distinct child is fetched once
+        """
+        identifiers = self._unresolved_link_children(tasks)
+        if identifiers:
+            self._child_component_instances.update(await ComponentInstances.get_many(identifiers))
+
+    async def _get_child_component_instance(self, child_identifier):
+        child_component_instance = self._child_component_instances.get(child_identifier)
+        if child_component_instance is None:
+            child_component_instance = await ComponentInstances.get(child_identifier)
+            self._child_component_instances[child_identifier] = child_component_instance
+        return child_component_instance.data
+
+    async def _get_parent_component_instance(self):
+        # The parent is the same for every link of this entry
+        if self._parent_component_instance is None:
+            self._parent_component_instance = await ComponentInstances.get(id=self.component_instance_id)
+        return self._parent_component_instance.data
+
+    async def _process_single_link_data(self, link_data):
+        child_component_instance = await self._get_child_component_instance(link_data['child_identifier'])
+        link_dataset, status = await Datasets.get_or_create_dataset(link_data['dataset_name'], "LINK", self.process_id)
+
+        if status == "created":
+            parent_component_instance = await self._get_parent_component_instance()
+            await self.client.make_api_request("/components/links", "PUT", data=self._component_link_payload(
+                link_dataset, child_component_instance, parent_component_instance))
+
+        return await self.client.make_api_request(
+            "/components/instances/links", "PUT", data=self._link_payload(link_data, link_dataset, child_component_instance))
+
+    async def submit(self, cycle_time=None, is_pass=None):
+        """
+        Mark a process entry as completed
+
+        Args: 
+        - cycle_time?: Optional number for seconds elapsed since the last cycle 
+        finished for this process.
+        - is_pass?: Optional boolean for indicating whether the process passed for
+        this entry
+
+        Returns:
+        - API response for submitting a process entry
+        """
+        data = {}
+        if cycle_time is not None:
+            data["cycle_time"] = cycle_time
+        if is_pass is not None:
+            data["is_pass"] = is_pass
+        try:
+            await self._process_queue()
+        except SerialAPIException as e:
+            raise SerialAPIException(f"Could not add data to process entry: {e}")
+
+        data["is_complete"] = True
+
+        self.data = await self.client.make_api_request(f"/processes/entries/{self.id}", "PATCH", data=data)
+        return self.data
+
+class ProcessEntryRecord(SyncProcessEntryRecord):
+    """
+    A read-only process entry returned by ProcessEntries.list and iter_list.
+    Adding data or submitting promotes it to a full asyncio ProcessEntry.
+    """
+    __slots__ = ()
+    _full_class = ProcessEntry
+
+class ProcessEntries:
+    """
+    A class for asyncio process entry data methods
+    """
+    @staticmethod
+    async def get(id):
+        """
+        Gets a process entry, if it exists
+        
+        Args:
+        - id: Process entry id
+
+        Returns:
+        - A process entry Python object
+        """
+        client = AsyncAPIClient()
+        entry = await client.make_api_request("/processes/entries", "GET", params={"id": id})
+        if len(entry) == 0:
+            raise SerialAPIException(f"Could not find process entry with id: {id}")
+        return ProcessEntry(entry[0])
+
+    @staticmethod
+    async def create(process_id, component_instance=None, component_instance_id=None, component_instance_identifier=None, station_id=None, timestamp=None, operator=None, stream=None):
+        """
+        Creates a process entry
+
+        Args:
+        - process_id: Process id 
+        - component_instance?: Component instance object 
+        - component_instance_id?: Component instance id (is overriden by component_instance)
+        - component_instance_identifier?: Component instance identifier (is overriden by component_instance & component_instance_id)
+        - station_id?: Optional station id to override the default station id
+        - timestamp?: Optional timestamp to override the default timestamp. Must be in ISO 8601 format
+        - operator?: Optional operator object
+        - stream?: Whether to send data points in the background as they are added.
+        Defaults to config.stream_data.
+
+        Returns:
+        - A process entry Python object
+        """
+        client = AsyncAPIClient()
+        if component_instance:
+            component_instance_id = component_instance.data["id"]
+        if not component_instance_id and not component_instance_identifier:
+            raise Exception("ComponentInstance id cannot be null, please pass in a valid one")
+        if component_instance_identifier:
+            component_instance_id = (await ComponentInstances.get(component_instance_identifier)).data["id"]
+        data = {"component_instance_id": component_instance_id, "process_id": process_id}
+        if station_id:
+            data["station_id"] = station_id
+        elif config.station_id:
+            data["station_id"] = config.station_id
+        if timestamp:
+            if not is_iso_timestamp(timestamp):
+                raise Exception("Timestamp must be in ISO 8601 format")
+            data["timestamp"] = timestamp
+        if operator:
+            data["operator_id"] = operator.data["id"]
+        entry = ProcessEntry(await client.make_api_request("/processes/entries", "POST", data=data))
+        if config.stream_data if stream is None else stream:
+            entry.start_streaming()
+        return entry
+
+    @staticmethod
+    async def list(query_params):
+        """
+        Lists process entries
+
+        Args:
+        - query_params: Query parameters for filtering process entries as defined at
+        https://docs.serial.io/api-reference/process-entries/get-process-entries
+
+        Returns:
+        - A list of read-only process entry records, which become full process
+        entry Python objects when data is added to them
+        """
+        client = AsyncAPIClient()
+        entries = await client.make_api_request("/processes/entries", "GET", params=query_params)
+        return [ProcessEntryRecord(entry) for entry in entries]
+
+    @staticmethod
+    async def iter_list(query_params=None, page_size=None, prefetch=True):
+        """
+        Iterates over process entries a page at a time
+
+        Args:
+        - query_params?: Query parameters for filtering process entries, as for list
+        - page_size?: Process entries per request (defaults to config.list_page_size)
+        - prefetch?: Whether to fetch the next page while the current one is consumed
+
+        Returns:
+        - An async generator of read-only process entry records, as for list
+        """
+        async for page in aiter_pages(AsyncAPIClient(), "/processes/entries", query_params, page_size, prefetch):
+            for entry in page:
+                yield ProcessEntryRecord(entry)
+
+    @staticmethod
+    async def stream_list(query_params=None):
+        """
+        Lists process entries with a single request, decoding each record as it arrives
+
+        Args:
+        - query_params?: Query parameters for filtering process entries, as for list
+
+        Returns:
+        - An async generator of read-only process entry records, as for list
+        """
+        async for entry in AsyncAPIClient().iter_api_request("/processes/entries", params=query_params):
+            yield ProcessEntryRecord(entry)
@@ -1,19 +1,51 @@
+import logging
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
 from . import config
-from .exceptions import SerialAPIException
+from .exceptions import SerialAPIException, SerialConnectionError
+from .instrumentation import RequestEvent, request_finished, request_started
+from .retry import RetryBudget, RetryStats, endpoint_template, get_retry_policy
+from .utils.compression import compress_body, compress_upload
+from .utils.multipart import MultipartEncoder, UploadStats
+from .utils.serialization import JSONArrayParser, get_serializer
+from .worker_pool import get_worker_pool
 
 class SingletonMeta(type):
     """
     This is a thread-safe implementation of Singleton.
     """
     _instances = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
+            with cls._lock:
+                if cls not in cls._instances:
+                    instance = super().__call__(*args, **kwargs)
+                    cls._instances[cls] = instance
         return cls._instances[cls]
 
+logger = logging.getLogger("serialmfg")
+
+# Failures that leave no response to inspect
+_TRANSPORT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                     requests.exceptions.ChunkedEncodingError)
+
+def _is_connect_error(error):
+    """
+    Returns:
+    - True if the request failed before anything was sent, so retrying any method is safe
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", error.args[0])
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+    return False
+
 class APIClient(metaclass=SingletonMeta):
     def __init__(self):
         # The init method should only be called once.
@@ -21,69 +53,298 @@ class APIClient(metaclass=SingletonMeta):
             raise ValueError("API client requires an API key and base URL")
 
         self.session = requests.Session()
+        self.upload_stats = UploadStats()
+        self.retry_stats = RetryStats()
+        self.retry_budget = RetryBudget(config.retry_budget_ratio, config.retry_budget_reserve)
+        self.configure_pool()
         self.update_headers()
 
+    def configure_pool(self):
+        """
+        Mounts HTTP adapters sized from config (pool_connections, pool_maxsize,
+        pool_block and keep_alive), or config.transport if one is set.
+        Connections held by the previous adapters are closed.
+        """
+        pool_maxsize = config.pool_maxsize or config.max_workers
+        for prefix in ("https://", "http://"):
+            old_adapter = self.session.adapters.get(prefix)
+            if config.transport is not None:
+                self.session.mount(prefix, config.transport)
+            else:
+                self.session.mount(prefix, HTTPAdapter(pool_connections=config.pool_connections,
+                                                       pool_maxsize=pool_maxsize,
+                                                       pool_block=config.pool_block))
+            if old_adapter is not None and old_adapter is not config.transport:
+                old_adapter.close()
+        if config.keep_alive:
+            self.session.headers.pop("Connection", None)
+        else:
+            self.session.headers["Connection"] = "close"
+
+    def pool_stats(self):
+        """
+        Returns:
+        - A list with one dictionary per connection pool (one per host), holding
+          the pool's size, connections created, requests made, and idle and in
+          use connections
+        """
+        stats = []
+        for prefix in ("https://", "http://"):
+            adapter = self.session.adapters[prefix]
+            if not isinstance(adapter, HTTPAdapter):
+                # A custom transport has no connection pools
+                continue
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+                stats.append({
+                    "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                    "maxsize": pool.pool.maxsize,
+                    "connections_created": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "idle_connections": idle,
+                    "in_use_connections": pool.pool.maxsize - pool.pool.qsize(),
+                })
+        return stats
+
+    @property
+    def worker_pool(self):
+        """
+        The bounded worker pool used to run requests concurrently
+        """
+        return get_worker_pool()
+
     def update_headers(self):
         if config.api_key:
             self.session.headers.update({'Authorization': f'Bearer {config.api_key}'})
 
+    def _request(self, method, endpoint, **kwargs):
+        # Headers are passed per request rather than mutated on the shared session,
+        # so threads sharing the session never race on its headers
+        headers = {'Authorization': f'Bearer {config.api_key}', **kwargs.pop("headers", {})}
+        return self.session.request(method, f"{config.base_url}{endpoint}", headers=headers,
+                                    timeout=(config.connect_timeout, config.read_timeout), **kwargs)
+
     def make_api_request(self, endpoint, method, params=None, data=None, files=None):
-        self.update_headers()
-        if method == "GET":
-            response = self._get(endpoint, params)
-        elif method == "POST" and not files:
-            response = self._post(endpoint, data=data)
-        elif method == "POST" and files:
-            response = self._post_files(endpoint, files=files)
-        elif method == "PUT":
-            response = self._put(endpoint, data)
-        elif method == "PATCH":
-            response = self._patch(endpoint, data)
-        elif method == "DELETE":
-            response = self._delete(endpoint, data)
-        else:
+        if method not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
             print(f"{method} is not supported by the serial python library")
             return None
-        
+        event = RequestEvent(method, endpoint_template(endpoint), endpoint)
+        request_started(event)
+        started = time.perf_counter()
+        try:
+            return self._make_api_request(endpoint, method, params, data, files, event)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.seconds = time.perf_counter() - started
+            request_finished(event)
+
+    def iter_api_request(self, endpoint, params=None):
+        """
+        Makes a GET request to an endpoint returning a JSON list, decoding the
+        response as it arrives rather than reading it whole first
+
+        Args:
+        - endpoint: List endpoint, e.g. /processes/entries
+        - params?: Query parameters
+
+        Returns:
+        - A generator of the list's items
+        """
+        event = RequestEvent("GET", endpoint_template(endpoint), endpoint)
+        request_started(event)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self._make_api_request(endpoint, "GET", params, None, None, event, stream=True)
+            parser = JSONArrayParser()
+            try:
+                for chunk in response.iter_content(config.stream_chunk_size):
+                    event.bytes_received += len(chunk)
+                    yield from parser.feed(chunk)
+                parser.close()
+            except _TRANSPORT_ERRORS as e:
+                raise SerialConnectionError(f"API request failed: {e}") from e
+            except ValueError as e:
+                raise SerialAPIException(f"API request failed: invalid list response ({e})",
+                                         status_code=response.status_code) from e
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            if response is not None:
+                response.close()
+            event.seconds = time.perf_counter() - started
+            request_finished(event)
+
+    def _make_api_request(self, endpoint, method, params, data, files, event, stream=False):
+        # Stream the multipart body from disk instead of building it in memory
+        body = compress_upload(MultipartEncoder(files)) if method == "POST" and files else None
+        policy = get_retry_policy(endpoint)
+        template = event.endpoint
+        self.retry_budget.deposit()
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            response, error = None, None
+            try:
+                response = self._send(endpoint, method, params, data, body, stream)
+            except _TRANSPORT_ERRORS as e:
+                error = e
+            event.retries = attempt
+            if response is not None:
+                event.status = response.status_code
+                event.bytes_sent += _body_size(getattr(response.request, "body", None))
+                if not (stream and response.ok):
+                    event.bytes_received += len(response.content)
+            else:
+                event.status = None
+            if response is not None and response.ok:
+                break
+            delay = policy.get_delay(method, attempt, time.monotonic() - started,
+                                     status=response.status_code if response is not None else None,
+                                     retry_after=response.headers.get("Retry-After") if response is not None else None,
+                                     connect_error=_is_connect_error(error), error=error is not None)
+            budget_exhausted = delay is not None and not self.retry_budget.withdraw()
+            if delay is None or budget_exhausted:
+                if attempt or budget_exhausted:
+                    self.retry_stats.record_outcome(template, False, budget_exhausted)
+                break
+            self._log("Retrying %s %s in %.2fs", method, endpoint, delay)
+            self.retry_stats.record_retry(template, delay)
+            time.sleep(delay)
+            attempt += 1
+        if attempt and response is not None and response.ok:
+            self.retry_stats.record_outcome(template, True)
+
+        if error is not None:
+            raise SerialConnectionError(f"API request failed: {error}") from error
         if not response.ok:
             raise SerialAPIException(f"API request failed: {response.text}", status_code=response.status_code)
-        return response.json()
+        if stream:
+            return response
+        return get_serializer().loads(response.content)
+
+    def _send(self, endpoint, method, params=None, data=None, body=None, stream=False):
+        if method == "GET":
+            return self._get(endpoint, params, stream)
+        elif method == "POST" and body is not None:
+            body.reset()
+            return self._post_files(endpoint, body)
+        elif method == "POST":
+            return self._post(endpoint, data=data)
+        elif method == "PUT":
+            return self._put(endpoint, data)
+        elif method == "PATCH":
+            return self._patch(endpoint, data)
+        elif method == "DELETE":
+            return self._delete(endpoint, data)
     
     def _error(self, message):
         print(f"ERROR: {message}")
 
-    def _log(self, message):
-        pass
-        # TODO: debug logging
-        #print(f"DEBUG: {message}")
+    def _log(self, message, *args):
+        # Arguments are only formatted when debug logging is enabled for "serialmfg"
+        logger.debug(message, *args)
 
-    def _get(self, endpoint, params=None):
-        self._log(f"GET request to {endpoint} with params {params}")
-        response = self.session.get(f"{config.base_url}{endpoint}", params=params) 
+    def _get(self, endpoint, params=None, stream=False):
+        self._log("GET request to %s with params %s", endpoint, params)
+        response = self._request("GET", endpoint, params=params, stream=stream)
         return response
 
+    def _json_body(self, data):
+        # Encoded with the configured serializer rather than requests' json=,
+        # and compressed if config.compression is set and the body is large enough
+        if data is None:
+            return {}
+        body, encoding = compress_body(get_serializer().dumps(data))
+        headers = {"Content-Type": "application/json"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return {"data": body, "headers": headers}
+
     def _post(self, endpoint, data=None):
-        self._log(f"POST request to {endpoint} with data {data}")
-        response = self.session.post(f"{config.base_url}{endpoint}", json=data) 
+        self._log("POST request to %s with data %s", endpoint, data)
+        response = self._request("POST", endpoint, **self._json_body(data))
         return response
 
-    def _post_files(self, endpoint, files):
-        self._log(f"POST request to {endpoint} with file") 
-        response = self.session.post(f"{config.base_url}{endpoint}", files=files)
+    def _post_files(self, endpoint, body):
+        self._log("POST request to %s with file", endpoint)
+        started = time.perf_counter()
+        ok = False
+        try:
+            headers = {"Content-Type": body.content_type}
+            if body.content_encoding:
+                headers["Content-Encoding"] = body.content_encoding
+            response = self._request("POST", endpoint, data=body, headers=headers)
+            ok = response.ok
+        finally:
+            self.upload_stats.record(body.bytes_read, time.perf_counter() - started, ok)
         return response
 
     def _put(self, endpoint, data=None):
-        self._log(f"PUT request to {endpoint} with data {data}")
-        response = self.session.put(f"{config.base_url}{endpoint}", json=data)
+        self._log("PUT request to %s with data %s", endpoint, data)
+        response = self._request("PUT", endpoint, **self._json_body(data))
         return response
 
     def _patch(self, endpoint, data=None):
-        self._log(f"PATCH request to {endpoint} with data {data}")
-        response = self.session.patch(f"{config.base_url}{endpoint}", json=data)
+        self._log("PATCH request to %s with data %s", endpoint, data)
+        response = self._request("PATCH", endpoint, **self._json_body(data))
         return response
 
     def _delete(self, endpoint, data=None):
-        self._log(f"DELETE request to {endpoint} with data {data}")
-        response = self.session.delete(f"{config.base_url}{endpoint}", json=data)
+        self._log("DELETE request to %s with data %s", endpoint, data)
+        response = self._request("DELETE", endpoint, **self._json_body(data))
         return response
 
+
+def _body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    # A streamed multipart body, whose length is only known up front if it is not compressed
+    return getattr(body, "len", None) or getattr(body, "bytes_read", 0)
+
+
+_POOL_OPTIONS = ("pool_connections", "pool_maxsize", "pool_block", "keep_alive", "connect_timeout", "read_timeout")
+
+def configure_connection_pool(**options):
+    """
+    Updates the HTTP connection pool settings and applies them to the client,
+    if it has already been created
+
+    Args:
+    - pool_connections?: Number of per-host connection pools to keep
+    - pool_maxsize?: Connections kept per host (None matches max_workers)
+    - pool_block?: Whether to wait for a free connection instead of opening a throwaway one
+    - keep_alive?: Whether to reuse connections between requests
+    - connect_timeout?: Seconds to wait for a connection (None waits forever)
+    - read_timeout?: Seconds to wait for response data (None waits forever)
+    """
+    for key, value in options.items():
+        if key not in _POOL_OPTIONS:
+            raise ValueError(f"Unknown connection pool option: {key}")
+        setattr(config, key, value)
+    client = SingletonMeta._instances.get(APIClient)
+    if client is not None:
+        client.configure_pool()
+
+
+def set_transport(transport):
+    """
+    Sends every request through a requests transport adapter instead of over
+    HTTP, e.g. serialmfg.testing.FakeTransport to run station code offline
+
+    Args:
+    - transport: A requests.adapters.BaseAdapter, or None to go back to HTTP
+    """
+    config.transport = transport
+    client = SingletonMeta._instances.get(APIClient)
+    if client is not None:
+        client.configure_pool()
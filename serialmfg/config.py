@@ -1,3 +1,93 @@
 api_key = None
 base_url = "https://api.serial.io"
 station_id = None
+
+# Dataset lookups are cached per (name, type, process_id). Set the size to 0 to
+# disable caching, and the TTL (seconds) to None to keep entries until evicted.
+dataset_cache_size = 1024
+dataset_cache_ttl = None
+
+# Component instance lookups are cached by identifier and by id. Instances change
+# as they move through production, so cached entries expire after a minute.
+component_instance_cache_size = 4096
+component_instance_cache_ttl = 60
+
+# Components are cached by name and part numbers by (part number, component id)
+# when ComponentInstances.create resolves them
+component_cache_size = 256
+component_cache_ttl = None
+part_number_cache_size = 1024
+part_number_cache_ttl = None
+
+# Operator lookups are cached by name and PIN. Entries expire after five minutes
+# so PIN changes and deactivated operators are picked up.
+operator_cache_size = 1024
+operator_cache_ttl = 300
+
+# Size of the worker pool shared by every process entry submission
+max_workers = 16
+
+# HTTP connection pooling. pool_maxsize defaults to max_workers so every worker
+# can hold a connection; timeouts are in seconds (None waits forever).
+pool_connections = 10
+pool_maxsize = None
+pool_block = False
+keep_alive = True
+connect_timeout = 10
+read_timeout = None
+
+# Transport. A requests transport adapter (e.g. serialmfg.testing.FakeTransport)
+# that every request is sent through instead of the pooled HTTP adapters.
+transport = None
+
+# Retries. retry_policy is a serialmfg.retry.RetryPolicy (None uses the default
+# policy) and retry_overrides maps endpoint templates or glob patterns to policies.
+# Retries across the client are limited to retry_budget_ratio per request on top
+# of retry_budget_reserve.
+retry_policy = None
+retry_overrides = {}
+retry_budget_ratio = 0.2
+retry_budget_reserve = 10
+
+# Batched data points. When batch_submit is on, submit() adds queued data points
+# batch_size at a time with a PUT of a JSON list to batch_endpoint, falling back
+# to one request per data point if the server does not support it.
+batch_submit = False
+batch_size = 500
+batch_endpoint = "/processes/entries/{id}/data"
+
+# Streaming. When stream_data is on, process entries send each data point in the
+# background as soon as it is added, so submit() only waits for what is left.
+stream_data = False
+
+# Background submission. submit_async runs up to submit_workers submissions at a
+# time, and pending ones get submit_drain_timeout seconds to finish at exit.
+submit_workers = 4
+submit_drain_timeout = 30
+
+# Request metrics. While collect_metrics is on, every API request is recorded in
+# the registry returned by serial.get_metrics_registry(), with latency histogram
+# buckets bounded by metrics_latency_buckets (seconds).
+collect_metrics = True
+metrics_latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Paging for iter_list. Rows are requested list_page_size at a time using the
+# page_limit_param and page_offset_param query parameters.
+list_page_size = 100
+page_limit_param = "limit"
+page_offset_param = "offset"
+
+# JSON. serializer is "orjson", "stdlib" or an object with dumps/loads, and None
+# uses orjson when it is installed. Streamed list responses are read and decoded
+# stream_chunk_size bytes at a time.
+serializer = None
+stream_chunk_size = 64 * 1024
+
+# Compression. When compression is "gzip" or "zstd", JSON request bodies of at
+# least compression_min_size bytes are compressed (at compression_level, None
+# for the codec's default), as are uploads of compressible files if
+# compress_files is on. The server must accept the Content-Encoding.
+compression = None
+compression_min_size = 1024
+compression_level = None
+compress_files = False
@@ -16,3 +16,9 @@ class SerialAPIException(Exception):
             return f"APIException {self.status_code}: {self.message}"
         else:
             return f"APIException: {self.message}"
+
+class SerialConnectionError(SerialAPIException):
+    """Exception raised when the Serial API could not be reached, or the
+    connection failed before a response was received, after all retries.
+    """
+    pass
@@ -0,0 +1,219 @@
+"""
+This file contains the request instrumentation used by the API clients: hooks
+called before and after every API request, and an in-process metrics registry
+with per-endpoint counters and latency histograms that can be read as a
+dictionary or dumped in the Prometheus text format
+"""
+import bisect
+import threading
+from . import config
+
+
+class RequestEvent:
+    """
+    A single API request, as passed to request hooks. Before hooks see the
+    request fields; after hooks also see the outcome.
+    """
+    __slots__ = ("method", "endpoint", "path", "status", "bytes_sent", "bytes_received", "retries", "seconds",
+                 "error")
+
+    def __init__(self, method, endpoint, path):
+        """
+        Args:
+        - method: HTTP method
+        - endpoint: Route template, e.g. /processes/entries/{id}
+        - path: Request path
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.path = path
+        # Outcome, filled in once the request finishes. status is None if no
+        # response was received
+        self.status = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.seconds = 0.0
+        self.error = None
+
+    def __repr__(self):
+        return (f"<RequestEvent {self.method} {self.endpoint} status={self.status} retries={self.retries} "
+                f"seconds={self.seconds:.4f}>")
+
+
+_before_hooks = []
+_after_hooks = []
+
+
+def add_request_hooks(before=None, after=None):
+    """
+    Registers functions called with a RequestEvent around every API request,
+    sync and asyncio. Hooks run on the thread making the request, so they
+    should be fast; errors they raise are printed and otherwise ignored.
+
+    Args:
+    - before?: Called before the first attempt
+    - after?: Called once the request has succeeded or failed, after any retries
+    """
+    if before is not None:
+        _before_hooks.append(before)
+    if after is not None:
+        _after_hooks.append(after)
+
+
+def remove_request_hooks(before=None, after=None):
+    """
+    Unregisters hooks added with add_request_hooks
+    """
+    if before in _before_hooks:
+        _before_hooks.remove(before)
+    if after in _after_hooks:
+        _after_hooks.remove(after)
+
+
+def _call_hooks(hooks, event):
+    for hook in list(hooks):
+        try:
+            hook(event)
+        except Exception as e:
+            print(f"An error occurred in a request hook: {e}")
+
+
+def request_started(event):
+    if _before_hooks:
+        _call_hooks(_before_hooks, event)
+
+
+def request_finished(event):
+    if config.collect_metrics:
+        _registry.record(event)
+    if _after_hooks:
+        _call_hooks(_after_hooks, event)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe request counters and latency histograms per (method, endpoint template)
+    """
+    def __init__(self, buckets=None):
+        """
+        Args:
+        - buckets?: Upper bounds in seconds of the latency histogram buckets
+          (defaults to config.metrics_latency_buckets)
+        """
+        self.buckets = tuple(sorted(buckets or config.metrics_latency_buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _new_series(self):
+        return {"requests": 0, "errors": 0, "retries": 0, "bytes_sent": 0, "bytes_received": 0,
+                "seconds": 0.0, "statuses": {}, "buckets": [0] * (len(self.buckets) + 1)}
+
+    def record(self, event):
+        """
+        Adds a finished request to the metrics
+        """
+        bucket = bisect.bisect_left(self.buckets, event.seconds)
+        status = str(event.status) if event.status is not None else "error"
+        with self._lock:
+            series = self._series.get((event.method, event.endpoint))
+            if series is None:
+                series = self._series[(event.method, event.endpoint)] = self._new_series()
+            series["requests"] += 1
+            series["errors"] += event.error is not None
+            series["retries"] += event.retries
+            series["bytes_sent"] += event.bytes_sent
+            series["bytes_received"] += event.bytes_received
+            series["seconds"] += event.seconds
+            series["statuses"][status] = series["statuses"].get(status, 0) + 1
+            series["buckets"][bucket] += 1
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary of "METHOD /endpoint/template" to request, error and retry
+          counts, bytes sent and received, total and mean seconds, counts per
+          status ("error" when no response was received), and latency
+          percentiles estimated from the histogram
+        """
+        with self._lock:
+            series = {key: {**value, "statuses": dict(value["statuses"]), "buckets": list(value["buckets"])}
+                      for key, value in self._series.items()}
+        stats = {}
+        for (method, endpoint), value in sorted(series.items()):
+            buckets = value.pop("buckets")
+            value["mean_seconds"] = value["seconds"] / value["requests"] if value["requests"] else 0.0
+            for quantile in (0.5, 0.9, 0.99):
+                value[f"p{round(quantile * 100)}_seconds"] = self._quantile(buckets, value["requests"], quantile)
+            stats[f"{method} {endpoint}"] = value
+        return stats
+
+    def _quantile(self, buckets, count, quantile):
+        # The upper bound of the bucket holding the quantile; None past the last bound
+        rank = quantile * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_prometheus(self, prefix="serialmfg"):
+        """
+        Returns:
+        - The metrics in the Prometheus text exposition format
+        """
+        with self._lock:
+            series = {key: {**value, "statuses": dict(value["statuses"]), "buckets": list(value["buckets"])}
+                      for key, value in sorted(self._series.items())}
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def labels(method, endpoint, **extra):
+            pairs = {"method": method, "endpoint": endpoint, **extra}
+            return ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items())
+
+        metric("requests_total", "counter", "API requests by response status")
+        for (method, endpoint), value in series.items():
+            for status, count in sorted(value["statuses"].items()):
+                lines.append(f"{prefix}_requests_total{{{labels(method, endpoint, status=status)}}} {count}")
+        for name, key, help_text in (("request_errors_total", "errors", "API requests that failed"),
+                                     ("request_retries_total", "retries", "Retried attempts"),
+                                     ("request_sent_bytes_total", "bytes_sent", "Request body bytes sent"),
+                                     ("response_received_bytes_total", "bytes_received", "Response body bytes received")):
+            metric(name, "counter", help_text)
+            for (method, endpoint), value in series.items():
+                lines.append(f"{prefix}_{name}{{{labels(method, endpoint)}}} {value[key]}")
+        metric("request_duration_seconds", "histogram", "API request wall time, including retries")
+        for (method, endpoint), value in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), value["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{prefix}_request_duration_seconds_bucket{{{labels(method, endpoint, le=le)}}} {cumulative}")
+            lines.append(f"{prefix}_request_duration_seconds_sum{{{labels(method, endpoint)}}} {value['seconds']}")
+            lines.append(f"{prefix}_request_duration_seconds_count{{{labels(method, endpoint)}}} {value['requests']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    """
+    Returns:
+    - The process-wide MetricsRegistry that every API request is recorded in
+      while config.collect_metrics is on
+    """
+    return _registry
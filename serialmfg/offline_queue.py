@@ -0,0 +1,338 @@
+"""
+This file contains the OfflineQueue class, an opt-in durable write-ahead queue
+for process entries. When the Serial API cannot be reached, entry creation,
+queued data points (files are recorded by path) and the final submit are
+journaled to a local SQLite database in WAL mode, and a background drainer
+replays them in order once the API is reachable again.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from .exceptions import SerialAPIException, SerialConnectionError
+
+LOCAL_ID_PREFIX = "local-"
+_WAL_SIZE_LIMIT = 4 * 1024 * 1024
+
+# Statuses that mean the API turned the request away unprocessed, so replaying it cannot apply it twice.
+# Other server errors may come after the request was applied and are treated as permanent.
+_TRANSIENT_STATUSES = (408, 429, 503)
+
+
+class OfflineQueueFull(SerialAPIException):
+    """
+    Exception for when the offline queue has reached its disk usage limit
+    """
+    pass
+
+
+def is_connectivity_error(error):
+    """
+    Returns:
+    - True if the error means the server never processed the request, so it
+      should be replayed later rather than dropped
+    """
+    if isinstance(error, SerialConnectionError):
+        return True
+    return isinstance(error, SerialAPIException) and error.status_code in _TRANSIENT_STATUSES
+
+
+class OfflineQueue:
+    """
+    A durable, size bounded, in-order queue of process entry operations
+    """
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, drain_interval=5.0):
+        """
+        Args:
+        - path: Path of the SQLite database file
+        - max_bytes?: Disk space the queue may use before enqueueing raises OfflineQueueFull
+        - drain_interval?: Seconds between replay attempts while operations are pending
+
+        Returns:
+        - An open queue; call start() to replay in the background
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.drain_interval = drain_interval
+        self._lock = threading.RLock()
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._offline = False
+        self.replayed = 0
+        self.replay_failures = 0
+        self.replay_seconds = 0.0
+        self.last_drain_at = None
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        # The WAL is truncated back to this size after each checkpoint
+        self._db.execute(f"PRAGMA journal_size_limit={_WAL_SIZE_LIMIT}")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS operations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                entry_id TEXT PRIMARY KEY,
+                remote_id TEXT,
+                process_id TEXT,
+                component_instance_id TEXT
+            );
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                seq INTEGER PRIMARY KEY,
+                entry_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                failed_at REAL NOT NULL
+            );
+        """)
+        self._offline = self.pending_count() > 0
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    # ----------- Journaling ----------- #
+
+    def bytes_used(self):
+        """
+        Returns:
+        - Bytes of the database in use, excluding pages freed by replayed
+          operations. The write-ahead log adds at most 4 MB on top of this.
+        """
+        with self._lock:
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+    def enqueue(self, entry_id, kind, payload):
+        """
+        Durably appends an operation
+
+        Args:
+        - entry_id: Local or remote id of the process entry the operation belongs to
+        - kind: "create", "data" or "submit"
+        - payload: JSON-serializable operation arguments
+        """
+        encoded = json.dumps(payload)
+        with self._lock:
+            if self.bytes_used() + len(encoded) > self.max_bytes:
+                raise OfflineQueueFull(f"Offline queue at {self.path} is full ({self.max_bytes} bytes)")
+            self._db.execute("INSERT INTO operations (entry_id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                             (entry_id, kind, encoded, time.time()))
+        self._wake.set()
+
+    def register_entry(self, entry_id, process_id, component_instance_id=None, remote_id=None):
+        """
+        Records a process entry that operations refer to. Entries created while
+        offline get a local id and no remote id until their create is replayed.
+        """
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                             (entry_id, remote_id, process_id, component_instance_id))
+
+    def new_local_id(self):
+        return f"{LOCAL_ID_PREFIX}{uuid.uuid4()}"
+
+    def pending_count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+
+    def dead_letters(self):
+        """
+        Returns:
+        - A list of operations that could not be replayed, with their errors
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT seq, entry_id, kind, payload, error, failed_at FROM dead_letters ORDER BY seq").fetchall()
+        return [{"seq": seq, "entry_id": entry_id, "kind": kind, "payload": json.loads(payload), "error": error,
+                 "failed_at": failed_at} for seq, entry_id, kind, payload, error, failed_at in rows]
+
+    def is_offline(self):
+        """
+        Returns:
+        - True while the API is believed to be unreachable or older operations
+          are still waiting to be replayed, in which case new work is journaled
+          directly instead of being tried online first
+        """
+        return self._offline
+
+    def mark_offline(self):
+        self._offline = True
+        self._wake.set()
+
+    # ----------- Replay ----------- #
+
+    def drain(self, max_operations=None):
+        """
+        Replays pending operations in order until the queue is empty, the API is
+        unreachable, or max_operations have been replayed. Operations that fail
+        permanently are moved to the dead letter table.
+
+        Returns:
+        - The number of operations replayed successfully
+        """
+        from .serial_resources.process_entry import replay_operation
+
+        replayed = 0
+        # Only one drain runs at a time; the database lock is only held between
+        # requests so journaling never waits on the network
+        with self._drain_lock:
+            while max_operations is None or replayed < max_operations:
+                with self._lock:
+                    row = self._db.execute("SELECT seq, entry_id, kind, payload, created_at FROM operations ORDER BY seq LIMIT 1").fetchone()
+                    if row is None:
+                        self._offline = False
+                        break
+                    seq, entry_id, kind, payload, created_at = row
+                    entry = self._db.execute("SELECT remote_id, process_id, component_instance_id FROM entries WHERE entry_id = ?",
+                                             (entry_id,)).fetchone()
+                started = time.perf_counter()
+                try:
+                    if entry is None or (kind != "create" and entry[0] is None):
+                        raise SerialAPIException(f"Process entry {entry_id} was never created")
+                    result = replay_operation(kind, json.loads(payload), *entry)
+                except Exception as e:
+                    self.replay_seconds += time.perf_counter() - started
+                    with self._lock:
+                        if is_connectivity_error(e):
+                            self._offline = True
+                            self._db.execute("UPDATE operations SET attempts = attempts + 1, last_error = ? WHERE seq = ?", (str(e), seq))
+                            break
+                        self.replay_failures += 1
+                        with self._transaction():
+                            self._db.execute("INSERT INTO dead_letters VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                             (seq, entry_id, kind, payload, str(e), created_at, time.time()))
+                            self._db.execute("DELETE FROM operations WHERE seq = ?", (seq,))
+                    continue
+                self.replay_seconds += time.perf_counter() - started
+                with self._lock:
+                    with self._transaction():
+                        if kind == "create":
+                            self._db.execute("UPDATE entries SET remote_id = ?, component_instance_id = ? WHERE entry_id = ?",
+                                             (result["id"], result["unique_identifier_id"], entry_id))
+                        self._db.execute("DELETE FROM operations WHERE seq = ?", (seq,))
+                    self.replayed += 1
+                replayed += 1
+            self.last_drain_at = time.time()
+        return replayed
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.drain_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if self.pending_count():
+                try:
+                    self.drain()
+                except Exception as e:
+                    print(f"An error occurred while replaying the offline queue: {e}")
+                if self._offline:
+                    # Wait out the interval before trying the network again
+                    self._stop.wait(self.drain_interval)
+
+    def start(self):
+        """
+        Starts the background drainer thread
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="serialmfg-offline-drainer", daemon=True)
+            self._thread.start()
+        self._wake.set()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stops the background drainer thread
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._db.close()
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary of pending and dead-lettered operation counts, disk usage,
+          replay counters and replay throughput in operations per second
+        """
+        with self._lock:
+            dead_letters = self._db.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+            return {
+                "pending": self.pending_count(),
+                "dead_letters": dead_letters,
+                "bytes_used": self.bytes_used(),
+                "max_bytes": self.max_bytes,
+                "offline": self._offline,
+                "replayed": self.replayed,
+                "replay_failures": self.replay_failures,
+                "replay_ops_per_second": self.replayed / self.replay_seconds if self.replay_seconds else 0.0,
+                "last_drain_at": self.last_drain_at,
+            }
+
+
+_queue = None
+
+
+def enable_offline_queue(path, max_bytes=256 * 1024 * 1024, drain_interval=5.0):
+    """
+    Turns on offline journaling for process entries and starts the drainer.
+    Operations left in the database by a previous run are replayed.
+
+    Args:
+    - path: Path of the SQLite database file
+    - max_bytes?: Disk space the queue may use
+    - drain_interval?: Seconds between replay attempts while operations are pending
+
+    Returns:
+    - The OfflineQueue
+    """
+    global _queue
+    disable_offline_queue()
+    _queue = OfflineQueue(path, max_bytes, drain_interval).start()
+    return _queue
+
+
+def disable_offline_queue():
+    """
+    Stops the drainer and closes the queue. Pending operations stay on disk and
+    are replayed the next time the queue is enabled with the same path.
+    """
+    global _queue
+    if _queue is not None:
+        _queue.close()
+        _queue = None
+
+
+def get_offline_queue():
+    """
+    Returns:
+    - The enabled OfflineQueue, or None
+    """
+    return _queue
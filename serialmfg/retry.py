@@ -0,0 +1,244 @@
+"""
+This file contains the retry policy used by the API clients: which failed
+requests are retried, how long to wait between attempts, and a client-wide
+retry budget that keeps retries from multiplying load during an outage
+"""
+import fnmatch
+import random
+import re
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from . import config
+
+_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$")
+
+
+def endpoint_template(endpoint):
+    """
+    Replaces id-like path segments so requests to the same route share a name
+
+    Args:
+    - endpoint: Request path, e.g. /processes/entries/2f02d2be-ece6-410f-ad80-ffd746988870
+
+    Returns:
+    - The route template, e.g. /processes/entries/{id}
+    """
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in endpoint.split("/"))
+
+
+def parse_retry_after(value):
+    """
+    Args:
+    - value: A Retry-After header, either delay seconds or an HTTP date
+
+    Returns:
+    - Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait first.
+
+    Responses with a status in retry_statuses are retried. 429 and 503 mean the
+    server did not act on the request, so they are retried for every method,
+    as are failures to connect. Other retryable statuses, and connections that
+    fail after the request was sent, are only retried for idempotent methods.
+    PUT is not idempotent by default: in this API it appends a data point or
+    creates a dataset or link. Opt in per endpoint for PUTs that are, e.g.
+    set_retry_policy(RetryPolicy(idempotent_methods=("GET", "PUT", "PATCH",
+    "DELETE")), endpoint="/components/instances").
+    """
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30, jitter=True,
+                 retry_statuses=(429, 500, 502, 503, 504), idempotent_methods=("GET", "PATCH", "DELETE"),
+                 respect_retry_after=True, total_timeout=120):
+        """
+        Args:
+        - max_retries?: Maximum retries per request (0 disables retries)
+        - backoff_factor?: Base delay in seconds; attempt n waits up to backoff_factor * 2 ** n
+        - max_backoff?: Upper bound on a single computed delay
+        - jitter?: Whether to randomize delays ("full jitter") so clients do not retry in lockstep
+        - retry_statuses?: HTTP statuses that are retried
+        - idempotent_methods?: Methods that are safe to repeat after the server may have acted
+        - respect_retry_after?: Whether to wait as long as a Retry-After header asks on 429/503
+        - total_timeout?: Seconds after the first attempt past which no retry is started
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(method.upper() for method in idempotent_methods)
+        self.respect_retry_after = respect_retry_after
+        self.total_timeout = total_timeout
+
+    def is_retryable(self, method, status=None, connect_error=False, error=False):
+        """
+        Args:
+        - method: HTTP method
+        - status?: Response status code, if a response was received
+        - connect_error?: True if no connection could be made, so nothing was sent
+        - error?: True if the request failed without a response
+
+        Returns:
+        - True if the request may be retried
+        """
+        if connect_error or status in (429, 503):
+            return connect_error or status in self.retry_statuses
+        if error or status in self.retry_statuses:
+            return method.upper() in self.idempotent_methods
+        return False
+
+    def get_delay(self, method, attempt, elapsed, status=None, retry_after=None, connect_error=False, error=False):
+        """
+        Args:
+        - method: HTTP method
+        - attempt: Number of retries already made for this request
+        - elapsed: Seconds since the first attempt
+        - status?, connect_error?, error?: How the last attempt failed (see is_retryable)
+        - retry_after?: Value of the response's Retry-After header
+
+        Returns:
+        - Seconds to wait before retrying, or None if the request should not be retried
+        """
+        if attempt >= self.max_retries:
+            return None
+        if not self.is_retryable(method, status, connect_error, error):
+            return None
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if self.respect_retry_after and status in (429, 503):
+            server_delay = parse_retry_after(retry_after)
+            if server_delay is not None:
+                delay = max(delay, server_delay)
+        if self.total_timeout is not None and elapsed + delay > self.total_timeout:
+            return None
+        return delay
+
+
+class RetryBudget:
+    """
+    A client-wide token bucket limiting retries to a fraction of requests.
+    Every request deposits `ratio` tokens and every retry spends one, so during
+    an outage retries add at most `ratio` extra load on top of a reserve.
+    """
+    def __init__(self, ratio=0.2, reserve=10):
+        """
+        Args:
+        - ratio?: Retries allowed per request, on average
+        - reserve?: Retries always available, and the initial balance
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = float(reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self._balance + self.ratio, self.reserve + 100 * self.ratio)
+
+    def withdraw(self):
+        """
+        Returns:
+        - True if a retry may be made
+        """
+        with self._lock:
+            if self._balance >= 1:
+                self._balance -= 1
+                return True
+            return False
+
+
+class RetryStats:
+    """
+    Thread-safe retry counters per endpoint template
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _counters(self, template):
+        return self._endpoints.setdefault(template, {"retries": 0, "recovered": 0, "exhausted": 0,
+                                                     "budget_exhausted": 0, "retry_wait_seconds": 0.0})
+
+    def record_retry(self, template, delay):
+        with self._lock:
+            counters = self._counters(template)
+            counters["retries"] += 1
+            counters["retry_wait_seconds"] += delay
+
+    def record_outcome(self, template, succeeded, budget_exhausted=False):
+        """
+        Records the outcome of a request that was retried at least once
+        """
+        with self._lock:
+            counters = self._counters(template)
+            if succeeded:
+                counters["recovered"] += 1
+            else:
+                counters["exhausted"] += 1
+            if budget_exhausted:
+                counters["budget_exhausted"] += 1
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary of endpoint template to retry, recovered, exhausted and
+          budget_exhausted counts and total seconds spent waiting to retry
+        """
+        with self._lock:
+            return {template: dict(counters) for template, counters in self._endpoints.items()}
+
+
+_default_policy = RetryPolicy()
+
+
+def set_retry_policy(policy, endpoint=None):
+    """
+    Sets the retry policy for every request, or for one endpoint
+
+    Args:
+    - policy: A RetryPolicy, or None to restore the default (for an endpoint,
+      None removes the override)
+    - endpoint?: Endpoint template or glob pattern, e.g. "/files" or "/processes/entries/*"
+    """
+    if endpoint is None:
+        config.retry_policy = policy
+    elif policy is None:
+        config.retry_overrides.pop(endpoint, None)
+    else:
+        config.retry_overrides[endpoint] = policy
+
+
+def get_retry_policy(endpoint):
+    """
+    Args:
+    - endpoint: Request path
+
+    Returns:
+    - The RetryPolicy that applies to the endpoint
+    """
+    if config.retry_overrides:
+        template = endpoint_template(endpoint)
+        for candidate in (endpoint, template):
+            if candidate in config.retry_overrides:
+                return config.retry_overrides[candidate]
+        for pattern, policy in config.retry_overrides.items():
+            if fnmatch.fnmatchcase(template, pattern) or fnmatch.fnmatchcase(endpoint, pattern):
+                return policy
+    return config.retry_policy or _default_policy
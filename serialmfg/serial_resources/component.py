@@ -0,0 +1,123 @@
+"""
+This file contains the Component class and the Components class.
+"""
+from ..api_client import APIClient
+from ..exceptions import SerialAPIException
+from ..utils.cache import UNSET, LRUCache
+from ..utils.single_flight import SingleFlight
+from .. import config
+
+# Process-wide cache of components, keyed by name
+_component_cache = LRUCache(config.component_cache_size, config.component_cache_ttl)
+# Concurrent lookups of the same component share a single request
+_component_flight = SingleFlight()
+
+class ComponentNotFound(SerialAPIException):
+    """
+    Exception for when a component is not found
+    """
+    pass
+
+class Components:
+    """
+    A class for component data methods
+    """
+    @staticmethod
+    def get(name):
+        """
+        Gets a component by name. Components are cached after the first lookup.
+
+        Args:
+        - name: User facing name for the component
+
+        Returns:
+        - A component Python object
+        """
+        component = _component_cache.get(name)
+        if component is None:
+            component, shared = _component_flight.do(name, Components._fetch_component, name)
+        return component
+
+    @staticmethod
+    def _fetch_component(name):
+        client = APIClient()
+        components = client.make_api_request("/components", "GET", params={"name": name})
+        if len(components) == 0:
+            raise ComponentNotFound(f"Component with name {name} does not exist")
+        component = Component(components[0])
+        _component_cache.set(name, component)
+        return component
+
+    @staticmethod
+    def prefetch(names=None):
+        """
+        Loads every component in one request and caches them, so later lookups
+        by name do not call the API
+
+        Args:
+        - names?: Only cache the components with these names
+
+        Returns:
+        - The number of components cached
+        """
+        client = APIClient()
+        components = [Component(component) for component in client.make_api_request("/components", "GET")]
+        if names is not None:
+            names = set(names)
+            components = [component for component in components if component.name in names]
+        for component in components:
+            _component_cache.set(component.name, component)
+        return len(components)
+
+    @staticmethod
+    def configure_cache(max_size=None, ttl=UNSET):
+        """
+        Replaces the component cache, dropping every cached component
+
+        Args:
+        - max_size?: Maximum number of cached components (0 disables caching)
+        - ttl?: Seconds a cached component stays valid (None keeps it until evicted;
+          left unchanged if omitted)
+        """
+        global _component_cache
+        if max_size is not None:
+            config.component_cache_size = max_size
+        if ttl is not UNSET:
+            config.component_cache_ttl = ttl
+        _component_cache = LRUCache(config.component_cache_size, config.component_cache_ttl)
+
+    @staticmethod
+    def invalidate_cache(name=None):
+        """
+        Removes one cached component, or every cached component if no name is given
+
+        Args:
+        - name?: Component name
+        """
+        _component_cache.invalidate(name)
+
+    @staticmethod
+    def cache_stats():
+        """
+        Returns:
+        - A dictionary of component cache hits, misses, evictions and size, along
+          with the number of lookups that shared a concurrent in-flight request
+        """
+        return {**_component_cache.stats(), "shared_lookups": _component_flight.stats()["shared"]}
+
+class Component:
+    """
+    A component Python object
+    """
+    def __init__(self, component_data):
+        """
+        Args:
+        - component_data: A component object, as defined at
+        https://docs.serial.io/api-reference/components/get-components
+
+        Returns:
+        - A component Python object, which holds the api object at data, the name at name and the id at id
+        """
+        self.data = component_data
+        self.name = component_data["name"]
+        self.id = component_data["id"]
@@ -1,10 +1,41 @@
 """
 This file contains the ComponentInstance class, which represents a component instance
 """
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from ..api_client import APIClient
 from ..exceptions import SerialAPIException
+from ..utils.cache import UNSET, LRUCache
+from ..utils.pagination import iter_pages
+from ..utils.single_flight import SingleFlight
+from .. import config
+from .component import Components
 from .component_instance_link import ComponentInstanceLink
 from .part_number import PartNumbers
+from .record import Record
+
+# Process-wide cache of component instance API objects, keyed by
+# ("identifier", identifier) and ("id", id)
+_component_instance_cache = LRUCache(config.component_instance_cache_size, config.component_instance_cache_ttl)
+# Concurrent lookups of the same component instance share a single request
+_component_instance_flight = SingleFlight()
+
+def _cache_component_instance(instance):
+    if instance.get("identifier"):
+        _component_instance_cache.set(("identifier", instance["identifier"]), instance)
+    _component_instance_cache.set(("id", instance["id"]), instance)
+
+def _cached_component_instance(identifier=None, id=None):
+    """
+    Returns:
+    - The cached API object for the identifier and id, or None
+    """
+    instance = _component_instance_cache.get(("identifier", identifier) if identifier else ("id", id))
+    if instance is not None and id and instance["id"] != id:
+        return None
+    return instance
 
 class ComponentInstance:
     """
@@ -79,6 +110,114 @@ class ComponentInstance:
         self.created_links.append(new_link)
         return new_link
 
+class ComponentInstanceRecord(Record):
+    """
+    A read-only component instance returned by ComponentInstances.list and
+    iter_list. Adding a link promotes it to a full ComponentInstance.
+    """
+    __slots__ = ()
+    _full_class = ComponentInstance
+    _full_attributes = ("client", "created_links")
+
+    @property
+    def id(self):
+        return self.data["id"]
+
+    @property
+    def identifier(self):
+        return self.data["identifier"]
+
+class BulkCreateResult:
+    """
+    The outcome of ComponentInstances.create_many
+    """
+    def __init__(self):
+        """
+        Returns:
+        - An empty result, which holds a dictionary of identifier to created
+        component instance record at created, identifiers that already existed
+        at existing, a dictionary of identifier to exception at failed,
+        identifiers skipped because the checkpoint already had them at skipped,
+        and the wall time at seconds
+        """
+        self.created = {}
+        self.existing = []
+        self.failed = {}
+        self.skipped = []
+        self.seconds = 0.0
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary of created, existing, failed and skipped counts, wall time
+        and component instances completed per second
+        """
+        completed = len(self.created) + len(self.existing) + len(self.failed)
+        return {
+            "created": len(self.created),
+            "existing": len(self.existing),
+            "failed": len(self.failed),
+            "skipped": len(self.skipped),
+            "seconds": self.seconds,
+            "per_second": completed / self.seconds if self.seconds else 0.0,
+        }
+
+def _open_checkpoint(path):
+    """
+    Returns:
+    - The identifiers already recorded in a create_many checkpoint, and the
+    checkpoint opened for appending
+    """
+    done = set()
+    if os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                try:
+                    done.add(json.loads(line)["identifier"])
+                except (ValueError, KeyError):
+                    # A line cut short when the previous run stopped
+                    continue
+    log = open(path, "a")
+    if log.tell():
+        with open(path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                log.write("\n")
+    return done, log
+
+def _run_creates(identifiers, component_id, part_number_id):
+    """
+    Creates component instances on the shared worker pool, with at most twice
+    the pool size queued at once
+
+    Returns:
+    - A generator of (identifier, API object, exception) tuples in completion order
+    """
+    def create(identifier):
+        try:
+            return identifier, ComponentInstances._put_component_instance(identifier, component_id, part_number_id), None
+        except SerialAPIException as e:
+            return identifier, None, e
+
+    pool = APIClient().worker_pool
+    if pool.in_worker():
+        # Waiting on the pool from one of its own workers could deadlock it
+        for identifier in identifiers:
+            yield create(identifier)
+        return
+    remaining = iter(identifiers)
+    in_flight = set()
+    while True:
+        for identifier in remaining:
+            in_flight.add(pool.submit(create, identifier))
+            if len(in_flight) >= 2 * pool.max_workers:
+                break
+        if not in_flight:
+            return
+        completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in completed:
+            yield future.result()
+
 class ComponentInstances:
     """
     A class for component instance data methods
@@ -90,10 +229,51 @@ class ComponentInstances:
         
         Args:
         - identifier: Component's user facing identifier
+        - id?: Component instance id
 
         Returns:
         - A component instance object 
         """
+        if identifier or id:
+            instance = _cached_component_instance(identifier, id)
+            if instance is None:
+                instance, shared = _component_instance_flight.do(
+                    (identifier, id), ComponentInstances._fetch_component_instance, identifier, id)
+            # Copy so changes to the returned object's data do not leak into the cache
+            return ComponentInstance(dict(instance))
+        return ComponentInstance(ComponentInstances._fetch_component_instance(identifier, id))
+
+    @staticmethod
+    def get_many(identifiers):
+        """
+        Gets several component instances at once. Instances that are not cached
+        are looked up concurrently on the shared worker pool.
+
+        Args:
+        - identifiers: Component instance identifiers
+
+        Returns:
+        - A dictionary of identifier to component instance object. Identifiers
+        that could not be found are left out.
+        """
+        identifiers = list(dict.fromkeys(identifiers))
+        pool = APIClient().worker_pool
+
+        def get(identifier):
+            try:
+                return ComponentInstances.get(identifier)
+            except SerialAPIException:
+                return None
+
+        if pool.in_worker() or len(identifiers) < 2:
+            # Waiting on the pool from one of its own workers could deadlock it
+            instances = [get(identifier) for identifier in identifiers]
+        else:
+            instances = [future.result() for future in [pool.submit(get, identifier) for identifier in identifiers]]
+        return {identifier: instance for identifier, instance in zip(identifiers, instances) if instance is not None}
+
+    @staticmethod
+    def _fetch_component_instance(identifier=None, id=None):
         client = APIClient() 
         # TODO: debug logging
         #print(f"Getting component instance: {identifier}")
@@ -107,7 +287,8 @@ class ComponentInstances:
             raise SerialAPIException(f"Component instance with identifier {identifier} does not exist")
         if len(returned_instances) > 1:
             raise SerialAPIException(f"Multiple component instances with identifier {identifier} exist. Please contact Serial support.")
-        return ComponentInstance(returned_instances[0])
+        _cache_component_instance(returned_instances[0])
+        return returned_instances[0]
     
     @staticmethod
     def create(identifier, component_name, part_number=None):
@@ -125,26 +306,130 @@ class ComponentInstances:
         """
         # TODO: debug logging
         #print(f"Creating component instance: {identifier} with component name: {component_name}")
-        client = APIClient() 
         # Get the component id for the given component name
-        component_name_params = {
-                "name" : component_name,
-                }
-        component = client.make_api_request(
-            "/components",
-            "GET",
-            params=component_name_params)
-        if len(component) == 0:
-            raise SerialAPIException(f"Component with name {component_name} does not exist")
-        component_id = component[0]["id"]
+        component_id = Components.get(component_name).id
+        part_number_id = None
+        if part_number:
+            part_number_id = PartNumbers.get_or_create_part_number(part_number, component_id).data["id"]
+        return ComponentInstance(dict(ComponentInstances._put_component_instance(identifier, component_id, part_number_id)))
+
+    @staticmethod
+    def _put_component_instance(identifier, component_id, part_number_id=None):
+        client = APIClient() 
         data = {
                 "component_id": component_id,
                 "identifier": identifier,
                 }
+        if part_number_id:
+            data["part_number_id"] = part_number_id
+        instance = client.make_api_request(f"/components/instances", "PUT", data=data)
+        # Replace whatever was cached for this identifier
+        previous = _component_instance_cache.peek(("identifier", identifier))
+        if previous is not None:
+            _component_instance_cache.invalidate(("id", previous["id"]))
+        _cache_component_instance(instance)
+        return instance
+
+    @staticmethod
+    def create_many(identifiers, component_name, part_number=None, checkpoint=None):
+        """
+        Creates many component instances of one component, e.g. for a reel of
+        labels. The component and part number are resolved once and the
+        instances are created concurrently on the shared worker pool. A failed
+        instance is reported without stopping the others.
+
+        Args:
+        - identifiers: Component instance identifiers to create
+        - component_name: User facing name for the component
+        - part_number?: Part number for the component instances
+        - checkpoint?: Path of a file that records every identifier as it is
+        created. Running again with the same checkpoint skips those identifiers,
+        so an interrupted batch can be resumed.
+
+        Returns:
+        - A BulkCreateResult with the created instances, failures and throughput
+        """
+        component_id = Components.get(component_name).id
+        part_number_id = None
         if part_number:
-            part_number = PartNumbers.get_or_create_part_number(part_number, component_id)
-            data["part_number_id"] = part_number.data["id"]
-        return ComponentInstance(client.make_api_request(f"/components/instances", "PUT", data=data)) 
+            part_number_id = PartNumbers.get_or_create_part_number(part_number, component_id).data["id"]
+        done, log = _open_checkpoint(checkpoint) if checkpoint else (set(), None)
+        result = BulkCreateResult()
+        pending = []
+        for identifier in dict.fromkeys(identifiers):
+            if identifier in done:
+                result.skipped.append(identifier)
+            else:
+                pending.append(identifier)
+
+        started = time.perf_counter()
+        try:
+            for identifier, instance, error in _run_creates(pending, component_id, part_number_id):
+                if error is None:
+                    result.created[identifier] = ComponentInstanceRecord(dict(instance))
+                elif getattr(error, "status_code", None) == 409:
+                    # Created by an earlier run that stopped before recording it
+                    result.existing.append(identifier)
+                else:
+                    result.failed[identifier] = error
+                    continue
+                if log is not None:
+                    log.write(json.dumps({"identifier": identifier}) + "\n")
+                    log.flush()
+        finally:
+            result.seconds = time.perf_counter() - started
+            if log is not None:
+                log.close()
+        return result
+
+    @staticmethod
+    def configure_cache(max_size=None, ttl=UNSET):
+        """
+        Replaces the component instance cache, dropping every cached instance
+
+        Args:
+        - max_size?: Maximum number of cache entries; each instance takes one per
+          identifier and one per id (0 disables caching)
+        - ttl?: Seconds a cached instance stays valid (None keeps it until evicted;
+          left unchanged if omitted)
+        """
+        global _component_instance_cache
+        if max_size is not None:
+            config.component_instance_cache_size = max_size
+        if ttl is not UNSET:
+            config.component_instance_cache_ttl = ttl
+        _component_instance_cache = LRUCache(config.component_instance_cache_size, config.component_instance_cache_ttl)
+
+    @staticmethod
+    def invalidate_cache(identifier=None, id=None):
+        """
+        Removes cached component instances. With no arguments the whole cache is
+        cleared, otherwise the instance with the given identifier or id is removed
+
+        Args:
+        - identifier?: Component instance identifier
+        - id?: Component instance id
+        """
+        if identifier is None and id is None:
+            _component_instance_cache.invalidate()
+            return
+        keys = {("identifier", identifier), ("id", id)}
+        for key in list(keys):
+            # Remove the instance under its other key too
+            instance = _component_instance_cache.peek(key)
+            if instance is not None:
+                keys.update({("identifier", instance.get("identifier")), ("id", instance["id"])})
+        _component_instance_cache.invalidate_where(lambda key: key in keys)
+
+    @staticmethod
+    def cache_stats():
+        """
+        Returns:
+        - A dictionary of component instance cache hits, misses, evictions and
+          size, along with the number of lookups that shared a concurrent
+          in-flight request
+        """
+        return {**_component_instance_cache.stats(), "shared_lookups": _component_instance_flight.stats()["shared"]}
 
     @staticmethod
     def list(query_params):
@@ -156,7 +441,8 @@ class ComponentInstances:
         https://docs.serial.io/api-reference/component-instances/get-component-instance
 
         Returns:
-        - A list of component instances, as defined at
+        - A list of read-only component instance records holding the component
+        instances, as defined at
         https://docs.serial.io/api-reference/component-instances/get-component-instance
         """
         # TODO: debug logging
@@ -164,5 +450,38 @@ class ComponentInstances:
 
         client = APIClient()
         instances = client.make_api_request("/components/instances", "GET", params=query_params)
-        instance_object_list = [ComponentInstance(instance) for instance in instances]
-        return instance_object_list 
+        instance_object_list = [ComponentInstanceRecord(instance) for instance in instances]
+        return instance_object_list
+
+    @staticmethod
+    def iter_list(query_params=None, page_size=None, prefetch=True):
+        """
+        Iterates over component instances a page at a time, so memory use does
+        not grow with the number of results
+
+        Args:
+        - query_params?: A dictionary of query parameters, as for list
+        - page_size?: Component instances per request (defaults to config.list_page_size)
+        - prefetch?: Whether to fetch the next page in the background
+
+        Returns:
+        - A generator of read-only component instance records, as for list
+        """
+        for page in iter_pages(APIClient(), "/components/instances", query_params, page_size, prefetch):
+            for instance in page:
+                yield ComponentInstanceRecord(instance)
+
+    @staticmethod
+    def stream_list(query_params=None):
+        """
+        Lists component instances with a single request, decoding each record as
+        it arrives instead of reading the whole response before the first one
+
+        Args:
+        - query_params?: A dictionary of query parameters, as for list
+
+        Returns:
+        - A generator of read-only component instance records, as for list
+        """
+        for instance in APIClient().iter_api_request("/components/instances", params=query_params):
+            yield ComponentInstanceRecord(instance)
@@ -3,6 +3,15 @@ This file contains the Dataset class and the Datasets class.
 """
 from ..api_client import APIClient
 from ..exceptions import SerialAPIException
+from ..utils.cache import UNSET, LRUCache
+from ..utils.single_flight import SingleFlight
+from .. import config
+
+# Process-wide cache of resolved datasets, keyed by (name, data_type, process_id)
+_dataset_cache = LRUCache(config.dataset_cache_size, config.dataset_cache_ttl)
+# Concurrent resolutions of the same dataset share a single get/create round trip
+_dataset_flight = SingleFlight()
+
 class DatasetNotFound(SerialAPIException):
     """
     Exception for when a dataset is not found
@@ -73,10 +82,70 @@ class Datasets:
         Returns:
         - A dataset Python object 
         """
+        key = (name, data_type, process_id)
+        dataset = _dataset_cache.get(key)
+        if dataset is not None:
+            return dataset, "found"
+        (dataset, status), shared = _dataset_flight.do(
+            key, Datasets._resolve_dataset, name, data_type, process_id, extra_params)
+        if shared:
+            # Only the caller that actually created the dataset should see "created"
+            status = "found"
+        return dataset, status
+
+    @staticmethod
+    def _resolve_dataset(name, data_type, process_id, extra_params=None):
         try:
-            return Datasets.get(name, data_type, process_id), "found"
+            dataset, status = Datasets.get(name, data_type, process_id), "found"
         except DatasetNotFound as e:
-            return Datasets.create(name, data_type, process_id, extra_params), "created"
+            dataset, status = Datasets.create(name, data_type, process_id, extra_params), "created"
+        _dataset_cache.set((name, data_type, process_id), dataset)
+        return dataset, status
+
+    @staticmethod
+    def configure_cache(max_size=None, ttl=UNSET):
+        """
+        Replaces the dataset cache, dropping every cached dataset
+
+        Args:
+        - max_size?: Maximum number of cached datasets (0 disables caching)
+        - ttl?: Seconds a cached dataset stays valid (None keeps it until evicted;
+          left unchanged if omitted)
+        """
+        global _dataset_cache
+        if max_size is not None:
+            config.dataset_cache_size = max_size
+        if ttl is not UNSET:
+            config.dataset_cache_ttl = ttl
+        _dataset_cache = LRUCache(config.dataset_cache_size, config.dataset_cache_ttl)
+
+    @staticmethod
+    def invalidate_cache(name=None, data_type=None, process_id=None):
+        """
+        Removes cached datasets. With no arguments the whole cache is cleared,
+        otherwise only datasets matching every given argument are removed
+
+        Args:
+        - name?: Dataset name
+        - data_type?: Dataset data type
+        - process_id?: Process ID
+        """
+        if name is None and data_type is None and process_id is None:
+            _dataset_cache.invalidate()
+            return
+        _dataset_cache.invalidate_where(
+            lambda key: (name is None or key[0] == name)
+            and (data_type is None or key[1] == data_type)
+            and (process_id is None or key[2] == process_id))
+
+    @staticmethod
+    def cache_stats():
+        """
+        Returns:
+        - A dictionary of dataset cache hits, misses, evictions and size, along
+          with the number of lookups that shared a concurrent in-flight request
+        """
+        return {**_dataset_cache.stats(), "shared_lookups": _dataset_flight.stats()["shared"]}
 
 class Dataset:
     """
@@ -3,6 +3,46 @@ This module contains the operator class and its methods.
 """
 from ..api_client import APIClient
 from ..exceptions import SerialAPIException
+from ..utils.cache import UNSET, LRUCache
+from ..utils.single_flight import SingleFlight
+from .. import config
+
+# Process-wide cache of operator API objects, keyed by (first_name, last_name, pin)
+_operator_cache = LRUCache(config.operator_cache_size, config.operator_cache_ttl)
+# Concurrent lookups of the same operator share a single request
+_operator_flight = SingleFlight()
+
+def _operator_params(first_name=None, last_name=None, pin=None):
+    params = {}
+    if first_name:
+        params['first_name'] = first_name
+    if last_name:
+        params['last_name'] = last_name
+    if pin:
+        params['pin'] = pin
+    return params
+
+def _operator_key(params):
+    return (params.get('first_name'), params.get('last_name'), params.get('pin'))
+
+def _cache_roster(roster):
+    """
+    Caches each operator of the full roster under the lookups a badge-in uses:
+    by PIN, by first and last name, and by name and PIN. Lookups that match
+    more than one operator are left uncached so they still raise. A PIN lookup
+    can only be served from the cache if the API returned the operator's PIN.
+    """
+    matches = {}
+    for operator in roster:
+        first_name, last_name, pin = operator.get('first_name'), operator.get('last_name'), operator.get('pin')
+        for params in (_operator_params(pin=pin), _operator_params(first_name, last_name),
+                       _operator_params(first_name, last_name, pin)):
+            if params:
+                matches.setdefault(_operator_key(params), []).append(operator)
+    for key, operators in matches.items():
+        if len(operators) == 1:
+            _operator_cache.set(key, operators[0])
+    return len(roster)
 
 class Operator:
     """
@@ -25,7 +65,8 @@ class Operators:
     @staticmethod
     def get(first_name=None, last_name=None, pin=None):
         """
-        Get operators.
+        Get operators. Operators that were looked up or prefetched recently
+        are returned from the operator cache.
 
         Args:
             first_name (str): The first name of the operator.
@@ -34,19 +75,83 @@ class Operators:
         Returns:
             A single operator object
         """
+        params = _operator_params(first_name, last_name, pin)
+        key = _operator_key(params)
+        operator_data = _operator_cache.get(key)
+        if operator_data is None:
+            operator_data, shared = _operator_flight.do(key, Operators._fetch_operator, params)
+        return Operator(dict(operator_data))
+
+    @staticmethod
+    def _fetch_operator(params):
         client = APIClient()
-        params = {}
-        if first_name:
-            params['first_name'] = first_name
-        if last_name:
-            params['last_name'] = last_name
-        if pin:
-            params['pin'] = pin
         operator_data = client.make_api_request('/operators', "GET", params=params)
         if len(operator_data) == 0:
             raise SerialAPIException("No operator found")
         if len(operator_data) > 1:
             raise SerialAPIException("Multiple operators found")
-        return Operator(operator_data[0])
+        _operator_cache.set(_operator_key(params), operator_data[0])
+        return operator_data[0]
+
+    @staticmethod
+    def prefetch():
+        """
+        Loads the operator roster in one request and caches every operator by
+        PIN, by first and last name, and by name and PIN
+
+        Returns:
+            The number of operators cached
+        """
+        client = APIClient()
+        return _cache_roster(client.make_api_request('/operators', "GET"))
+
+    @staticmethod
+    def configure_cache(max_size=None, ttl=UNSET):
+        """
+        Replaces the operator cache, dropping every cached operator
 
+        Args:
+            max_size (int): Maximum number of cache entries (0 disables caching).
+            ttl (float): Seconds a cached operator stays valid (None keeps it until evicted;
+                left unchanged if omitted).
+        """
+        global _operator_cache
+        if max_size is not None:
+            config.operator_cache_size = max_size
+        if ttl is not UNSET:
+            config.operator_cache_ttl = ttl
+        _operator_cache = LRUCache(config.operator_cache_size, config.operator_cache_ttl)
+
+    @staticmethod
+    def invalidate_cache(first_name=None, last_name=None, pin=None):
+        """
+        Removes cached operators, e.g. after a PIN is changed or an operator is
+        deactivated. With no arguments the whole cache is cleared, otherwise
+        every cache entry for an operator matching the given fields is removed.
+
+        Args:
+            first_name (str): The first name of the operator.
+            last_name (str): The last name of the operator.
+            pin (str): The pin of the operator.
+        """
+        if first_name is None and last_name is None and pin is None:
+            _operator_cache.invalidate()
+            return
+        keys = [key for key in _operator_cache.keys()
+                if _matches_operator(_operator_cache.peek(key), first_name, last_name, pin)]
+        _operator_cache.invalidate_where(lambda key: key in keys)
+
+    @staticmethod
+    def cache_stats():
+        """
+        Returns:
+            A dictionary of operator cache hits, misses, evictions and size, along
+            with the number of lookups that shared a concurrent in-flight request
+        """
+        return {**_operator_cache.stats(), "shared_lookups": _operator_flight.stats()["shared"]}
 
+def _matches_operator(operator, first_name, last_name, pin):
+    return (operator is not None
+            and (first_name is None or operator.get('first_name') == first_name)
+            and (last_name is None or operator.get('last_name') == last_name)
+            and (pin is None or operator.get('pin') == pin))
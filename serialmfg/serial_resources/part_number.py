@@ -3,6 +3,15 @@ This file contains the PartNumber class and the PartNumbers class.
 """
 from ..api_client import APIClient
 from ..exceptions import SerialAPIException
+from ..utils.cache import UNSET, LRUCache
+from ..utils.single_flight import SingleFlight
+from .. import config
+
+# Process-wide cache of resolved part numbers, keyed by (part_number, component_id)
+_part_number_cache = LRUCache(config.part_number_cache_size, config.part_number_cache_ttl)
+# Concurrent resolutions of the same part number share a single get/create round trip
+_part_number_flight = SingleFlight()
+
 class PartNumberNotFound(SerialAPIException):
     """
     Exception for when a Part Number is not found
@@ -20,7 +29,8 @@ class PartNumbers:
 
         Args:
         - part_number (str): Part Number
-        - component_id? (str): Component ID - may be needed if part number is not unique
+        - component_id? (str): Component ID - only part numbers of this component are returned;
+          may be needed if part number is not unique
 
         Returns:
         - A PartNumber object
@@ -29,7 +39,12 @@ class PartNumbers:
         query_params = {
             'part_number': part_number
         }
+        if component_id:
+            query_params['component_id'] = component_id
         response = client.make_api_request('/part-numbers', 'GET', query_params)
+        if component_id:
+            # Part numbers are cached per component, so never return another component's
+            response = [data for data in response if data.get('component_id') == component_id]
         if not response:
             raise PartNumberNotFound('Part Number not found')
         if len(response) > 1 and not component_id:
@@ -74,10 +89,81 @@ class PartNumbers:
         Returns:
         - A PartNumber object
         """
+        result = _part_number_cache.get((part_number, component_id))
+        if result is not None:
+            return result
+        result, shared = _part_number_flight.do(
+            (part_number, component_id), PartNumbers._resolve_part_number, part_number, component_id, description)
+        return result
+
+    @staticmethod
+    def _resolve_part_number(part_number, component_id, description=None):
         try:
-            return PartNumbers.get(part_number, component_id)
+            result = PartNumbers.get(part_number, component_id)
         except PartNumberNotFound:
-            return PartNumbers.create(part_number, component_id, description)
+            result = PartNumbers.create(part_number, component_id, description)
+        _part_number_cache.set((part_number, component_id), result)
+        return result
+
+    @staticmethod
+    def prefetch(component_id=None):
+        """
+        Loads part numbers in one request and caches them for get_or_create_part_number
+
+        Args:
+        - component_id?: Only load the part numbers of this component
+
+        Returns:
+        - The number of part numbers cached
+        """
+        client = APIClient()
+        response = client.make_api_request('/part-numbers', 'GET', {'component_id': component_id} if component_id else None)
+        for data in response:
+            _part_number_cache.set((data['part_number'], data['component_id']), PartNumber(data))
+        return len(response)
+
+    @staticmethod
+    def configure_cache(max_size=None, ttl=UNSET):
+        """
+        Replaces the part number cache, dropping every cached part number
+
+        Args:
+        - max_size?: Maximum number of cached part numbers (0 disables caching)
+        - ttl?: Seconds a cached part number stays valid (None keeps it until evicted;
+          left unchanged if omitted)
+        """
+        global _part_number_cache
+        if max_size is not None:
+            config.part_number_cache_size = max_size
+        if ttl is not UNSET:
+            config.part_number_cache_ttl = ttl
+        _part_number_cache = LRUCache(config.part_number_cache_size, config.part_number_cache_ttl)
+
+    @staticmethod
+    def invalidate_cache(part_number=None, component_id=None):
+        """
+        Removes cached part numbers. With no arguments the whole cache is cleared,
+        otherwise only part numbers matching every given argument are removed
+
+        Args:
+        - part_number?: Part number
+        - component_id?: Component ID
+        """
+        if part_number is None and component_id is None:
+            _part_number_cache.invalidate()
+            return
+        _part_number_cache.invalidate_where(
+            lambda key: (part_number is None or key[0] == part_number)
+            and (component_id is None or key[1] == component_id))
+
+    @staticmethod
+    def cache_stats():
+        """
+        Returns:
+        - A dictionary of part number cache hits, misses, evictions and size, along
+          with the number of lookups that shared a concurrent in-flight request
+        """
+        return {**_part_number_cache.stats(), "shared_lookups": _part_number_flight.stats()["shared"]}
 
 class PartNumber:
     """
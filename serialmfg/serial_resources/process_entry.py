@@ -3,64 +3,174 @@ This module contains the ProcessEntry class and ProcessEntries class.
 """
 import os
 import mimetypes
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 from ..api_client import APIClient 
 from ..exceptions import SerialAPIException
 from .. import config
 from .dataset import Datasets 
 from .component_instance import ComponentInstances
 from .operator import Operators
+from .record import Record
+from ..offline_queue import LOCAL_ID_PREFIX, get_offline_queue, is_connectivity_error
+from ..submission import SubmitCancelled, SubmitHandle
+from ..utils.pagination import iter_pages
 from ..utils.time_formatting import is_iso_timestamp
 
-class ProcessEntry:
+# Data point handlers mapped to the method that builds their payload for a batch
+_BATCH_BUILDERS = {
+    "_process_single_text_data": "_build_text_data",
+    "_process_single_numerical_data": "_build_numerical_data",
+    "_process_single_file_data": "_build_file_data",
+    "_process_single_boolean_data": "_build_boolean_data",
+}
+# Statuses meaning the server has no batch endpoint for data points. A 404 is not one of them, since the
+# endpoint also returns it for a missing entry; a batch answered with 404 falls back without being remembered.
+_BATCH_UNSUPPORTED_STATUSES = (405, 501)
+# The (base URL, transport) last found not to support batched data points, so changing either retries batching
+_batch_unsupported = None
+
+class ProcessEntryBase(ABC):
     """
-    A process entry Python object
+    The data queueing shared by the blocking and asyncio ProcessEntry classes.
+    It makes no requests: subclasses send the queued data with their own
+    client, in _stream_queued and submit.
     """
-    def __init__(self, process_entry_data): 
+    def __init__(self, process_entry_data):
         """
-        Creates a new Process Entry
-        
         Args:
         - process_entry_data: A process entry object, as defined at
         https://docs.serial.io/api-reference/process-entries/get-process-entry
-
-        Returns:
-        - A newly created process entry Python object, which holds the api object at data, the process id at process_id and the id at id
         """
-        # TODO: debug logging
-        #print(f"Creating process entry object with data: {process_entry_data}")
-        self.client = APIClient() 
         self.data = process_entry_data
-        self.process_id = process_entry_data["process_id"] 
-        self.id = process_entry_data["id"] 
+        self.process_id = process_entry_data["process_id"]
+        self.id = process_entry_data["id"]
         self.component_instance_id = process_entry_data["unique_identifier_id"]
         self.text_data_queue = []
         self.numerical_data_queue = []
         self.file_data_queue = []
         self.boolean_data_queue = []
         self.link_data_queue = []
+        self._parent_component_instance = None
+        self._child_component_instances = {}
+        self._streaming = False
+        self._streamed = []
 
-    def _process_queue(self):
-        """
-        Process all queued data submissions.
-        """
-        with ThreadPoolExecutor() as executor:
-            # Submit each queue processing function to the executor
-            futures = [
-                executor.submit(self._process_text_data_queue),
-                executor.submit(self._process_numerical_data_queue),
-                executor.submit(self._process_file_data_queue),
-                executor.submit(self._process_boolean_data_queue),
-                executor.submit(self._process_link_data_queue)
-            ]
-
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    # Handle exceptions
-                    print(f"An error occurred: {e}")
-                    raise SerialAPIException(f"An error occurred: {e}")
+    def start_streaming(self):
+        """
+        Sends data in the background as soon as it is added, instead of all at
+        once in submit(), so network time overlaps with the test and submit()
+        only waits for what is still in flight. Data queued before streaming
+        started is sent right away.
+        """
+        self._streaming = True
+        self._stream_queued()
+
+    def _drain_queues(self):
+        """
+        Empties every data queue
+
+        Returns:
+        - A list of (handler, queued item) pairs for all queued data
+        """
+        tasks = []
+        for queue, handler in (
+                (self.text_data_queue, self._process_single_text_data),
+                (self.numerical_data_queue, self._process_single_numerical_data),
+                (self.file_data_queue, self._process_single_file_data),
+                (self.boolean_data_queue, self._process_single_boolean_data),
+                (self.link_data_queue, self._process_single_link_data)):
+            tasks.extend((handler, item) for item in queue)
+            queue.clear()
+        return tasks
+
+    def _queued_count(self):
+        return sum(len(queue) for queue in (self.text_data_queue, self.numerical_data_queue, self.file_data_queue,
+                                            self.boolean_data_queue, self.link_data_queue))
+
+    # The payloads of data points and links, built from queued items once their datasets are resolved.
+    # Subclasses only make the requests.
+
+    @staticmethod
+    def _text_payload(text_data, dataset):
+        expected_value = text_data.get('expected_value')
+        return {
+            "type": "TEXT",
+            "dataset_id": dataset.dataset_id,
+            "value": text_data['value'],
+            **({'expected_value': expected_value} if expected_value is not None else {})
+        }
+
+    @staticmethod
+    def _numerical_dataset_params(number_data):
+        return {'unit': number_data.get('unit'), 'usl': number_data.get('usl'), 'lsl': number_data.get('lsl')}
+
+    @staticmethod
+    def _numerical_payload(number_data, dataset):
+        data = {
+            "type": "NUMERICAL",
+            "dataset_id": dataset.dataset_id,
+            "value": number_data['value']
+        }
+        if number_data.get('usl') is not None:
+            data["usl"] = number_data['usl']
+        if number_data.get('lsl') is not None:
+            data["lsl"] = number_data['lsl']
+        return data
+
+    @staticmethod
+    def _boolean_payload(boolean_data, dataset):
+        return {
+            "type": "BOOLEAN",
+            "dataset_id": dataset.dataset_id,
+            "value": boolean_data['value'],
+            "expected_value": boolean_data['expected_value']
+        }
+
+    @staticmethod
+    def _upload_details(path, file_name, dataset_type):
+        """
+        Returns:
+        - A tuple of the file name to upload under, its mimetype and the dataset
+          type, which is IMAGE for images whatever was asked for
+        """
+        if not file_name:
+            file_name = os.path.basename(path)
+        # if in the future we need to do a better guess, we can use python-magic to determine the mimetype
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if mimetype.startswith("image"):
+            dataset_type = "IMAGE"
+        return file_name, mimetype, dataset_type
+
+    @staticmethod
+    def _upload_payload(dataset_type, dataset, storage_object, file_name):
+        return {"type": dataset_type, "dataset_id": dataset.dataset_id, "file_id": storage_object["name"], "file_name": file_name}
+
+    def _unresolved_link_children(self, tasks):
+        """
+        Returns:
+        - The identifiers of the queued links' children not looked up yet
+        """
+        return [item['child_identifier'] for handler, item in tasks
+                if handler.__name__ == "_process_single_link_data"
+                and item['child_identifier'] not in self._child_component_instances]
+
+    def _component_link_payload(self, link_dataset, child_component_instance, parent_component_instance):
+        return {
+            'child_component_id': child_component_instance["component_id"],
+            'parent_component_id': parent_component_instance["component_id"],
+            'dataset_id': link_dataset.dataset_id,
+            'process_id': self.process_id
+        }
+
+    def _link_payload(self, link_data, link_dataset, child_component_instance):
+        return {
+            "parent_component_instance_id": self.component_instance_id,
+            "child_component_instance_id": child_component_instance["id"],
+            "dataset_id": link_dataset.dataset_id,
+            "process_entry_id": self.id,
+            "break_prior_links": link_data['break_prior_links'],
+        }
 
     def add_text(self, dataset_name, value, expected_value=None):
         """
@@ -81,45 +191,7 @@ class ProcessEntry:
             'value': value,
             'expected_value': expected_value
         })
-
-    def _process_text_data_queue(self):
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for text_data in self.text_data_queue:
-                # Submit each request to the executor
-                futures.append(executor.submit(self._process_single_text_data, text_data))
-
-            # Clear the queue once all futures are submitted
-            self.text_data_queue.clear()
-
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    # Handle exceptions
-                    print(f"An error occurred: {e}")
-                    raise SerialAPIException(f"An error occurred: {e}")
-
-    def _process_single_text_data(self, text_data):
-        # The code that processes a single text data entry
-        dataset_name = text_data['dataset_name']
-        value = text_data['value']
-        expected_value = text_data.get('expected_value')
-
-        dataset, status = Datasets.get_or_create_dataset(dataset_name, "TEXT", self.process_id)
-
-        data = {
-            "type": "TEXT",
-            "dataset_id": dataset.dataset_id,
-            "value": value,
-            **({'expected_value': expected_value} if expected_value is not None else {})
-        }
-
-        # Make the API request
-        response = self.client.make_api_request(
-            f"/processes/entries/{self.id}", "PUT", data=data
-        )
-        return response
+        self._stream_queued()
 
     def add_number(self, dataset_name, value, usl=None, lsl=None, unit=None):
         """
@@ -140,52 +212,7 @@ class ProcessEntry:
             'lsl': lsl,
             'unit': unit
         })
-
-    def _process_numerical_data_queue(self):
-        """
-        Process the queued numerical data submissions.
-        """
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for number_data in self.numerical_data_queue:
-                # Submit each request to the executor
-                futures.append(executor.submit(self._process_single_numerical_data, number_data))
-
-            # Clear the queue once all futures are submitted
-            self.numerical_data_queue.clear()
-
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    # Handle exceptions
-                    print(f"An error occurred: {e}")
-                    raise SerialAPIException(f"An error occurred: {e}")
-
-    def _process_single_numerical_data(self, number_data):
-        # The code that processes a single numerical data entry
-        dataset_name = number_data['dataset_name']
-        value = number_data['value']
-        usl = number_data.get('usl')
-        lsl = number_data.get('lsl')
-        unit = number_data.get('unit')
-        extra_params = {'unit': unit, 'usl': usl, 'lsl': lsl}
-            
-        dataset, status = Datasets.get_or_create_dataset(dataset_name, "NUMERICAL", self.process_id, extra_params)
-        
-        data = {
-            "type": "NUMERICAL",
-            "dataset_id": dataset.dataset_id,
-            "value": value
-        }
-        if usl is not None:
-            data["usl"] = usl
-        if lsl is not None:
-            data["lsl"] = lsl
-
-        # Make the API request
-        response = self.client.make_api_request(f"/processes/entries/{self.id}", "PUT", data=data)
-        return response
+        self._stream_queued()
 
     def add_image(self, dataset_name, path, file_name=None):
         """
@@ -213,58 +240,7 @@ class ProcessEntry:
             'path': path,
             'file_name': file_name
         })
-
-    def _process_file_data_queue(self):
-        """
-        Process the queued file data submissions.
-        """
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for file_data in self.file_data_queue:
-                # Submit each file upload request to the executor
-                futures.append(executor.submit(self._process_single_file_data, file_data))
-
-            # Clear the queue once all futures are submitted
-            self.file_data_queue.clear()
-
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    # Handle exceptions
-                    print(f"An error occurred: {e}")
-                    raise SerialAPIException(f"An error occurred: {e}")
-
-    def _process_single_file_data(self, file_data):
-        # The code that processes a single file data entry
-        dataset_name = file_data['dataset_name']
-        path = file_data['path']
-        file_name = file_data.get('file_name') or os.path.basename(path)
-
-        response = self._upload_file(dataset_name, path, file_name, "FILE")
-        return response
-    
-    def _upload_file(self, dataset_name, path, file_name, dataset_type):
-        """
-        Uploads a file to the serial server
-
-        Args:
-        - dataset_name: User facing name of the dataset
-        - path: Path to the file on your file system
-        - file_name: None-able argument to override the file name
-        - dataset_type: Type of dataset to be uploaded (IMAGE or FILE)
-        """
-        if not file_name:
-            file_name = os.path.basename(path)
-        # if in the future we need to do a better guess, we can use python-magic to determine the mimetype
-        files = {'file': (file_name, open(path, 'rb'), mimetypes.guess_type(path))} 
-        mimetype = mimetypes.guess_type(path)[0]
-        storage_object = self.client.make_api_request("/files", "POST", files=files)
-        if mimetype.startswith("image"):
-            dataset_type = "IMAGE"
-        dataset, status = Datasets.get_or_create_dataset(dataset_name, dataset_type, self.process_id) 
-        data = {"type": dataset_type, "dataset_id": dataset.dataset_id, "file_id": storage_object["name"], "file_name": file_name}
-        return self.client.make_api_request(f"/processes/entries/{self.id}", "PUT", data=data)
+        self._stream_queued()
 
     def add_boolean(self, dataset_name, value, expected_value):
         """
@@ -281,49 +257,7 @@ class ProcessEntry:
             'value': value,
             'expected_value': expected_value
         })
-
-    def _process_boolean_data_queue(self):
-        """
-        Process the queued boolean data submissions.
-        """
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for boolean_data in self.boolean_data_queue:
-                # Submit each boolean data processing task to the executor
-                futures.append(executor.submit(self._process_single_boolean_data, boolean_data))
-
-            # Clear the queue once all futures are submitted
-            self.boolean_data_queue.clear()
-
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    # Handle exceptions
-                    print(f"An error occurred: {e}")
-                    raise SerialAPIException(f"An error occurred: {e}")
-
-    def _process_single_boolean_data(self, boolean_data):
-        # The code that processes a single boolean data entry
-        dataset_name = boolean_data['dataset_name']
-        value = boolean_data['value']
-        expected_value = boolean_data['expected_value']
-
-        dataset, status = Datasets.get_or_create_dataset(dataset_name, "BOOLEAN", self.process_id)
-        
-        data = {
-            "type": "BOOLEAN",
-            "dataset_id": dataset.dataset_id,
-            "value": value,
-            "expected_value": expected_value
-        }
-
-        # Make the API request
-        response = self.client.make_api_request(
-            f"/processes/entries/{self.id}", "PUT", data=data
-        )
-        return response
-
+        self._stream_queued()
 
     def add_link(self, dataset_name, child_identifier, break_prior_links=False):
         """
@@ -340,75 +274,303 @@ class ProcessEntry:
             'child_identifier': child_identifier,
             'break_prior_links': break_prior_links
         })
+        self._stream_queued()
 
-    def _process_link_data_queue(self):
+    @abstractmethod
+    def _stream_queued(self):
         """
-        Process the queued link creation tasks.
+        Called after data is queued. While streaming, sends the queued data in
+        the background with the subclass's client; otherwise does nothing.
         """
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for link_data in self.link_data_queue:
-                # Submit each link data processing task to the executor
-                futures.append(executor.submit(self._process_single_link_data, link_data))
 
-            # Clear the queue once all futures are submitted
-            self.link_data_queue.clear()
+class ProcessEntry(ProcessEntryBase):
+    """
+    A process entry Python object
+    """
+    def __init__(self, process_entry_data): 
+        """
+        Creates a new Process Entry
+        
+        Args:
+        - process_entry_data: A process entry object, as defined at
+        https://docs.serial.io/api-reference/process-entries/get-process-entry
+
+        Returns:
+        - A newly created process entry Python object, which holds the api object at data, the process id at process_id and the id at id
+        """
+        # TODO: debug logging
+        #print(f"Creating process entry object with data: {process_entry_data}")
+        super().__init__(process_entry_data)
+        self.client = APIClient() 
+        self._progress = None
+
+    def _stream_queued(self):
+        # Data is sent on the shared worker pool; while the offline queue is
+        # enabled it is still sent at submit() so it can be journaled
+        if not self._streaming or get_offline_queue() is not None:
+            return
+        pool = self.client.worker_pool
+        for handler, item in self._drain_queues():
+            self._streamed.append((handler, item, pool.submit(self._run_task, handler, item)))
+
+    def _wait_for_streamed(self):
+        """
+        Waits for data sent by streaming
+
+        Returns:
+        - A list of (handler, item, exception) tuples for the data that failed
+        """
+        pool = self.client.worker_pool
+        streamed, self._streamed = self._streamed, []
+        failures = []
+        for handler, item, future in streamed:
+            if future.cancelled():
+                result, error = None, SubmitCancelled("Submission was cancelled")
+            elif pool.in_worker() and future.cancel():
+                # Waiting on the pool from one of its own workers could deadlock it
+                result, error = self._run_task(handler, item)
+            else:
+                result, error = future.result()
+            if error is not None:
+                failures.append((handler, item, error))
+        return failures
+
+    def _process_queue(self, batch=False):
+        """
+        Process all queued data submissions on the client's shared worker pool.
+
+        Args:
+        - batch?: Whether to add data points to the entry in batches instead of one request each
+        """
+        failures = self._wait_for_streamed()
+        tasks = self._drain_queues()
+        failures += self._run_batched(tasks) if batch else self._run_tasks(tasks)
+        if failures:
+            raise SerialAPIException(f"An error occurred: {failures[0][2]}")
+
+    def _run_tasks(self, tasks):
+        """
+        Runs (handler, item) tasks on the client's shared worker pool
+
+        Returns:
+        - A list of (handler, item, exception) tuples for the tasks that failed
+        """
+        self._resolve_link_children(tasks)
+        results = self._map_tasks(tasks)
+        return [(handler, item, error) for (handler, item), (_, error) in zip(tasks, results) if error is not None]
+
+    def _map_tasks(self, tasks, count=True):
+        """
+        Runs (handler, item) tasks on the client's shared worker pool
+
+        Args:
+        - count?: Whether each task counts as a data point sent, for submit_async progress
+
+        Returns:
+        - A (result, exception) tuple for each task, in order
+        """
+        pool = self.client.worker_pool
+        if pool.in_worker():
+            # Waiting on the pool from one of its own workers could deadlock it
+            return [self._run_tracked(handler, item, count) for handler, item in tasks]
+        futures = [pool.submit(self._run_tracked, handler, item, count) for handler, item in tasks]
+        return [future.result() for future in futures]
+
+    def _run_tracked(self, handler, item, count=True):
+        # Skips tasks once a background submission is cancelled, and reports progress
+        progress = self._progress
+        if progress is not None and progress.is_cancelled():
+            return None, SubmitCancelled("Submission was cancelled")
+        result = self._run_task(handler, item)
+        if progress is not None and count:
+            progress._advance()
+        return result
+
+    def _raise_if_cancelled(self):
+        if self._progress is not None and self._progress.is_cancelled():
+            raise SubmitCancelled(f"Submission of process entry {self.id} was cancelled")
+
+    @staticmethod
+    def _run_task(handler, item):
+        try:
+            return handler(item), None
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None, e
+
+    def _run_batched(self, tasks):
+        """
+        Builds the payloads of queued data points on the shared worker pool
+        (resolving datasets and uploading files) and adds them to the entry
+        config.batch_size at a time. Links are not data points and are still
+        created one request each.
 
-            # Optional: Wait for all tasks to complete and handle results/errors
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    # Handle exceptions
+        Returns:
+        - A list of (handler, item, exception) tuples for the tasks that failed
+        """
+        self._resolve_link_children(tasks)
+        batchable = [(handler, item) for handler, item in tasks if handler.__name__ in _BATCH_BUILDERS]
+        others = [(handler, item) for handler, item in tasks if handler.__name__ not in _BATCH_BUILDERS]
+        builds = [(getattr(self, _BATCH_BUILDERS[handler.__name__]), item) for handler, item in batchable]
+        results = self._map_tasks(builds + others, count=False)
+        failures = [(handler, item, error) for (handler, item), (_, error) in zip(batchable + others, results)
+                    if error is not None]
+        built = [(task, data) for task, (data, error) in zip(batchable, results) if error is None]
+        # Links and data points that failed to build are finished; the rest count once their batch is sent
+        self._advance_progress(len(batchable) - len(built) + len(others))
+        for start in range(0, len(built), config.batch_size):
+            batch = built[start:start + config.batch_size]
+            if self._progress is not None and self._progress.is_cancelled():
+                failures.extend((handler, item, SubmitCancelled("Submission was cancelled")) for (handler, item), _ in batch)
+                continue
+            failures.extend(self._put_data_batch(batch))
+            self._advance_progress(len(batch))
+        return failures
+
+    def _advance_progress(self, count):
+        if self._progress is not None:
+            self._progress._advance(count)
+
+    def _put_data_batch(self, batch):
+        """
+        Adds a batch of data points to the entry in one request. If the server
+        has no batch endpoint, it is remembered and the data points are added
+        one request each instead, as they are for a batch answered with 404.
+
+        Args:
+        - batch: A list of ((handler, item), data point payload) pairs
+
+        Returns:
+        - A list of (handler, item, exception) tuples for the data points that failed
+        """
+        global _batch_unsupported
+        target = (config.base_url, config.transport)
+        if _batch_unsupported != target:
+            try:
+                self.client.make_api_request(config.batch_endpoint.format(id=self.id), "PUT",
+                                             data=[data for _, data in batch])
+                return []
+            except SerialAPIException as e:
+                if e.status_code in _BATCH_UNSUPPORTED_STATUSES:
+                    _batch_unsupported = target
+                elif e.status_code != 404:
                     print(f"An error occurred: {e}")
-                    raise SerialAPIException(f"An error occurred: {e}")
+                    return [(handler, item, e) for (handler, item), _ in batch]
+        results = self._map_tasks([(self._put_data, data) for _, data in batch], count=False)
+        return [(handler, item, error) for ((handler, item), _), (_, error) in zip(batch, results) if error is not None]
 
-    def _process_single_link_data(self, link_data):
-        # The code that processes a single link data entry
-        dataset_name = link_data['dataset_name']
-        child_identifier = link_data['child_identifier']
-        break_prior_links = link_data['break_prior_links']
+    def _put_data(self, data):
+        """
+        Adds a single data point payload to the entry
+        """
+        return self.client.make_api_request(f"/processes/entries/{self.id}", "PUT", data=data)
+
+    def _process_single_text_data(self, text_data):
+        # The code that processes a single text data entry
+        return self._put_data(self._build_text_data(text_data))
+
+    def _build_text_data(self, text_data):
+        dataset, status = Datasets.get_or_create_dataset(text_data['dataset_name'], "TEXT", self.process_id)
+        return self._text_payload(text_data, dataset)
+
+    def _process_single_numerical_data(self, number_data):
+        # The code that processes a single numerical data entry
+        return self._put_data(self._build_numerical_data(number_data))
+
+    def _build_numerical_data(self, number_data):
+        dataset, status = Datasets.get_or_create_dataset(number_data['dataset_name'], "NUMERICAL", self.process_id,
+                                                         self._numerical_dataset_params(number_data))
+        return self._numerical_payload(number_data, dataset)
+
+    def _process_single_file_data(self, file_data):
+        # The code that processes a single file data entry
+        return self._put_data(self._build_file_data(file_data))
+
+    def _build_file_data(self, file_data):
+        return self._build_upload_data(file_data['dataset_name'], file_data['path'], file_data.get('file_name'), "FILE")
+    
+    def _upload_file(self, dataset_name, path, file_name, dataset_type):
+        """
+        Uploads a file to the serial server
+
+        Args:
+        - dataset_name: User facing name of the dataset
+        - path: Path to the file on your file system
+        - file_name: None-able argument to override the file name
+        - dataset_type: Type of dataset to be uploaded (IMAGE or FILE)
+        """
+        return self._put_data(self._build_upload_data(dataset_name, path, file_name, dataset_type))
+
+    def _build_upload_data(self, dataset_name, path, file_name, dataset_type):
+        """
+        Uploads a file and returns the data point referencing it, without adding
+        it to the process entry yet
+        """
+        file_name, mimetype, dataset_type = self._upload_details(path, file_name, dataset_type)
+        with open(path, 'rb') as file:
+            files = {'file': (file_name, file, mimetype)}
+            storage_object = self.client.make_api_request("/files", "POST", files=files)
+        dataset, status = Datasets.get_or_create_dataset(dataset_name, dataset_type, self.process_id) 
+        return self._upload_payload(dataset_type, dataset, storage_object, file_name)
+
+    def _process_single_boolean_data(self, boolean_data):
+        # The code that processes a single boolean data entry
+        return self._put_data(self._build_boolean_data(boolean_data))
+
+    def _build_boolean_data(self, boolean_data):
+        dataset, status = Datasets.get_or_create_dataset(boolean_data['dataset_name'], "BOOLEAN", self.process_id)
+        return self._boolean_payload(boolean_data, dataset)
+
+    def _resolve_link_children(self, tasks):
+        """
+        Looks up the child component instances of every queued link at once,
+        before the links are created, so each distinct child is fetched once
+        """
+        identifiers = self._unresolved_link_children(tasks)
+        if identifiers:
+            self._child_component_instances.update(ComponentInstances.get_many(identifiers))
 
-        child_component_instance = ComponentInstances.get(child_identifier).data
+    def _get_child_component_instance(self, child_identifier):
+        child_component_instance = self._child_component_instances.get(child_identifier)
+        if child_component_instance is None:
+            child_component_instance = ComponentInstances.get(child_identifier)
+            self._child_component_instances[child_identifier] = child_component_instance
+        return child_component_instance.data
 
-        child_component_instance_id = child_component_instance["id"]
-        link_dataset, status = Datasets.get_or_create_dataset(dataset_name, "LINK", self.process_id)
+    def _get_parent_component_instance(self):
+        # The parent is the same for every link of this entry
+        if self._parent_component_instance is None:
+            self._parent_component_instance = ComponentInstances.get(id=self.component_instance_id)
+        return self._parent_component_instance.data
+
+    def _process_single_link_data(self, link_data):
+        # The code that processes a single link data entry
+        child_component_instance = self._get_child_component_instance(link_data['child_identifier'])
+        link_dataset, status = Datasets.get_or_create_dataset(link_data['dataset_name'], "LINK", self.process_id)
 
         if status == "created":
-            parent_component_instance = ComponentInstances.get(id=self.component_instance_id).data
-            new_component_link_data = {
-                'child_component_id': child_component_instance["component_id"],
-                'parent_component_id': parent_component_instance["component_id"],
-                'dataset_id': link_dataset.dataset_id,
-                'process_id': self.process_id
-            }
-            self.client.make_api_request("/components/links", "PUT", data=new_component_link_data)
-
-        process_entry_id = self.id
-        data = {
-            "parent_component_instance_id": self.component_instance_id, 
-            "child_component_instance_id": child_component_instance_id,
-            "dataset_id": link_dataset.dataset_id,
-            "process_entry_id": process_entry_id,
-            "break_prior_links": break_prior_links,
-        }
+            parent_component_instance = self._get_parent_component_instance()
+            self.client.make_api_request("/components/links", "PUT", data=self._component_link_payload(
+                link_dataset, child_component_instance, parent_component_instance))
 
         # Make the API request
-        new_link_response = self.client.make_api_request(
-            "/components/instances/links", "PUT", data=data
+        return self.client.make_api_request(
+            "/components/instances/links", "PUT", data=self._link_payload(link_data, link_dataset, child_component_instance)
         )
-        return new_link_response
 
-    def submit(self, cycle_time=None, is_pass=None):
+    def submit(self, cycle_time=None, is_pass=None, batch=None):
         """
-        Mark a process entry as completed
+        Mark a process entry as completed. When streaming, this waits for the data
+        points still in flight before completing the entry.
 
         Args: 
         - cycle_time?: Optional number for seconds elapsed since the last cycle 
         finished for this process.
         - is_pass?: Optional boolean for indicating whether the process passed for
         this entry
-        this entry
+        - batch?: Whether to add queued data points in batches of config.batch_size
+        instead of one request each. Defaults to config.batch_submit. Ignored while
+        the offline queue is enabled.
 
         Returns:
         - API response for submitting a process entry
@@ -418,16 +580,137 @@ class ProcessEntry:
             data["cycle_time"] = cycle_time
         if is_pass is not None: 
             data["is_pass"] = is_pass
+        offline_queue = get_offline_queue()
+        if offline_queue is not None:
+            return self._submit_with_offline_queue(offline_queue, data)
+        if batch is None:
+            batch = config.batch_submit
         try:
-            self._process_queue()
+            self._process_queue(batch=batch)
         except SerialAPIException as e:
+            self._raise_if_cancelled()
             raise SerialAPIException(f"Could not add data to process entry: {e}")
+        self._raise_if_cancelled()
 
         data["is_complete"] = True
 
         self.data = self.client.make_api_request(f"/processes/entries/{self.id}", "PATCH", data=data)
         return self.data
 
+    def submit_async(self, cycle_time=None, is_pass=None, batch=None):
+        """
+        Submits the entry in the background and returns straight away, so the
+        station can move on to the next unit while this one uploads. Data must
+        not be added to the entry after this is called.
+
+        Args:
+        - cycle_time?, is_pass?, batch?: As for submit
+
+        Returns:
+        - A SubmitHandle with the submission's status, progress and result, which
+          can also cancel it. Pending submissions are waited for at exit (see
+          serial.drain_submissions).
+        """
+        handle = SubmitHandle(self, len(self._streamed) + self._queued_count())
+        self._progress = handle
+        for _, _, future in self._streamed:
+            future.add_done_callback(lambda future: handle._advance())
+        return handle._start(lambda: self.submit(cycle_time, is_pass, batch))
+
+    def _submit_with_offline_queue(self, offline_queue, data):
+        """
+        Submits the entry, journaling whatever could not be sent because the API
+        was unreachable so the offline queue can replay it later
+
+        Returns:
+        - The API response, or the entry data marked with queued_offline if any
+          part of the submission was journaled
+        """
+        data["is_complete"] = True
+        is_local = self.id.startswith(LOCAL_ID_PREFIX)
+        # Data streamed before the queue was enabled is journaled if it could not be sent
+        failures = self._wait_for_streamed()
+        tasks = self._drain_queues()
+        if is_local or offline_queue.is_offline():
+            failures += [(handler, item, None) for handler, item in tasks]
+            self._advance_progress(len(tasks))
+        else:
+            failures += self._run_tasks(tasks)
+        self._raise_if_cancelled()
+        permanent_errors = [error for _, _, error in failures if error is not None and not is_connectivity_error(error)]
+        pending = [(handler, item) for handler, item, error in failures if error is None or is_connectivity_error(error)]
+
+        # Nothing is journaled for an entry that cannot be completed, so the queue never holds half a submission
+        if permanent_errors:
+            raise SerialAPIException(f"Could not add data to process entry: An error occurred: {permanent_errors[0]}")
+        if not pending and not is_local and not offline_queue.is_offline():
+            try:
+                self.data = self.client.make_api_request(f"/processes/entries/{self.id}", "PATCH", data=data)
+                return self.data
+            except SerialAPIException as e:
+                if not is_connectivity_error(e):
+                    raise
+
+        offline_queue.register_entry(self.id, self.process_id, self.component_instance_id,
+                                     remote_id=None if is_local else self.id)
+        for handler, item in pending:
+            offline_queue.enqueue(self.id, "data", {"handler": handler.__name__, "item": item})
+        offline_queue.enqueue(self.id, "submit", data)
+        offline_queue.mark_offline()
+        self.data = {**self.data, **data, "queued_offline": True}
+        return self.data
+
+class ProcessEntryRecord(Record):
+    """
+    A read-only process entry returned by ProcessEntries.list and iter_list.
+    Adding data or submitting promotes it to a full ProcessEntry.
+    """
+    __slots__ = ()
+    _full_class = ProcessEntry
+    _full_attributes = ("client", "text_data_queue", "numerical_data_queue", "file_data_queue", "boolean_data_queue",
+                        "link_data_queue")
+
+    @property
+    def id(self):
+        return self.data["id"]
+
+    @property
+    def process_id(self):
+        return self.data["process_id"]
+
+    @property
+    def component_instance_id(self):
+        return self.data["unique_identifier_id"]
+
+# Handlers that journaled data operations may be replayed through
+_REPLAYABLE_HANDLERS = ("_process_single_text_data", "_process_single_numerical_data", "_process_single_file_data",
+                        "_process_single_boolean_data", "_process_single_link_data")
+
+def replay_operation(kind, payload, remote_id, process_id, component_instance_id):
+    """
+    Replays one operation journaled by the offline queue
+
+    Args:
+    - kind: "create", "data" or "submit"
+    - payload: The journaled operation arguments
+    - remote_id: Id of the process entry on the server (None for "create")
+    - process_id: Process id of the entry
+    - component_instance_id: Component instance id of the entry, if known
+
+    Returns:
+    - The API response for "create" and "submit" operations
+    """
+    if kind == "create":
+        return ProcessEntries._create_entry(**payload)
+    entry = ProcessEntry({"id": remote_id, "process_id": process_id, "unique_identifier_id": component_instance_id})
+    if kind == "data":
+        if payload["handler"] not in _REPLAYABLE_HANDLERS:
+            raise SerialAPIException(f"Unknown offline operation handler {payload['handler']}")
+        return getattr(entry, payload["handler"])(payload["item"])
+    if kind == "submit":
+        return entry.client.make_api_request(f"/processes/entries/{remote_id}", "PATCH", data=payload)
+    raise SerialAPIException(f"Unknown offline operation {kind}")
+
 class ProcessEntries:
     """
     A class for process entry data methods
@@ -451,7 +734,7 @@ class ProcessEntries:
         return ProcessEntry(entry)
 
     @staticmethod
-    def create(process_id, component_instance=None, component_instance_id=None, component_instance_identifier=None, station_id=None, timestamp=None, operator=None):
+    def create(process_id, component_instance=None, component_instance_id=None, component_instance_identifier=None, station_id=None, timestamp=None, operator=None, stream=None):
         """
         Creates a process entry
 
@@ -463,30 +746,73 @@ class ProcessEntries:
         - station_id?: Optional station id to override the default station id
         - timestamp?: Optional timestamp to override the default timestamp. Must be in ISO 8601 format
         - operator?: Optional operator object
+        - stream?: Whether to send data points in the background as they are added
+        (see ProcessEntry.start_streaming). Defaults to config.stream_data.
 
         Returns:
         - A process entry Python object
         """
-        client = APIClient()
+        entry = ProcessEntries._create(process_id, component_instance, component_instance_id,
+                                       component_instance_identifier, station_id, timestamp, operator)
+        if config.stream_data if stream is None else stream:
+            entry.start_streaming()
+        return entry
+
+    @staticmethod
+    def _create(process_id, component_instance, component_instance_id, component_instance_identifier, station_id, timestamp, operator):
         if component_instance:
             component_instance_id = component_instance.data["id"]
         if not component_instance_id and not component_instance_identifier:
             raise Exception("ComponentInstance id cannot be null, please pass in a valid one")
+        if timestamp and not is_iso_timestamp(timestamp):
+            raise Exception("Timestamp must be in ISO 8601 format")
+        entry_args = {
+            "process_id": process_id,
+            "component_instance_id": component_instance_id,
+            "component_instance_identifier": component_instance_identifier,
+            "station_id": station_id or config.station_id,
+            "timestamp": timestamp,
+            "operator_id": operator.data["id"] if operator else None,
+        }
+
+        offline_queue = get_offline_queue()
+        if offline_queue is None:
+            return ProcessEntry(ProcessEntries._create_entry(**entry_args))
+        if not offline_queue.is_offline():
+            try:
+                return ProcessEntry(ProcessEntries._create_entry(**entry_args))
+            except SerialAPIException as e:
+                if not is_connectivity_error(e):
+                    raise
+        # Journal the entry under a local id; it is created when the queue is replayed.
+        # The timestamp is fixed now so the entry records when the unit was tested.
+        entry_args["timestamp"] = timestamp or datetime.now(timezone.utc).isoformat()
+        local_id = offline_queue.new_local_id()
+        offline_queue.register_entry(local_id, process_id, component_instance_id)
+        offline_queue.enqueue(local_id, "create", entry_args)
+        offline_queue.mark_offline()
+        return ProcessEntry({"id": local_id, "process_id": process_id, "unique_identifier_id": component_instance_id,
+                             "timestamp": entry_args["timestamp"], "queued_offline": True})
+
+    @staticmethod
+    def _create_entry(process_id, component_instance_id=None, component_instance_identifier=None, station_id=None, timestamp=None, operator_id=None):
+        """
+        Creates a process entry on the server
+
+        Returns:
+        - The API process entry object
+        """
+        client = APIClient()
         if component_instance_identifier:
             component_instance_id = ComponentInstances.get(component_instance_identifier).data["id"]
         data = {"component_instance_id": component_instance_id, "process_id": process_id}
         if station_id:
             data["station_id"] = station_id
-        elif config.station_id:
-            data["station_id"] = config.station_id
         if timestamp:
-            if not is_iso_timestamp(timestamp):
-                raise Exception("Timestamp must be in ISO 8601 format")
             data["timestamp"] = timestamp
-        if operator:
-            data["operator_id"] = operator.data["id"]
-        entry = client.make_api_request("/processes/entries", "POST", data=data)
-        return ProcessEntry(entry)
+        if operator_id:
+            data["operator_id"] = operator_id
+        return client.make_api_request("/processes/entries", "POST", data=data)
 
     @staticmethod
     def list(query_params):
@@ -498,10 +824,43 @@ class ProcessEntries:
         https://docs.serial.io/api-reference/process-entries/get-process-entries
 
         Returns:
-        - A list of process entry Python objects, as defined above 
+        - A list of read-only process entry records, which become full process
+        entry Python objects when data is added to them
         """
         client = APIClient()
         entries = client.make_api_request("/processes/entries", "GET", params=query_params)
-        entry_object_list = [ProcessEntry(entry) for entry in entries]
+        entry_object_list = [ProcessEntryRecord(entry) for entry in entries]
         return entry_object_list
 
+    @staticmethod
+    def iter_list(query_params=None, page_size=None, prefetch=True):
+        """
+        Iterates over process entries a page at a time, so memory use does not
+        grow with the number of results
+
+        Args:
+        - query_params?: Query parameters for filtering process entries, as for list
+        - page_size?: Process entries per request (defaults to config.list_page_size)
+        - prefetch?: Whether to fetch the next page in the background
+
+        Returns:
+        - A generator of read-only process entry records, as for list
+        """
+        for page in iter_pages(APIClient(), "/processes/entries", query_params, page_size, prefetch):
+            for entry in page:
+                yield ProcessEntryRecord(entry)
+
+    @staticmethod
+    def stream_list(query_params=None):
+        """
+        Lists process entries with a single request, decoding each record as it
+        arrives instead of reading the whole response before the first one
+
+        Args:
+        - query_params?: Query parameters for filtering process entries, as for list
+
+        Returns:
+        - A generator of read-only process entry records, as for list
+        """
+        for entry in APIClient().iter_api_request("/processes/entries", params=query_params):
+            yield ProcessEntryRecord(entry)
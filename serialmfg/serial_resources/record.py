@@ -0,0 +1,60 @@
+"""
+This file contains the Record class, the base of the compact read-only objects
+returned by list methods
+"""
+
+class Record:
+    """
+    A read-only view over an API object. Records use __slots__ and read fields
+    from the API object on access, so large result sets cost little more than
+    the parsed JSON. Using anything only the full resource object has, such as
+    add_text or submit on a process entry, promotes the record to a full object
+    that it then delegates to. Any other name raises AttributeError without
+    promoting the record.
+    """
+    __slots__ = ("_data", "_full")
+    # The full resource class a record is promoted to, set by subclasses
+    _full_class = None
+    # Attributes the full class sets on its instances, which promote the record like its methods do
+    _full_attributes = ()
+
+    def __init__(self, data):
+        """
+        Args:
+        - data: The API object
+
+        Returns:
+        - A record holding the api object at data
+        """
+        self._data = data
+        self._full = None
+
+    @property
+    def data(self):
+        return self._data if self._full is None else self._full.data
+
+    def promote(self):
+        """
+        Returns:
+        - The full resource object for this record, created on first use
+        """
+        if self._full is None:
+            self._full = self._full_class(self._data)
+        return self._full
+
+    def __getattr__(self, name):
+        # Only called for names the record does not define
+        if name.startswith("__") or name in Record.__slots__:
+            raise AttributeError(name)
+        if self._full is None and not (hasattr(self._full_class, name) or name in self._full_attributes):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return getattr(self.promote(), name)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.data.get('id')!r})"
@@ -0,0 +1,228 @@
+"""
+This file contains SubmitHandle, returned by ProcessEntry.submit_async, and the
+executor that runs background submissions. Submissions run on their own small
+thread pool so a station thread is free as soon as it hands off an entry, while
+the data points themselves still go through the shared worker pool. Pending
+submissions are drained at interpreter exit, for up to
+config.submit_drain_timeout seconds.
+
+Both pools run on DaemonExecutor threads rather than concurrent.futures
+executors, because concurrent.futures joins its threads, waiting for every
+queued task, before any atexit handler runs. The drain is a plain atexit
+handler that runs while submissions are still in flight, and before the worker
+pool's own atexit shutdown, which was registered first.
+"""
+import atexit
+import threading
+import time
+from concurrent.futures import wait
+from . import config
+from .worker_pool import DaemonExecutor
+from .exceptions import SerialAPIException
+
+
+class SubmitCancelled(SerialAPIException):
+    """
+    Exception for when a background submission is cancelled before it completes
+    """
+    pass
+
+
+class SubmitHandle:
+    """
+    A background process entry submission
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, entry, total):
+        """
+        Args:
+        - entry: The process entry being submitted
+        - total: Number of data points to send, including any already streamed
+
+        Returns:
+        - A handle that is pending until the submission starts
+        """
+        self.entry = entry
+        self.total = total
+        self._done = 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._started = False
+        self._future = None
+        self.submitted_at = time.time()
+        self.completed_at = None
+
+    def _start(self, fn):
+        self._future = _get_executor().submit(self._run, fn)
+        with _handles_lock:
+            _handles.add(self)
+        self._future.add_done_callback(self._finish)
+        return self
+
+    def _run(self, fn):
+        with self._lock:
+            if self._cancelled.is_set():
+                raise SubmitCancelled("Submission was cancelled before it started")
+            self._started = True
+        return fn()
+
+    def _finish(self, future):
+        self.completed_at = time.time()
+        with _handles_lock:
+            _handles.discard(self)
+
+    def _advance(self, count=1):
+        with self._lock:
+            self._done += count
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def status(self):
+        """
+        Returns:
+        - "pending", "running", "done", "failed" or "cancelled"
+        """
+        if self._future is None or not self._future.done():
+            if self._cancelled.is_set():
+                return self.CANCELLED
+            return self.RUNNING if self._started else self.PENDING
+        if self._future.cancelled():
+            return self.CANCELLED
+        error = self._future.exception()
+        if error is None:
+            return self.DONE
+        return self.CANCELLED if isinstance(error, SubmitCancelled) else self.FAILED
+
+    def progress(self):
+        """
+        Returns:
+        - A (done, total) tuple of data points processed, whether or not they succeeded
+        """
+        with self._lock:
+            return self._done, self.total
+
+    def done(self):
+        """
+        Returns:
+        - True once the submission has completed, failed or been cancelled
+        """
+        return self._future is not None and self._future.done()
+
+    def result(self, timeout=None):
+        """
+        Waits for the submission
+
+        Args:
+        - timeout?: Seconds to wait (None waits until it finishes)
+
+        Returns:
+        - API response for submitting the process entry. Raises the submission's
+          error, SubmitCancelled if it was cancelled, or TimeoutError
+        """
+        self._wait(timeout)
+        return self._future.result()
+
+    def exception(self, timeout=None):
+        """
+        Returns:
+        - The error the submission failed with, or None
+        """
+        self._wait(timeout)
+        return self._future.exception()
+
+    def _wait(self, timeout):
+        wait([self._future], timeout)
+        if not self._future.done():
+            raise TimeoutError(f"Submission of process entry {self.entry.id} did not finish in {timeout} seconds")
+        if self._future.cancelled():
+            raise SubmitCancelled("Submission was cancelled before it started")
+
+    def cancel(self):
+        """
+        Cancels the submission. A pending submission never starts; a running one
+        stops sending data points that have not started yet and does not
+        complete the entry. Data points already sent stay on the entry.
+
+        Returns:
+        - False if the submission had already finished
+        """
+        if self.done():
+            return False
+        with self._lock:
+            self._cancelled.set()
+            started = self._started
+        if not started:
+            # Resolve the future now so waiters do not depend on the executor
+            self._future.cancel()
+        for _, _, future in list(getattr(self.entry, "_streamed", [])):
+            future.cancel()
+        return True
+
+    def __repr__(self):
+        done, total = self.progress()
+        return f"<SubmitHandle entry={self.entry.id} status={self.status} progress={done}/{total}>"
+
+
+_executor = None
+_executor_lock = threading.Lock()
+# Handles that have not finished yet
+_handles = set()
+_handles_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = DaemonExecutor(config.submit_workers, "serialmfg-submit")
+    return _executor
+
+
+def pending_submissions():
+    """
+    Returns:
+    - A list of SubmitHandles for background submissions that have not finished
+    """
+    with _handles_lock:
+        return [handle for handle in _handles if not handle.done()]
+
+
+def drain_submissions(timeout=None):
+    """
+    Waits for background submissions to finish. Submissions still pending when
+    the timeout expires are cancelled.
+
+    Args:
+    - timeout?: Seconds to wait (None waits for every submission)
+
+    Returns:
+    - The number of submissions that were cancelled because they did not finish in time
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        handles = pending_submissions()
+        if not handles:
+            return 0
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return sum(handle.cancel() for handle in handles)
+        wait([handle._future for handle in handles], remaining)
+
+
+def _drain_at_exit():
+    if not pending_submissions():
+        return
+    cancelled = drain_submissions(config.submit_drain_timeout)
+    if cancelled:
+        print(f"Cancelled {cancelled} process entry submissions that did not finish before exit")
+
+
+atexit.register(_drain_at_exit)
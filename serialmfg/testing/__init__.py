@@ -0,0 +1,9 @@
+"""serialmfg.testing Module
+Exports tools for exercising the library without a live Serial API
+FakeSerialAPI (an in-memory implementation of the endpoints the library uses)
+MockSerialServer (a local HTTP server backed by a FakeSerialAPI)
+FakeTransport (a requests transport adapter that serves a FakeSerialAPI in-process)
+"""
+from .fake_api import FakeSerialAPI
+from .mock_server import MockSerialServer
+from .fake_transport import FakeTransport
@@ -0,0 +1,291 @@
+"""
+This file contains the FakeSerialAPI class, an in-memory stand-in for the parts
+of the Serial API used by this library. It is used by MockSerialServer to test
+and benchmark the library without a live API.
+"""
+import json
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from ..utils.compression import decompress
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _new_id():
+    return str(uuid.uuid4())
+
+
+def decode_body(raw, content_type=None, content_encoding=None):
+    """
+    Args:
+    - raw: Request body bytes
+    - content_type?: Content-Type header
+    - content_encoding?: Content-Encoding header of a compressed body
+
+    Returns:
+    - The body as FakeSerialAPI.handle expects it: parsed JSON, or the file name
+      and size of a multipart upload
+    """
+    raw = decompress(raw, content_encoding)
+    if (content_type or "").startswith("multipart/form-data"):
+        match = re.search(rb'filename="([^"]*)"', raw)
+        return {"file_name": match.group(1).decode("utf-8") if match else None, "size": len(raw)}
+    return json.loads(raw) if raw else None
+
+
+# Query parameters that filter on a differently named field
+_PARAM_ALIASES = {"component_instance_id": "unique_identifier_id"}
+
+
+def _matches(record, params):
+    for key, value in (params or {}).items():
+        key = _PARAM_ALIASES.get(key, key)
+        if key not in record:
+            continue
+        if str(record[key]).lower() != str(value).lower():
+            return False
+    return True
+
+
+class FakeSerialAPI:
+    """
+    In-memory Serial API. handle() takes a parsed request and returns a
+    (status code, JSON-serializable body) tuple.
+    """
+    def __init__(self, supports_batch=True):
+        """
+        Args:
+        - supports_batch?: Whether PUT /processes/entries/{id}/data accepts a
+          list of data points, or returns 405 like a server without batching
+        """
+        self.supports_batch = supports_batch
+        self._lock = threading.RLock()
+        self.components = {}
+        self.component_instances = {}
+        self._instance_identifiers = set()
+        self.component_links = []
+        self.component_instance_links = []
+        self.part_numbers = {}
+        self.datasets = {}
+        self.process_entries = {}
+        self.process_entry_data = []
+        self.files = {}
+        self.operators = {}
+        self.requests = []
+
+    # ----------- Seeding ----------- #
+
+    def add_component(self, name):
+        """
+        Returns:
+        - The new component record
+        """
+        with self._lock:
+            component = {"id": _new_id(), "name": name, "component_type": "SN", "is_active": True,
+                         "created_at": _now()}
+            self.components[component["id"]] = component
+            return component
+
+    def add_component_instance(self, identifier, component_name):
+        """
+        Returns:
+        - The new component instance record, creating its component if needed
+        """
+        with self._lock:
+            component = next((c for c in self.components.values() if c["name"] == component_name), None)
+            if component is None:
+                component = self.add_component(component_name)
+            return self._create_component_instance({"identifier": identifier, "component_id": component["id"]})
+
+    def add_operator(self, first_name, last_name, pin=None):
+        """
+        Returns:
+        - The new operator record
+        """
+        with self._lock:
+            operator = {"id": _new_id(), "first_name": first_name, "last_name": last_name, "pin": pin}
+            self.operators[operator["id"]] = operator
+            return operator
+
+    def request_count(self, method=None, path=None):
+        """
+        Returns:
+        - The number of handled requests, optionally filtered by method and path
+        """
+        with self._lock:
+            return sum(1 for m, p in self.requests
+                       if (method is None or m == method) and (path is None or p == path))
+
+    def reset_request_log(self):
+        with self._lock:
+            self.requests.clear()
+
+    def forget_history(self):
+        """
+        Drops the request log, data points, uploaded files, links and completed
+        process entries, so a long running load test does not grow the fake
+        """
+        with self._lock:
+            self.requests.clear()
+            self.process_entry_data.clear()
+            self.files.clear()
+            self.component_links.clear()
+            self.component_instance_links.clear()
+            self.process_entries = {entry_id: entry for entry_id, entry in self.process_entries.items()
+                                    if not entry["is_complete"]}
+
+    # ----------- Request handling ----------- #
+
+    def handle(self, method, path, params=None, body=None):
+        """
+        Args:
+        - method: HTTP method
+        - path: Request path, without the base URL
+        - params?: Dictionary of query parameters
+        - body?: Parsed JSON body, or the multipart file name for POST /files
+
+        Returns:
+        - A (status code, response body) tuple
+        """
+        params = params or {}
+        with self._lock:
+            self.requests.append((method, path))
+            parts = [part for part in path.split("/") if part]
+            if parts == ["components"] and method == "GET":
+                return 200, [c for c in self.components.values() if _matches(c, params)]
+            if parts == ["components", "instances"]:
+                if method == "GET":
+                    return 200, self._list(self.component_instances.values(), params)
+                if method == "PUT":
+                    return self._put_component_instance(body or {})
+            if parts == ["components", "instances", "links"] and method == "PUT":
+                return self._put_component_instance_link(body or {})
+            if parts == ["components", "links"] and method == "PUT":
+                link = {"id": _new_id(), **(body or {})}
+                self.component_links.append(link)
+                return 200, link
+            if parts == ["datasets"]:
+                if method == "GET":
+                    return 200, self._list(self.datasets.values(), params)
+                if method == "PUT":
+                    return self._put_dataset(body or {})
+            if parts == ["part-numbers"]:
+                if method == "GET":
+                    return 200, self._list(self.part_numbers.values(), params)
+                if method == "POST":
+                    part_number = {"id": _new_id(), **(body or {})}
+                    self.part_numbers[part_number["id"]] = part_number
+                    return 200, part_number
+            if parts == ["operators"] and method == "GET":
+                return 200, self._list(self.operators.values(), params)
+            if parts == ["files"] and method == "POST":
+                file_id = _new_id()
+                self.files[file_id] = body
+                return 200, {"name": file_id}
+            if parts == ["processes", "entries"]:
+                if method == "GET":
+                    return 200, self._list(self.process_entries.values(), params)
+                if method == "POST":
+                    return self._post_process_entry(body or {})
+            if len(parts) == 3 and parts[:2] == ["processes", "entries"]:
+                if method == "PUT":
+                    return self._put_process_entry_data(parts[2], body or {})
+                if method == "PATCH":
+                    return self._patch_process_entry(parts[2], body or {})
+            if len(parts) == 4 and parts[:2] == ["processes", "entries"] and parts[3] == "data" and method == "PUT":
+                if not self.supports_batch:
+                    return 405, {"message": f"{method} {path} not allowed"}
+                return self._put_process_entry_data_batch(parts[2], body or [])
+            return 404, {"message": f"{method} {path} not found"}
+
+    def _list(self, records, params):
+        # limit and offset page through the results in insertion order
+        filters = {key: value for key, value in params.items() if key not in ("limit", "offset")}
+        records = [record for record in records if _matches(record, filters)] if filters else list(records)
+        offset = int(params.get("offset") or 0)
+        limit = params.get("limit")
+        return records[offset:offset + int(limit) if limit is not None else None]
+
+    def _create_component_instance(self, data):
+        instance = {"id": _new_id(), "identifier": data["identifier"], "component_id": data["component_id"],
+                    "part_number_id": data.get("part_number_id"), "status": "PLANNED",
+                    "created_at": _now(), "last_updated_at": _now(), "completed_at": None, "is_archived": False}
+        self.component_instances[instance["id"]] = instance
+        self._instance_identifiers.add(instance["identifier"])
+        return instance
+
+    def _put_component_instance(self, data):
+        if data.get("component_id") not in self.components:
+            return 400, {"message": "Component does not exist"}
+        if data.get("identifier") in self._instance_identifiers:
+            return 409, {"message": f"Component instance {data.get('identifier')} already exists"}
+        return 200, self._create_component_instance(data)
+
+    def _put_component_instance_link(self, data):
+        for key in ("parent_component_instance_id", "child_component_instance_id"):
+            if data.get(key) not in self.component_instances:
+                return 400, {"message": f"{key} does not exist"}
+        broken_links = []
+        if data.get("break_prior_links"):
+            for link in self.component_instance_links:
+                if link["has_child_of_id"] == data["child_component_instance_id"] and link["is_active"]:
+                    link.update(is_active=False, removed_at=_now())
+                    broken_links.append(link)
+        link = {"id": _new_id(), "unique_identifier_id": data["parent_component_instance_id"],
+                "has_child_of_id": data["child_component_instance_id"], "dataset_id": data.get("dataset_id"),
+                "process_entry_id": data.get("process_entry_id"), "is_active": True, "created_at": _now()}
+        self.component_instance_links.append(link)
+        return 200, {"new_link": link, "broken_links": broken_links}
+
+    def _put_dataset(self, data):
+        for dataset in self.datasets.values():
+            if (dataset["name"], dataset["type"], dataset["process_id"]) == (data.get("name"), data.get("type"), data.get("process_id")):
+                return 200, dataset
+        dataset = {"id": _new_id(), "name": data.get("name"), "type": data.get("type"),
+                   "process_id": data.get("process_id"), "usl": data.get("usl"), "lsl": data.get("lsl"),
+                   "unit": data.get("unit"), "is_active": True, "created_at": _now()}
+        self.datasets[dataset["id"]] = dataset
+        return 200, dataset
+
+    def _post_process_entry(self, data):
+        if data.get("component_instance_id") not in self.component_instances:
+            return 400, {"message": "Component instance does not exist"}
+        entry = {"id": _new_id(), "process_id": data.get("process_id"),
+                 "unique_identifier_id": data["component_instance_id"], "station_id": data.get("station_id"),
+                 "operator_id": data.get("operator_id"), "timestamp": data.get("timestamp") or _now(),
+                 "cycle_time": None, "is_pass": None, "is_complete": False, "upload_error": False,
+                 "created_at": _now()}
+        self.process_entries[entry["id"]] = entry
+        return 200, entry
+
+    def _put_process_entry_data(self, entry_id, data):
+        entry = self.process_entries.get(entry_id)
+        if entry is None:
+            return 404, {"message": f"Process entry {entry_id} not found"}
+        if data.get("dataset_id") not in self.datasets:
+            return 400, {"message": "Dataset does not exist"}
+        record = {"id": _new_id(), "process_entry_id": entry_id,
+                  "unique_identifier_id": entry["unique_identifier_id"], "created_at": _now(), **data}
+        self.process_entry_data.append(record)
+        return 200, record
+
+    def _put_process_entry_data_batch(self, entry_id, data_points):
+        # All or nothing, so a failed batch can be retried as a whole
+        if entry_id not in self.process_entries:
+            return 404, {"message": f"Process entry {entry_id} not found"}
+        if not isinstance(data_points, list):
+            return 400, {"message": "Expected a list of data points"}
+        if any(data.get("dataset_id") not in self.datasets for data in data_points):
+            return 400, {"message": "Dataset does not exist"}
+        return 200, [self._put_process_entry_data(entry_id, data)[1] for data in data_points]
+
+    def _patch_process_entry(self, entry_id, data):
+        entry = self.process_entries.get(entry_id)
+        if entry is None:
+            return 404, {"message": f"Process entry {entry_id} not found"}
+        entry.update(data)
+        return 200, entry
@@ -0,0 +1,184 @@
+"""
+This file contains the FakeTransport class, a requests transport adapter that
+answers requests in-process from a FakeSerialAPI. Unlike MockSerialServer no
+sockets or server threads are involved, so without injected latency the time a
+request takes is the library's own overhead: building and encoding the
+request, decoding the response, and everything around it. Latency and errors
+can be injected to exercise station code under realistic or failing conditions.
+"""
+import gzip
+import io
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl
+import requests
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+from .. import config
+from .fake_api import FakeSerialAPI, decode_body
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 429: "Too Many Requests",
+            500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"}
+_CHUNK_SIZE = 64 * 1024
+# Responses smaller than this are not worth compressing
+_COMPRESS_MIN_SIZE = 1024
+
+
+class FakeTransport(BaseAdapter):
+    """
+    A transport adapter serving a FakeSerialAPI. Send every request through it
+    with serial.set_transport:
+
+        transport = FakeTransport(latency=0.02, error_rate=0.01, seed=1)
+        serial.set_transport(transport)
+        transport.api.add_component_instance("ABC-1234", "Component Name")
+    """
+    url = "http://serial.fake"
+
+    def __init__(self, api=None, url=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 connection_error_rate=0.0, seed=None, compress_responses=False):
+        """
+        Args:
+        - api?: FakeSerialAPI to serve; a new one is created by default
+        - url?: Base URL requests are answered for, when mounted with mount()
+        - latency?: Seconds each request takes, before any jitter
+        - jitter?: Up to this many extra seconds are added to each request, at random
+        - error_rate?: Fraction of requests answered with error_status without
+          reaching the fake API
+        - error_status?: Status code of injected errors
+        - connection_error_rate?: Fraction of requests that fail with a connection error
+        - seed?: Seed for the random latency and errors, so runs are repeatable
+        - compress_responses?: Whether to gzip large responses for clients that accept it
+        """
+        super().__init__()
+        self.api = api or FakeSerialAPI()
+        if url is not None:
+            self.url = url.rstrip("/")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.connection_error_rate = connection_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._scheduled_failures = []
+        self.compress_responses = compress_responses
+        self.injected_errors = 0
+        # Body bytes as they would go over the wire, i.e. after any compression
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+    def mount(self, session):
+        """
+        Routes the session's requests for this transport's url through it
+
+        Returns:
+        - The transport
+        """
+        session.mount(self.url, self)
+        return self
+
+    def fail_next(self, count=1, status=503, path=None):
+        """
+        Makes the next matching requests fail, regardless of error_rate
+
+        Args:
+        - count?: Number of requests to fail
+        - status?: Status code to answer with, or None for a connection error
+        - path?: Only fail requests whose path starts with this
+        """
+        with self._lock:
+            self._scheduled_failures.extend([(path, status)] * count)
+
+    def _injected_failure(self, path):
+        # Returns (True, status) if the request should fail, with None for a connection error
+        with self._lock:
+            for i, (prefix, status) in enumerate(self._scheduled_failures):
+                if prefix is None or path.startswith(prefix):
+                    del self._scheduled_failures[i]
+                    self.injected_errors += 1
+                    return True, status
+            roll = self._random.random()
+            if roll < self.connection_error_rate:
+                self.injected_errors += 1
+                return True, None
+            if roll < self.connection_error_rate + self.error_rate:
+                self.injected_errors += 1
+                return True, self.error_status
+            return False, None
+
+    def _delay(self):
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def _path(self, url):
+        # Paths are relative to the base URL, which may itself have a path
+        for base_url in (self.url, config.base_url or ""):
+            base_path = urlsplit(base_url).path.rstrip("/")
+            if base_path and url.path.startswith(base_path + "/"):
+                return url.path[len(base_path):]
+        return url.path
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlsplit(request.url)
+        path = self._path(url)
+        body = _read_body(request.body)
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        failed, status = self._injected_failure(path)
+        if failed and status is None:
+            raise requests.exceptions.ConnectionError(f"Injected connection error for {request.method} {path}",
+                                                      request=request)
+        if failed:
+            payload = {"message": "Injected error"}
+        else:
+            status, payload = self.api.handle(request.method, path, dict(parse_qsl(url.query)),
+                                              decode_body(body, request.headers.get("Content-Type"),
+                                                          request.headers.get("Content-Encoding")))
+        content = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if (self.compress_responses and len(content) >= _COMPRESS_MIN_SIZE
+                and "gzip" in request.headers.get("Accept-Encoding", "")):
+            content = gzip.compress(content, compresslevel=6, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        with self._lock:
+            self.bytes_received += len(body)
+            self.bytes_sent += len(content)
+        response = Response()
+        response.status_code = status
+        response.reason = _REASONS.get(status, "")
+        response.headers = CaseInsensitiveDict(headers)
+        # Read through a urllib3 response like a real one, so stream=True requests
+        # work and compressed bodies are decoded
+        response.raw = HTTPResponse(body=io.BytesIO(content), headers=headers, status=status,
+                                    preload_content=False, decode_content=True)
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def _read_body(body):
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, bytes):
+        return body
+    # A streamed body is consumed the way an HTTP connection would read it
+    chunks = []
+    while True:
+        chunk = body.read(_CHUNK_SIZE)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
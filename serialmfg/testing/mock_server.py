@@ -0,0 +1,105 @@
+"""
+This file contains the MockSerialServer class, a local HTTP server that serves
+a FakeSerialAPI so the library can be exercised end to end without a live API
+"""
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+from .fake_api import FakeSerialAPI, decode_body
+
+# Responses smaller than this are not worth compressing
+_COMPRESS_MIN_SIZE = 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY, Nagle's
+    # algorithm and delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            raw = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                chunk = self.rfile.read(size + 2)
+                if size == 0:
+                    break
+                raw += chunk[:-2]
+        else:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+        return decode_body(raw, self.headers.get("Content-Type"), self.headers.get("Content-Encoding"))
+
+    def _handle(self):
+        url = urlsplit(self.path)
+        body = self._read_body()
+        status, payload = self.server.api.handle(self.command, url.path, dict(parse_qsl(url.query)), body)
+        out = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if (self.server.compress_responses and len(out) >= _COMPRESS_MIN_SIZE
+                and "gzip" in self.headers.get("Accept-Encoding", "")):
+            out = gzip.compress(out, compresslevel=6, mtime=0)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many concurrent station threads connect at once; the default backlog of 5 resets them
+    request_queue_size = 256
+
+
+class MockSerialServer:
+    """
+    A threaded HTTP server on localhost backed by a FakeSerialAPI. Use it as a
+    context manager and point the library at its url:
+
+        with MockSerialServer() as server:
+            serial.set_base_url(server.url)
+    """
+    def __init__(self, api=None, host="127.0.0.1", port=0, compress_responses=False):
+        """
+        Args:
+        - api?: FakeSerialAPI to serve; a new one is created by default
+        - host?: Interface to bind
+        - port?: Port to bind (0 picks a free port)
+        - compress_responses?: Whether to gzip large responses for clients that accept it
+        """
+        self.api = api or FakeSerialAPI()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.api = self.api
+        self._httpd.compress_responses = compress_responses
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="serialmfg-mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,152 @@
+"""
+This file contains the LRUCache class, a small thread-safe cache used to avoid
+repeating lookups against the Serial API
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Default of configure_cache arguments, meaning the setting is left as it is
+UNSET = object()
+
+
+class LRUCache:
+    """
+    A thread-safe, size bounded least-recently-used cache with an optional
+    time-to-live for each entry
+    """
+    def __init__(self, max_size=1024, ttl=None):
+        """
+        Args:
+        - max_size: Maximum number of entries held before the least recently
+          used entry is evicted
+        - ttl?: Optional number of seconds after which an entry expires (0
+          expires entries immediately, None never expires them)
+
+        Returns:
+        - An empty cache
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Gets a cached value, if it exists and has not expired
+
+        Args:
+        - key: Cache key
+        - default?: Value returned on a miss
+
+        Returns:
+        - The cached value, or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """
+        Gets a cached value without counting a hit or miss or refreshing its
+        recency, e.g. to find related keys to invalidate
+
+        Args:
+        - key: Cache key
+        - default?: Value returned if the key is missing or expired
+
+        Returns:
+        - The cached value, or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+                return default
+            return entry[0]
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting the least recently used entry if the cache is full
+
+        Args:
+        - key: Cache key
+        - value: Value to be cached
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """
+        Removes a single entry, or every entry if no key is given
+
+        Args:
+        - key?: Cache key to remove
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Removes every entry whose key matches a predicate
+
+        Args:
+        - predicate: Function taking a key and returning True if it should be removed
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary of hit, miss and eviction counters and the current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def keys(self):
+        """
+        Returns:
+        - A snapshot of the cached keys, least recently used first
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
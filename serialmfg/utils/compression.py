@@ -0,0 +1,283 @@
+"""
+This file contains request body compression: gzip, from the standard library,
+and zstd, which requires the optional zstandard dependency (pip install
+serialmfg[zstd]). Compression is off unless config.compression is set, and the
+server must accept compressed request bodies (Content-Encoding).
+"""
+import gzip
+import threading
+import time
+import zlib
+from .. import config
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Content types worth compressing; images, archives and most binaries already are
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/xml", "application/csv",
+                       "application/javascript", "application/x-yaml", "application/yaml", "image/svg+xml")
+# Text formats common on test stations that mimetypes does not know
+_COMPRESSIBLE_EXTENSIONS = (".log", ".txt", ".csv", ".tsv", ".json", ".xml", ".yaml", ".yml", ".ini", ".cfg",
+                            ".hex")
+
+
+class GzipCodec:
+    encoding = "gzip"
+    default_level = 6
+
+    @staticmethod
+    def compress(data, level=None):
+        return gzip.compress(data, compresslevel=GzipCodec.default_level if level is None else level, mtime=0)
+
+    @staticmethod
+    def compressor(level=None):
+        """
+        Returns:
+        - A streaming compressor with compress(data) and flush() methods
+        """
+        return zlib.compressobj(GzipCodec.default_level if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    @staticmethod
+    def decompress(data):
+        return gzip.decompress(data)
+
+
+class ZstdCodec:
+    encoding = "zstd"
+    default_level = 3
+
+    @staticmethod
+    def compress(data, level=None):
+        return zstandard.ZstdCompressor(level=ZstdCodec.default_level if level is None else level).compress(data)
+
+    @staticmethod
+    def compressor(level=None):
+        return zstandard.ZstdCompressor(level=ZstdCodec.default_level if level is None else level).compressobj()
+
+    @staticmethod
+    def decompress(data):
+        # Streamed frames do not record their size, which decompress() requires
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+_CODECS = {"gzip": GzipCodec, "zstd": ZstdCodec}
+
+
+def get_codec(name):
+    """
+    Args:
+    - name: "gzip", "zstd" or None
+
+    Returns:
+    - The codec, or None if name is None
+    """
+    if name is None:
+        return None
+    if name not in _CODECS:
+        raise ValueError(f"Unknown compression {name}, expected one of {', '.join(_CODECS)}")
+    if name == "zstd" and zstandard is None:
+        raise ImportError("zstd compression requires zstandard. Install it with `pip install serialmfg[zstd]`")
+    return _CODECS[name]
+
+
+def set_compression(compression, min_size=None, level=None, files=None):
+    """
+    Compresses request bodies, which the server must accept with a matching
+    Content-Encoding
+
+    Args:
+    - compression: "gzip", "zstd", or None to turn compression off
+    - min_size?: Bodies smaller than this many bytes are sent as they are
+    - level?: Compression level (None uses the codec's default)
+    - files?: Whether to also compress uploads of compressible files, e.g. logs
+    """
+    get_codec(compression)
+    config.compression = compression
+    config.compression_level = level
+    if min_size is not None:
+        config.compression_min_size = min_size
+    if files is not None:
+        config.compress_files = files
+
+
+def is_compressible(content_type, file_name=None):
+    """
+    Args:
+    - content_type: The file's content type
+    - file_name?: The file's name, checked for text extensions when the content
+      type is not known to be compressible
+
+    Returns:
+    - True if the file is likely to compress well
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type.startswith(_COMPRESSIBLE_TYPES) or content_type.endswith(("+json", "+xml")):
+        return True
+    return (file_name or "").lower().endswith(_COMPRESSIBLE_EXTENSIONS)
+
+
+class CompressionStats:
+    """
+    Thread-safe counters of the bytes compression saved and the time it took
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bodies = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.seconds = 0.0
+
+    def record(self, bytes_in, bytes_out, seconds):
+        """
+        Args:
+        - bytes_in: Size of the body before compression
+        - bytes_out: Size of the body sent
+        - seconds: CPU time spent compressing it
+        """
+        with self._lock:
+            self.bodies += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.seconds += seconds
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary of the bodies compressed, bytes before and after
+          compression, bytes saved, the compression ratio and the time spent
+        """
+        with self._lock:
+            return {
+                "bodies": self.bodies,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 1.0,
+                "seconds": self.seconds,
+            }
+
+
+_stats = CompressionStats()
+
+
+def get_compression_stats():
+    """
+    Returns:
+    - The CompressionStats shared by the sync and asyncio clients
+    """
+    return _stats
+
+
+def compress_body(data):
+    """
+    Compresses an encoded JSON request body with config.compression
+
+    Args:
+    - data: The body bytes
+
+    Returns:
+    - A tuple of the body to send and its Content-Encoding, which is None when
+      the body is left as it is: compression is off, the body is smaller than
+      config.compression_min_size, or it did not get any smaller
+    """
+    codec = get_codec(config.compression)
+    if codec is None or len(data) < config.compression_min_size:
+        return data, None
+    started = time.thread_time()
+    compressed = codec.compress(data, config.compression_level)
+    _stats.record(len(data), min(len(data), len(compressed)), time.thread_time() - started)
+    if len(compressed) >= len(data):
+        return data, None
+    return compressed, codec.encoding
+
+
+def compress_upload(body):
+    """
+    Wraps a MultipartEncoder in a CompressedReader if config.compress_files is
+    on and every file in it is compressible
+
+    Args:
+    - body: A MultipartEncoder
+
+    Returns:
+    - The body to send, whose content_encoding is None if it is not compressed
+    """
+    codec = get_codec(config.compression) if config.compress_files else None
+    if (codec is None or body.len < config.compression_min_size
+            or not all(is_compressible(content_type, file_name) for file_name, content_type in body.file_types)):
+        return body
+    return CompressedReader(body, codec, config.compression_level)
+
+
+class CompressedReader:
+    """
+    A read-only file-like body compressing another one as it is read, so large
+    uploads are never held in memory. Its length is unknown up front, so it is
+    sent with chunked transfer encoding.
+    """
+    def __init__(self, body, codec, level=None):
+        """
+        Args:
+        - body: A file-like body with read(size) and reset(), e.g. a MultipartEncoder
+        - codec: GzipCodec or ZstdCodec
+        - level?: Compression level (None uses the codec's default)
+        """
+        self._body = body
+        self._codec = codec
+        self._level = level
+        self.content_type = body.content_type
+        self.content_encoding = codec.encoding
+        self.reset()
+
+    def reset(self):
+        """
+        Rewinds the body so it can be sent again, e.g. when a request is retried
+        """
+        self._body.reset()
+        self._compressor = self._codec.compressor(self._level)
+        self._buffer = b""
+        self._done = False
+        self._seconds = 0.0
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        """
+        Reads up to size bytes of the compressed body (all remaining bytes if
+        size is negative)
+        """
+        while (size is None or size < 0 or len(self._buffer) < size) and not self._done:
+            chunk = self._body.read(64 * 1024)
+            started = time.thread_time()
+            if chunk:
+                self._buffer += self._compressor.compress(chunk)
+            else:
+                self._buffer += self._compressor.flush()
+                self._done = True
+            self._seconds += time.thread_time() - started
+            if self._done:
+                _stats.record(self._body.bytes_read, self.bytes_read + len(self._buffer), self._seconds)
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.bytes_read += len(data)
+        return data
+
+
+def decompress(data, content_encoding):
+    """
+    Args:
+    - data: A request or response body
+    - content_encoding?: Its Content-Encoding header
+
+    Returns:
+    - The decompressed body
+    """
+    if not content_encoding or content_encoding == "identity":
+        return data
+    return get_codec(content_encoding).decompress(data)
@@ -0,0 +1,140 @@
+"""
+This file contains the MultipartEncoder class, which streams multipart/form-data
+file uploads in fixed size chunks, and the UploadStats counters
+"""
+import os
+import threading
+import uuid
+
+CHUNK_SIZE = 64 * 1024
+# Characters that would end a quoted Content-Disposition parameter or the header line itself
+_HEADER_ESCAPES = str.maketrans({'"': "%22", "\\": "%5C", "\r": "%0D", "\n": "%0A"})
+
+
+def file_size(fileobj):
+    start = fileobj.tell()
+    try:
+        return os.fstat(fileobj.fileno()).st_size - start
+    except (AttributeError, OSError):
+        size = fileobj.seek(0, os.SEEK_END) - start
+        fileobj.seek(start)
+        return size
+
+
+class MultipartEncoder:
+    """
+    A read-only file-like multipart/form-data body. Files are read lazily in
+    chunks as the HTTP library consumes the body, so memory use does not grow
+    with file size.
+    """
+    content_encoding = None
+
+    def __init__(self, files):
+        """
+        Args:
+        - files: A dictionary of form field name to a (file name, file object,
+          content type) tuple, in the same shape requests accepts for files=
+
+        Returns:
+        - An encoder exposing read(), len() and the content_type header value
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._parts = []
+        self.file_types = []
+        for field_name, (file_name, fileobj, content_type) in files.items():
+            file_name = file_name.translate(_HEADER_ESCAPES)
+            header = (f'--{self.boundary}\r\n'
+                      f'Content-Disposition: form-data; name="{field_name.translate(_HEADER_ESCAPES)}"; '
+                      f'filename="{file_name}"\r\n'
+                      f'Content-Type: {content_type or "application/octet-stream"}\r\n\r\n').encode("utf-8")
+            self._parts.append((header, fileobj, fileobj.tell(), file_size(fileobj)))
+            self.file_types.append((file_name, content_type))
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self.len = (sum(len(header) + size for header, _, _, size in self._parts)
+                    + len(b"\r\n") * (len(self._parts) - 1) + len(self._tail))
+        self.reset()
+
+    def reset(self):
+        """
+        Rewinds the body so it can be sent again, e.g. when a request is retried
+        """
+        for _, fileobj, start, _ in self._parts:
+            fileobj.seek(start)
+        self.bytes_read = 0
+        self._chunks = self._generate()
+        self._buffer = b""
+
+    def _generate(self):
+        for index, (header, fileobj, _, size) in enumerate(self._parts):
+            if index:
+                yield b"\r\n"
+            yield header
+            remaining = size
+            while remaining > 0:
+                chunk = fileobj.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        yield self._tail
+
+    def read(self, size=-1):
+        """
+        Reads up to size bytes of the encoded body (all remaining bytes if size
+        is negative)
+        """
+        if size is None or size < 0:
+            size = self.len
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.bytes_read += len(data)
+        return data
+
+    def __len__(self):
+        return self.len
+
+
+class UploadStats:
+    """
+    Thread-safe counters for file uploads
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self.seconds = 0.0
+
+    def record(self, bytes_sent, seconds, ok=True):
+        """
+        Args:
+        - bytes_sent: Size of the encoded request body
+        - seconds: Wall time of the upload request
+        - ok?: Whether the upload succeeded
+        """
+        with self._lock:
+            self.uploads += 1
+            self.bytes_sent += bytes_sent
+            self.seconds += seconds
+            if not ok:
+                self.failures += 1
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary of upload count, failures, bytes sent, time spent uploading
+          and the average throughput in bytes per second
+        """
+        with self._lock:
+            return {
+                "uploads": self.uploads,
+                "failures": self.failures,
+                "bytes_sent": self.bytes_sent,
+                "seconds": self.seconds,
+                "bytes_per_second": self.bytes_sent / self.seconds if self.seconds else 0.0,
+            }
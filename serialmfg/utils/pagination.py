@@ -0,0 +1,126 @@
+"""
+This file contains the page iterators behind the iter_list methods. Results are
+requested config.list_page_size rows at a time with limit/offset query
+parameters, and the next page is fetched while the caller works through the
+current one, so at most two pages are held in memory however many records are
+listed. A page starting and ending with the same records as the one before ends
+the iteration, so a server that ignores the offset cannot make it loop forever.
+"""
+import logging
+from .. import config
+
+logger = logging.getLogger("serialmfg")
+
+
+def _page_params(query_params, page_size, offset):
+    return {**(query_params or {}), config.page_limit_param: page_size, config.page_offset_param: offset}
+
+
+def _page_key(page):
+    """
+    Returns:
+    - The ids of the first and last records of a page, or None if it has no
+      records with ids
+    """
+    ids = [record.get("id") if isinstance(record, dict) else None for record in (page[:1] + page[-1:])]
+    return tuple(ids) if page and None not in ids else None
+
+
+def _is_repeated(endpoint, page_key, previous_key):
+    """
+    Args:
+    - endpoint: List endpoint the page came from
+    - page_key: _page_key of the page
+    - previous_key: _page_key of the page before it
+
+    Returns:
+    - True if the page repeats the one before it
+    """
+    if page_key is None or page_key != previous_key:
+        return False
+    logger.warning("%s returned the same page twice; the server may not support offset paging, so listing "
+                   "stopped there", endpoint)
+    return True
+
+
+def iter_pages(client, endpoint, query_params=None, page_size=None, prefetch=True):
+    """
+    Args:
+    - client: The APIClient
+    - endpoint: List endpoint, e.g. /processes/entries
+    - query_params?: Filters, as for the endpoint's list method
+    - page_size?: Rows per request (defaults to config.list_page_size)
+    - prefetch?: Whether to fetch the next page on the shared worker pool while
+      the current one is consumed
+
+    Returns:
+    - A generator of pages, each a list of API objects
+    """
+    page_size = page_size or config.list_page_size
+    pool = client.worker_pool
+    # Waiting on the pool from one of its own workers could deadlock it
+    prefetch = prefetch and not pool.in_worker()
+
+    def fetch(offset):
+        return client.make_api_request(endpoint, "GET", params=_page_params(query_params, page_size, offset))
+
+    offset = 0
+    previous_key = None
+    pending = pool.submit(fetch, offset) if prefetch else None
+    try:
+        while True:
+            page = pending.result() if prefetch else fetch(offset)
+            offset += len(page)
+            # A short page is the last one. A long one means the server ignored
+            # the limit and returned everything, so there is nothing left to page.
+            has_more = len(page) == page_size
+            page_key = _page_key(page)
+            if _is_repeated(endpoint, page_key, previous_key):
+                return
+            previous_key = page_key
+            pending = pool.submit(fetch, offset) if prefetch and has_more else None
+            yield page
+            if not has_more:
+                return
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def aiter_pages(client, endpoint, query_params=None, page_size=None, prefetch=True):
+    """
+    The asyncio counterpart of iter_pages
+
+    Args:
+    - client: The AsyncAPIClient
+    - endpoint, query_params?, page_size?, prefetch?: As for iter_pages
+
+    Returns:
+    - An async generator of pages, each a list of API objects
+    """
+    # Imported here so the sync client does not pay for importing asyncio
+    import asyncio
+    page_size = page_size or config.list_page_size
+
+    def fetch(offset):
+        return client.make_api_request(endpoint, "GET", params=_page_params(query_params, page_size, offset))
+
+    offset = 0
+    previous_key = None
+    pending = asyncio.ensure_future(fetch(offset)) if prefetch else None
+    try:
+        while True:
+            page = await pending if prefetch else await fetch(offset)
+            offset += len(page)
+            has_more = len(page) == page_size
+            page_key = _page_key(page)
+            if _is_repeated(endpoint, page_key, previous_key):
+                return
+            previous_key = page_key
+            pending = asyncio.ensure_future(fetch(offset)) if prefetch and has_more else None
+            yield page
+            if not has_more:
+                return
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
@@ -0,0 +1,264 @@
+"""
+This file contains the JSON serializers used by the API clients and an
+incremental parser for JSON array responses. orjson is used when it is
+installed (pip install serialmfg[fast]); otherwise the stdlib json module is.
+"""
+import codecs
+import json
+import math
+import re
+from .. import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class StdlibSerializer:
+    """
+    Encodes and decodes JSON with the stdlib json module
+    """
+    name = "stdlib"
+
+    @staticmethod
+    def dumps(obj):
+        """
+        Returns:
+        - The object as compact UTF-8 encoded JSON bytes. NaN and infinite
+          floats raise ValueError, since JSON has no way to represent them
+        """
+        return json.dumps(obj, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+    @staticmethod
+    def loads(data):
+        """
+        Args:
+        - data: JSON bytes or str
+
+        Returns:
+        - The decoded object
+        """
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """
+    Encodes and decodes JSON with orjson
+    """
+    name = "orjson"
+
+    @staticmethod
+    def dumps(obj):
+        # orjson writes NaN and infinity as null and rejects non-str keys; both
+        # are made to match the stdlib serializer
+        _check_finite(obj)
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+
+def _check_finite(obj):
+    if type(obj) is float:
+        if not math.isfinite(obj):
+            raise ValueError("Out of range float values are not JSON compliant")
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _check_finite(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _check_finite(value)
+
+
+_SERIALIZERS = {"stdlib": StdlibSerializer, "orjson": OrjsonSerializer}
+
+
+def get_serializer():
+    """
+    Returns:
+    - The serializer named by config.serializer, or orjson if it is installed
+      and the stdlib serializer if not
+    """
+    serializer = config.serializer
+    if serializer is None:
+        return OrjsonSerializer if orjson is not None else StdlibSerializer
+    if isinstance(serializer, str):
+        return _resolve(serializer)
+    return serializer
+
+
+def _resolve(name):
+    if name not in _SERIALIZERS:
+        raise ValueError(f"Unknown serializer {name}, expected one of {', '.join(_SERIALIZERS)}")
+    if name == "orjson" and orjson is None:
+        raise ImportError("The orjson serializer requires orjson. Install it with `pip install serialmfg[fast]`")
+    return _SERIALIZERS[name]
+
+
+def set_serializer(serializer):
+    """
+    Sets the JSON serializer used for request and response bodies
+
+    Args:
+    - serializer: "orjson", "stdlib", None to pick automatically, or any object
+      with dumps(obj) -> bytes and loads(bytes) methods
+    """
+    if isinstance(serializer, str):
+        _resolve(serializer)
+    config.serializer = serializer
+
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = ".eE+-0123456789"
+# Characters that open or close a container or string, outside and inside a string
+_STRUCTURE = re.compile(r'[][{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class JSONArrayParser:
+    """
+    Parses a JSON array incrementally, returning each element as soon as the
+    text it spans has been fed in, so large list responses never have to be
+    held in memory whole
+    """
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._started = False
+        self._finished = False
+        self._count = 0
+        # Text received after an element that is still open, and how far into
+        # that element the scan for its end has got, so each chunk is read once
+        self._pending = []
+        self._scanning = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        """
+        Args:
+        - chunk: The next bytes of the response body
+
+        Returns:
+        - A list of the elements completed by this chunk
+        """
+        text = self._text_decoder.decode(chunk)
+        if self._scanning:
+            self._pending.append(text)
+            if self._scan(text, 0) is None:
+                return []
+            self._scanning = False
+            text = ""
+        self._merge(text)
+        return self._parse()
+
+    def close(self):
+        """
+        Checks that the whole array was received
+        """
+        self._scanning = False
+        self._merge(self._text_decoder.decode(b"", final=True))
+        # The last element may only be complete now that nothing else follows it
+        self._parse(final=True)
+        if not self._finished or self._buffer[self._position:].strip(_WHITESPACE):
+            raise ValueError("Incomplete or invalid JSON array")
+
+    def _merge(self, text):
+        self._buffer = "".join([self._buffer[self._position:], *self._pending, text])
+        self._pending = []
+        self._position = 0
+
+    def _scan(self, text, position):
+        """
+        Continues scanning the open element through text
+
+        Returns:
+        - The index in text just past the element's end, or None if it is still open
+        """
+        depth, in_string = self._depth, self._in_string
+        if self._escaped and position < len(text):
+            position += 1
+            self._escaped = False
+        end = None
+        while end is None:
+            match = (_STRING_SPECIAL if in_string else _STRUCTURE).search(text, position)
+            if match is None:
+                break
+            char, position = match.group(), match.end()
+            if char == "\\":
+                if position >= len(text):
+                    self._escaped = True
+                    break
+                position += 1
+                continue
+            if char == '"':
+                in_string = not in_string
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+            if depth <= 0 and not in_string:
+                end = position
+        self._depth, self._in_string = depth, in_string
+        return end
+
+    def _skip_whitespace(self):
+        buffer, position = self._buffer, self._position
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        self._position = position
+
+    def _parse(self, final=False):
+        items = []
+        while not self._finished:
+            self._skip_whitespace()
+            if self._position >= len(self._buffer):
+                break
+            if not self._started:
+                if self._buffer[self._position] != "[":
+                    raise ValueError("Expected a JSON array")
+                self._position += 1
+                self._started = True
+                continue
+            if not self._count and self._buffer[self._position] == "]":
+                self._position += 1
+                self._finished = True
+                break
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError("Incomplete or invalid JSON array")
+                if self._buffer[self._position] in '[{"':
+                    # Rather than decoding the element again for every chunk,
+                    # wait until the scan finds where it ends
+                    self._depth, self._in_string, self._escaped = 0, False, False
+                    if self._scan(self._buffer, self._position) is not None:
+                        raise ValueError("Incomplete or invalid JSON array")
+                    self._scanning = True
+                break
+            # A number at the end of the buffer, or cut off after "1." or "1e",
+            # may continue in the next chunk
+            if not final and (end >= len(self._buffer) or
+                              (type(item) in (int, float) and self._buffer[end] in _NUMBER_CHARS)):
+                break
+            position = end
+            while position < len(self._buffer) and self._buffer[position] in _WHITESPACE:
+                position += 1
+            if position >= len(self._buffer):
+                if not final:
+                    break
+                raise ValueError("Incomplete or invalid JSON array")
+            separator = self._buffer[position]
+            if separator not in ",]":
+                raise ValueError(f"Unexpected {separator!r} in JSON array")
+            items.append(item)
+            self._count += 1
+            self._position = position + 1
+            self._finished = separator == "]"
+        return items
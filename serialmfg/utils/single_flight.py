@@ -0,0 +1,127 @@
+"""
+This file contains the SingleFlight class, which collapses concurrent calls for
+the same key into a single call whose result is shared by every caller
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent work. While a call for a key is in flight, any other
+    caller asking for the same key waits for it and receives the same result
+    (or exception) instead of repeating the work.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs fn once for all concurrent callers of the same key
+
+        Args:
+        - key: Hashable key identifying the work
+        - fn: Function to run; called with the remaining args and kwargs
+
+        Returns:
+        - A tuple of the function result and whether it was shared from another
+          caller's in-flight call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary with the number of executed calls, the number of callers
+          that shared another call's result, and the calls currently in flight
+        """
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    The asyncio counterpart of SingleFlight. Concurrent coroutines awaiting the
+    same key on the same event loop share one in-flight call.
+    """
+    def __init__(self):
+        self._calls = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """
+        Awaits fn(*args, **kwargs) once for all concurrent callers of the same key
+
+        Args:
+        - key: Hashable key identifying the work
+        - fn: Coroutine function to await
+
+        Returns:
+        - A tuple of the result and whether it was shared from another caller
+        """
+        # Imported here so the sync client does not pay for importing asyncio
+        import asyncio
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        future = self._calls.get(call_key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future), True
+
+        future = loop.create_future()
+        self._calls[call_key] = future
+        self.calls += 1
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no other caller was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[call_key]
+        return result, False
+
+    def stats(self):
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
@@ -0,0 +1,238 @@
+"""
+This file contains the WorkerPool class, a bounded thread pool shared by every
+process entry so that submitting data does not create and tear down threads
+"""
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+from . import config
+
+
+class DaemonExecutor:
+    """
+    A fixed set of daemon threads running calls in the order they were queued.
+    Unlike concurrent.futures.ThreadPoolExecutor its threads are not joined
+    before atexit handlers run, so pending submissions can be drained with a
+    timeout at exit (see submission.py).
+    """
+    def __init__(self, max_workers, thread_name_prefix):
+        """
+        Args:
+        - max_workers: Maximum number of threads
+        - thread_name_prefix: Prefix for the threads' names
+
+        Returns:
+        - An executor; threads are started on demand up to max_workers
+        """
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._queue = queue.SimpleQueue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedules fn(*args, **kwargs) on one of the executor's threads
+
+        Returns:
+        - A concurrent.futures.Future for the call
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future = Future()
+            self._queue.put((future, fn, args, kwargs))
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"{self.thread_name_prefix}_{len(self._threads)}")
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            # A future cancelled while queued is skipped
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as error:
+                future.set_exception(error)
+
+    def shutdown(self, wait=True):
+        """
+        Stops the threads once the work already queued has run
+
+        Args:
+        - wait?: Whether to block until they have stopped
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+class WorkerPool:
+    """
+    A bounded thread pool that keeps track of its queue depth and active workers
+    """
+    def __init__(self, max_workers):
+        """
+        Args:
+        - max_workers: Maximum number of worker threads
+
+        Returns:
+        - A worker pool; threads are started on demand up to max_workers
+        """
+        self.max_workers = max_workers
+        self._executor = DaemonExecutor(max_workers, "serialmfg-worker")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._queued = 0
+        self._active = 0
+        self._peak_active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedules fn(*args, **kwargs) on the pool
+
+        Returns:
+        - A concurrent.futures.Future for the call
+        """
+        with self._lock:
+            self._queued += 1
+            self._submitted += 1
+        try:
+            future = self._executor.submit(self._run, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+                self._submitted -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        # A task cancelled while queued never runs, so it leaves the queue here
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._peak_active = max(self._peak_active, self._active)
+        self._local.in_worker = True
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._local.in_worker = False
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                if failed:
+                    self._failed += 1
+
+    def in_worker(self):
+        """
+        Returns:
+        - True if called from one of this pool's worker threads. Work submitted
+          from a worker and then waited on could deadlock a full pool, so callers
+          use this to run nested work inline instead.
+        """
+        return getattr(self._local, "in_worker", False)
+
+    def stats(self):
+        """
+        Returns:
+        - A dictionary with the pool's max concurrency, queue depth, active and
+          peak active workers, and submitted, completed and failed task counts
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "active_workers": self._active,
+                "peak_active_workers": self._peak_active,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    """
+    Returns:
+    - The process-wide worker pool, created on first use with config.max_workers threads
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool(config.max_workers)
+    return _pool
+
+
+def set_max_workers(max_workers):
+    """
+    Resizes the shared worker pool. Work already submitted to the previous pool
+    finishes on that pool's threads.
+
+    Args:
+    - max_workers: Maximum number of worker threads
+    """
+    global _pool
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    with _pool_lock:
+        config.max_workers = max_workers
+        old_pool, _pool = _pool, None
+    if old_pool is not None:
+        old_pool.shutdown(wait=False)
+    # Resize the HTTP connection pool to match, unless it was sized explicitly
+    from .api_client import configure_connection_pool
+    configure_connection_pool()
+
+
+def shutdown_worker_pool(wait=True):
+    """
+    Shuts down the shared worker pool. It is recreated if it is used again.
+    """
+    global _pool
+    with _pool_lock:
+        old_pool, _pool = _pool, None
+    if old_pool is not None:
+        old_pool.shutdown(wait=wait)
+
+
+# Registered when this module is imported, before submission.py registers its
+# drain, and atexit runs handlers last in, first out, so pending submissions are
+# drained before the pool is shut down
+atexit.register(shutdown_worker_pool)
@@ -18,5 +18,6 @@ setup(
         "Programming Language :: Python :: 3.11",
     ],
     install_requires=["requests"],
+    extras_require={"async": ["aiohttp"], "fast": ["orjson"], "zstd": ["zstandard"]},
     include_package_data=True
 )
@@ -0,0 +1,98 @@
+import pytest
+import requests
+import serialmfg as serial
+from serialmfg.api_client import APIClient
+from serialmfg.exceptions import SerialConnectionError
+from serialmfg.retry import RetryPolicy, endpoint_template, parse_retry_after
+
+def test_connection_pool_matches_worker_pool(server):
+    server.api.add_component_instance("UNIT-1", "Board")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    for i in range(100):
+        entry.add_number("Voltage", i)
+    entry.submit()
+
+    stats = [pool for pool in APIClient().pool_stats() if pool["host"] == server.url]
+    assert len(stats) == 1
+    assert stats[0]["maxsize"] == serial.config.max_workers
+    assert stats[0]["connections_created"] <= serial.config.max_workers
+    assert stats[0]["in_use_connections"] == 0
+
+def test_configure_connection_pool(server):
+    serial.configure_connection_pool(pool_maxsize=4, read_timeout=30)
+    try:
+        server.api.add_component("Board")
+        serial.ComponentInstances.create("UNIT-2", "Board")
+        stats = [pool for pool in APIClient().pool_stats() if pool["host"] == server.url]
+        assert stats[0]["maxsize"] == 4
+    finally:
+        serial.configure_connection_pool(pool_maxsize=None, read_timeout=None)
+    with pytest.raises(ValueError):
+        serial.configure_connection_pool(pool_size=4)
+
+def _response(status, body=b"{}", headers=None):
+    response = requests.models.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(serial.config, "retry_policy", RetryPolicy(max_retries=3, backoff_factor=0))
+    monkeypatch.setattr(serial.config, "retry_overrides", {})
+
+def test_retries_transient_errors(server, fast_retries, monkeypatch):
+    responses = [_response(503, headers={"Retry-After": "0"}), _response(502), _response(200, b'[{"id": "1"}]')]
+    monkeypatch.setattr(APIClient, "_send", lambda self, *args: responses.pop(0))
+    assert APIClient().make_api_request("/operators", "GET") == [{"id": "1"}]
+    assert APIClient().retry_stats.stats()["/operators"]["recovered"] >= 1
+
+def test_does_not_retry_non_idempotent_post_on_502(server, fast_retries, monkeypatch):
+    responses = [_response(502), _response(200)]
+    monkeypatch.setattr(APIClient, "_send", lambda self, *args: responses.pop(0))
+    with pytest.raises(serial.SerialAPIException) as error:
+        APIClient().make_api_request("/processes/entries", "POST", data={})
+    assert error.value.status_code == 502
+    assert len(responses) == 1
+
+def test_does_not_resend_data_point_put_on_502(server, fast_retries, monkeypatch):
+    responses = [_response(502), _response(200)]
+    monkeypatch.setattr(APIClient, "_send", lambda self, *args: responses.pop(0))
+    with pytest.raises(serial.SerialAPIException) as error:
+        APIClient().make_api_request("/processes/entries/2f02d2be-ece6-410f-ad80-ffd746988870", "PUT",
+                                     data={"dataset_id": "dataset-1", "value": 1.5})
+    assert error.value.status_code == 502
+    assert len(responses) == 1
+
+    # A PUT that really is idempotent can opt in per endpoint
+    serial.set_retry_policy(RetryPolicy(max_retries=3, backoff_factor=0, idempotent_methods=("GET", "PUT")),
+                            endpoint="/components/instances")
+    responses = [_response(502), _response(200)]
+    assert APIClient().make_api_request("/components/instances", "PUT", data={}) == {}
+    assert not responses
+
+def test_per_endpoint_retry_override(server, fast_retries, monkeypatch):
+    serial.set_retry_policy(RetryPolicy(max_retries=0), endpoint="/processes/entries/*")
+    responses = [_response(503), _response(200)]
+    monkeypatch.setattr(APIClient, "_send", lambda self, *args: responses.pop(0))
+    with pytest.raises(serial.SerialAPIException):
+        APIClient().make_api_request("/processes/entries/2f02d2be-ece6-410f-ad80-ffd746988870", "PUT", data={})
+
+def test_connection_errors_raise_serial_connection_error(fast_retries, monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", "test-key")
+    monkeypatch.setattr(serial.config, "base_url", "http://127.0.0.1:9")
+    with pytest.raises(SerialConnectionError):
+        APIClient().make_api_request("/operators", "GET")
+    assert APIClient().retry_stats.stats()["/operators"]["exhausted"] >= 1
+
+def test_retry_after_and_endpoint_template():
+    assert parse_retry_after("2") == 2
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert endpoint_template("/processes/entries/2f02d2be-ece6-410f-ad80-ffd746988870") == "/processes/entries/{id}"
+    policy = RetryPolicy(backoff_factor=1, jitter=False)
+    assert policy.get_delay("GET", 2, 0, status=502) == 4
+    assert policy.get_delay("POST", 0, 0, status=429, retry_after="7") == 7
+    assert policy.get_delay("POST", 0, 0, connect_error=True) == 1
+    assert policy.get_delay("POST", 0, 0, error=True) is None
+    assert policy.get_delay("GET", 3, 0, status=502) is None
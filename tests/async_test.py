@@ -0,0 +1,95 @@
+import asyncio
+import os
+import pytest
+import serialmfg as serial
+from serialmfg.serial_resources.process_entry import ProcessEntry
+
+aio = pytest.importorskip("serialmfg.aio")
+pytest.importorskip("aiohttp")
+from serialmfg.aio.process_entry import ProcessEntry as AsyncProcessEntry  # noqa: E402
+
+def test_async_submit(server):
+    server.api.add_component_instance("PARENT-1", "Harness")
+    server.api.add_component_instance("CHILD-1", "Connector")
+    server.api.add_operator("Amy", "Admin", pin="0000")
+
+    async def run():
+        operator = await aio.Operators.get(pin="0000")
+        entry = await aio.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1", operator=operator)
+        for i in range(25):
+            entry.add_text("Firmware", f"v{i}")
+            entry.add_number("Voltage", 3.3, usl=3.6, lsl=3.0)
+            entry.add_boolean("Continuity", True, True)
+        entry.add_file("Log", os.path.join(os.path.dirname(__file__), "test.txt"))
+        entry.add_link("Connector", "CHILD-1")
+        result = await entry.submit(cycle_time=12, is_pass=True)
+        await aio.close()
+        return result
+
+    result = asyncio.run(run())
+    assert result["is_complete"] is True
+    assert result["cycle_time"] == 12
+    assert len(server.api.process_entry_data) == 76
+    assert len(server.api.component_instance_links) == 1
+    assert server.api.request_count("GET", "/datasets") == 5
+
+def test_async_errors_match_sync(server):
+    async def run():
+        try:
+            await aio.ComponentInstances.get("MISSING")
+        finally:
+            await aio.close()
+
+    with pytest.raises(serial.SerialAPIException):
+        asyncio.run(run())
+
+def test_async_entry_shares_only_queueing_with_sync(server):
+    entry = AsyncProcessEntry({"id": "entry-1", "process_id": "process-1", "unique_identifier_id": "ci-1"})
+    entry.add_text("Firmware", "v1")
+    assert entry._queued_count() == 1 and entry._streamed == []
+    for name in ("submit_async", "_run_batched", "_submit_with_offline_queue", "_wait_for_streamed", "_map_tasks"):
+        assert not hasattr(entry, name)
+    assert not isinstance(entry, ProcessEntry)
+
+def test_async_upload_opens_file_off_the_event_loop(server, monkeypatch):
+    server.api.add_component_instance("UNIT-1", "Board")
+    opened_on = []
+    real_to_thread = asyncio.to_thread
+
+    async def to_thread(function, *args, **kwargs):
+        opened_on.append(function)
+        return await real_to_thread(function, *args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "to_thread", to_thread)
+
+    async def run():
+        entry = await aio.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+        entry.add_file("Log", os.path.join(os.path.dirname(__file__), "test.txt"))
+        await entry.submit()
+        await aio.close()
+
+    asyncio.run(run())
+    assert opened_on == [open]
+    assert next(iter(server.api.files.values()))["file_name"] == "test.txt"
+
+def test_session_left_open_on_a_finished_loop_is_closed(server):
+    server.api.add_component_instance("UNIT-1", "Board")
+    client = aio.api_client.AsyncAPIClient()
+
+    async def lookup():
+        await aio.ComponentInstances.get("UNIT-1")
+        return client._session
+
+    serial.ComponentInstances.invalidate_cache()
+    first = asyncio.run(lookup())
+    serial.ComponentInstances.invalidate_cache()
+
+    async def run():
+        try:
+            return await lookup()
+        finally:
+            await aio.close()
+
+    second = asyncio.run(run())
+    assert first is not second
+    assert first.closed and second.closed
@@ -0,0 +1,84 @@
+import os
+import pytest
+import serialmfg as serial
+from serialmfg.serial_resources import process_entry
+from serialmfg.serial_resources.process_entry import ProcessEntry
+from serialmfg.testing import FakeSerialAPI, FakeTransport
+
+@pytest.fixture(params=[True, False], ids=["batch-endpoint", "no-batch-endpoint"])
+def api(request):
+    return FakeSerialAPI(supports_batch=request.param)
+
+@pytest.fixture
+def server(server, monkeypatch):
+    monkeypatch.setattr(serial.config, "batch_size", 20)
+    monkeypatch.setattr(process_entry, "_batch_unsupported", None)
+    return server
+
+def test_batched_submit(server):
+    server.api.add_component_instance("PARENT-1", "Harness")
+    server.api.add_component_instance("CHILD-1", "Connector")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1")
+    for i in range(25):
+        entry.add_text("Firmware", f"v{i}")
+        entry.add_number("Voltage", 3.3, usl=3.6, lsl=3.0)
+    entry.add_file("Log", os.path.join(os.path.dirname(__file__), "test.txt"))
+    entry.add_link("Connector", "CHILD-1")
+    result = entry.submit(cycle_time=12, batch=True)
+
+    assert result["is_complete"] is True
+    assert len(server.api.process_entry_data) == 51
+    assert len(server.api.component_instance_links) == 1
+    batch_requests = server.api.request_count("PUT", f"/processes/entries/{entry.id}/data")
+    single_requests = server.api.request_count("PUT", f"/processes/entries/{entry.id}")
+    if server.api.supports_batch:
+        assert (batch_requests, single_requests) == (3, 0)
+    else:
+        # The first batch is rejected, after which data points are sent one at a time
+        assert (batch_requests, single_requests) == (1, 51)
+
+@pytest.fixture
+def use_transport(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", "test-key")
+    monkeypatch.setattr(serial.config, "base_url", FakeTransport.url)
+    monkeypatch.setattr(process_entry, "_batch_unsupported", None)
+
+    def use(api):
+        transport = FakeTransport(api)
+        serial.set_transport(transport)
+        # Cached ids belong to the previous fake API
+        serial.Datasets.invalidate_cache()
+        serial.ComponentInstances.invalidate_cache()
+        api.add_component_instance("UNIT-1", "Board")
+        return transport
+
+    yield use
+    serial.set_transport(None)
+
+def _submit_batch(process_id="process-1"):
+    entry = serial.ProcessEntries.create(process_id, component_instance_identifier="UNIT-1")
+    entry.add_text("Firmware", "v1")
+    entry.add_number("Voltage", 3.3)
+    return entry, entry.submit(batch=True)
+
+def test_missing_entry_does_not_disable_batching(use_transport):
+    transport = use_transport(FakeSerialAPI())
+    missing = ProcessEntry({"id": "missing", "process_id": "process-1", "unique_identifier_id": "ci-1"})
+    missing.add_text("Firmware", "v1")
+    with pytest.raises(serial.SerialAPIException):
+        missing.submit(batch=True)
+    assert process_entry._batch_unsupported is None
+
+    entry, _ = _submit_batch()
+    assert transport.api.request_count("PUT", f"/processes/entries/{entry.id}/data") == 1
+    assert transport.api.request_count("PUT", f"/processes/entries/{entry.id}") == 0
+
+def test_batch_support_is_rechecked_when_the_transport_changes(use_transport):
+    old = use_transport(FakeSerialAPI(supports_batch=False))
+    entry, _ = _submit_batch()
+    assert old.api.request_count("PUT", f"/processes/entries/{entry.id}") == 2
+    assert process_entry._batch_unsupported is not None
+
+    new = use_transport(FakeSerialAPI())
+    entry, _ = _submit_batch()
+    assert new.api.request_count("PUT", f"/processes/entries/{entry.id}/data") == 1
@@ -0,0 +1,201 @@
+import time
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from serialmfg.utils.cache import LRUCache
+import serialmfg as serial
+from serialmfg.api_client import APIClient
+from serialmfg.serial_resources.component_instance import ComponentInstances
+from serialmfg.serial_resources.dataset import Datasets, Dataset, DatasetNotFound
+
+def test_cache_hit_and_miss():
+    cache = LRUCache(max_size=2)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_cache_ttl_expires_entries():
+    cache = LRUCache(max_size=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    cache = LRUCache(max_size=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+@pytest.mark.parametrize("resource, setting", [
+    (serial.Datasets, "dataset"), (serial.ComponentInstances, "component_instance"),
+    (serial.Components, "component"), (serial.PartNumbers, "part_number"), (serial.Operators, "operator")])
+def test_configure_cache_keeps_ttl_unless_given(monkeypatch, resource, setting):
+    monkeypatch.setattr(serial.config, f"{setting}_cache_size", 16)
+    monkeypatch.setattr(serial.config, f"{setting}_cache_ttl", 30)
+    try:
+        resource.configure_cache(max_size=8)
+        assert (getattr(serial.config, f"{setting}_cache_size"), getattr(serial.config, f"{setting}_cache_ttl")) == (8, 30)
+        resource.configure_cache(ttl=None)
+        assert (getattr(serial.config, f"{setting}_cache_size"), getattr(serial.config, f"{setting}_cache_ttl")) == (8, None)
+    finally:
+        monkeypatch.undo()
+        resource.configure_cache()
+
+def test_cache_invalidation():
+    cache = LRUCache()
+    cache.set(("x", "TEXT", "p1"), 1)
+    cache.set(("y", "TEXT", "p2"), 2)
+    cache.invalidate_where(lambda key: key[2] == "p1")
+    assert cache.get(("x", "TEXT", "p1")) is None
+    assert cache.get(("y", "TEXT", "p2")) == 2
+    cache.invalidate()
+    assert len(cache) == 0
+
+def test_concurrent_get_or_create_dataset_is_single_flight(monkeypatch):
+    calls = {"get": 0, "create": 0}
+    lock = threading.Lock()
+
+    def fake_get(name, data_type, process_id):
+        with lock:
+            calls["get"] += 1
+        time.sleep(0.05)
+        raise DatasetNotFound(f"Dataset {name} of type {data_type} not found")
+
+    def fake_create(name, data_type, process_id, extra_params=None):
+        with lock:
+            calls["create"] += 1
+        return Dataset({"name": name, "id": "dataset-id"})
+
+    monkeypatch.setattr(Datasets, "get", staticmethod(fake_get))
+    monkeypatch.setattr(Datasets, "create", staticmethod(fake_create))
+    Datasets.invalidate_cache()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: Datasets.get_or_create_dataset("Torque", "NUMERICAL", "p1"), range(8)))
+
+    assert calls == {"get": 1, "create": 1}
+    assert [status for _, status in results].count("created") == 1
+    assert all(dataset.dataset_id == "dataset-id" for dataset, _ in results)
+    assert Datasets.get_or_create_dataset("Torque", "NUMERICAL", "p1")[1] == "found"
+    assert calls["get"] == 1
+    Datasets.invalidate_cache()
+
+def test_component_instance_cache(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", serial.config.api_key or "test-key")
+    requests_made = []
+    instances = {"SN-1": {"id": "ci-1", "identifier": "SN-1", "component_id": "c1", "status": "PLANNED"}}
+
+    def fake_request(self, endpoint, method, params=None, data=None, files=None):
+        requests_made.append((method, endpoint))
+        if endpoint == "/components":
+            return [{"id": "c1", "name": params["name"]}]
+        if method == "PUT":
+            instances[data["identifier"]] = {"id": "ci-2", "identifier": data["identifier"], "component_id": "c1"}
+            return instances[data["identifier"]]
+        return [i for i in instances.values() if params.get("identifier") in (None, i["identifier"])
+                and params.get("id") in (None, i["id"])]
+
+    monkeypatch.setattr(APIClient, "make_api_request", fake_request)
+    ComponentInstances.invalidate_cache()
+    hits = ComponentInstances.cache_stats()["hits"]
+    assert ComponentInstances.get("SN-1").data["id"] == "ci-1"
+    assert ComponentInstances.get("SN-1").data["id"] == "ci-1"
+    assert ComponentInstances.get(id="ci-1").data["identifier"] == "SN-1"
+    assert requests_made == [("GET", "/components/instances")]
+    assert ComponentInstances.cache_stats()["hits"] - hits == 2
+
+    # A created instance replaces whatever was cached for its identifier
+    ComponentInstances.create("SN-1", "Widget")
+    assert ComponentInstances.get("SN-1").data["id"] == "ci-2"
+    assert requests_made.count(("GET", "/components/instances")) == 1
+
+    ComponentInstances.invalidate_cache(identifier="SN-1")
+    assert ComponentInstances.get(id="ci-2").data["id"] == "ci-2"
+    assert requests_made.count(("GET", "/components/instances")) == 2
+
+    ComponentInstances.configure_cache(ttl=0.01)
+    ComponentInstances.get("SN-1")
+    time.sleep(0.02)
+    ComponentInstances.get("SN-1")
+    assert requests_made.count(("GET", "/components/instances")) == 4
+    ComponentInstances.configure_cache(max_size=4096, ttl=60)
+
+def test_component_and_part_number_caches(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", serial.config.api_key or "test-key")
+    requests_made = []
+
+    def fake_request(self, endpoint, method, params=None, data=None, files=None):
+        requests_made.append((method, endpoint))
+        if endpoint == "/components":
+            components = [{"id": "c1", "name": "Widget"}, {"id": "c2", "name": "Gadget"}]
+            return [c for c in components if not params or c["name"] == params["name"]]
+        if endpoint == "/part-numbers":
+            return [{"id": "pn1", "part_number": "PN-1", "component_id": "c1"}]
+        return {"id": f"ci-{data['identifier']}", **data}
+
+    monkeypatch.setattr(APIClient, "make_api_request", fake_request)
+    serial.Components.invalidate_cache()
+    serial.PartNumbers.invalidate_cache()
+    assert serial.Components.prefetch() == 2
+    assert serial.PartNumbers.prefetch() == 1
+    requests_made.clear()
+
+    for i in range(3):
+        instance = ComponentInstances.create(f"SN-{i}", "Widget", part_number="PN-1")
+        assert instance.data["part_number_id"] == "pn1"
+    assert requests_made == [("PUT", "/components/instances")] * 3
+    assert serial.Components.cache_stats()["size"] == 2
+    assert serial.PartNumbers.cache_stats()["hits"] >= 3
+    serial.Components.invalidate_cache()
+    serial.PartNumbers.invalidate_cache()
+    ComponentInstances.invalidate_cache()
+
+def test_part_number_cache_is_per_component(server):
+    server.api.part_numbers["pn1"] = {"id": "pn1", "part_number": "PN-1", "component_id": "c1"}
+    widget = serial.PartNumbers.get_or_create_part_number("PN-1", "c1")
+    gadget = serial.PartNumbers.get_or_create_part_number("PN-1", "c2")
+    assert widget.data["id"] == "pn1"
+    assert gadget.data["component_id"] == "c2" and gadget.data["id"] != "pn1"
+    assert serial.PartNumbers.get("PN-1", "c2").data["id"] == gadget.data["id"]
+    assert serial.PartNumbers.get_or_create_part_number("PN-1", "c1") is widget
+
+def test_operator_cache(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", serial.config.api_key or "test-key")
+    roster = [{"id": "o1", "first_name": "Amy", "last_name": "Admin", "pin": "1111"},
+              {"id": "o2", "first_name": "Bob", "last_name": "Builder", "pin": "2222"},
+              {"id": "o3", "first_name": "Bob", "last_name": "Builder", "pin": "3333"}]
+    requests_made = []
+
+    def fake_request(self, endpoint, method, params=None, data=None, files=None):
+        requests_made.append(params)
+        return [o for o in roster if all(o[key] == value for key, value in (params or {}).items())]
+
+    monkeypatch.setattr(APIClient, "make_api_request", fake_request)
+    serial.Operators.invalidate_cache()
+    assert serial.Operators.prefetch() == 3
+    assert serial.Operators.get(pin="2222").data["id"] == "o2"
+    assert serial.Operators.get(first_name="Amy", last_name="Admin").data["id"] == "o1"
+    assert requests_made == [None]
+
+    # Ambiguous lookups are not cached and still raise
+    with pytest.raises(serial.SerialAPIException, match="Multiple"):
+        serial.Operators.get(first_name="Bob", last_name="Builder")
+
+    roster[0]["pin"] = "9999"
+    serial.Operators.invalidate_cache(first_name="Amy")
+    with pytest.raises(serial.SerialAPIException, match="No operator"):
+        serial.Operators.get(pin="1111")
+    assert serial.Operators.get(pin="2222").data["id"] == "o2"
+    assert len(requests_made) == 3
+    serial.Operators.invalidate_cache()
@@ -0,0 +1,108 @@
+import asyncio
+import gzip
+import os
+import pytest
+import serialmfg as serial
+from serialmfg.testing import FakeTransport
+from serialmfg.utils.compression import CompressedReader, GzipCodec, compress_body, decompress, is_compressible
+from serialmfg.utils.multipart import MultipartEncoder
+
+LOG = "".join(f"[{i:06d}] flash block {i % 64} ok, crc=0x{i * 2654435761 % 2 ** 32:08x}\n" for i in range(2000))
+
+@pytest.fixture
+def compression(monkeypatch):
+    monkeypatch.setattr(serial.config, "compression", None)
+    monkeypatch.setattr(serial.config, "compression_min_size", 1024)
+    monkeypatch.setattr(serial.config, "compression_level", None)
+    monkeypatch.setattr(serial.config, "compress_files", False)
+    serial.get_compression_stats().reset()
+    yield
+    serial.get_compression_stats().reset()
+
+@pytest.fixture
+def transport(monkeypatch, compression):
+    monkeypatch.setattr(serial.config, "api_key", "test-key")
+    monkeypatch.setattr(serial.config, "base_url", FakeTransport.url)
+    transport = FakeTransport(compress_responses=True)
+    serial.set_transport(transport)
+    yield transport
+    serial.set_transport(None)
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "flash.log"
+    path.write_text(LOG)
+    return str(path)
+
+def test_compress_body(compression):
+    body = LOG.encode("utf-8")
+    assert compress_body(body) == (body, None)
+
+    serial.set_compression("gzip")
+    compressed, encoding = compress_body(body)
+    assert encoding == "gzip" and gzip.decompress(compressed) == body
+    assert compress_body(b"x" * 100) == (b"x" * 100, None)
+    random_bytes = os.urandom(4096)
+    assert compress_body(random_bytes) == (random_bytes, None)
+
+    stats = serial.get_compression_stats().stats()
+    assert stats["bodies"] == 2 and stats["bytes_saved"] == len(body) - len(compressed)
+    with pytest.raises(ValueError):
+        serial.set_compression("lz4")
+
+def test_compressed_reader_rewinds(log_file):
+    with open(log_file, "rb") as f:
+        encoder = MultipartEncoder({"file": ("flash.log", f, "text/plain")})
+        expected = encoder.read()
+        reader = CompressedReader(encoder, GzipCodec)
+        first = b"".join(iter(lambda: reader.read(1000), b""))
+        reader.reset()
+        second = reader.read()
+    assert decompress(first, "gzip") == decompress(second, "gzip") == expected
+    assert reader.bytes_read == len(second) < len(expected) / 2
+
+def test_is_compressible():
+    assert is_compressible("text/plain; charset=utf-8") and is_compressible("application/vnd.api+json")
+    assert is_compressible("application/octet-stream", "flash.LOG")
+    assert not is_compressible("image/png", "image.png") and not is_compressible(None)
+
+def test_submit_compressed(transport, log_file):
+    serial.set_compression("gzip", files=True)
+    transport.api.add_component_instance("UNIT-1", "Board")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    entry.add_text("Firmware log", LOG)
+    entry.add_file("Flash log", log_file)
+    transport.fail_next(1, status=503, path="/files")
+    entry.submit(is_pass=True)
+
+    assert [point["value"] for point in transport.api.process_entry_data if "value" in point] == [LOG]
+    upload = next(iter(transport.api.files.values()))
+    assert upload["file_name"] == "flash.log" and upload["size"] > len(LOG)
+    assert transport.bytes_received < len(LOG)
+    assert serial.get_compression_stats().stats()["bodies"] == 3
+
+def test_compressed_responses(transport):
+    for i in range(100):
+        transport.api.add_component_instance(f"UNIT-{i}", "Board")
+    assert len(serial.ComponentInstances.list({})) == 100
+    assert len(list(serial.ComponentInstances.stream_list())) == 100
+    stats = serial.get_metrics_registry().stats()["GET /components/instances"]
+    assert transport.bytes_sent * 2 < stats["bytes_received"]
+
+def test_async_compressed(server, compression, log_file):
+    aio = pytest.importorskip("serialmfg.aio")
+    pytest.importorskip("aiohttp")
+    serial.set_compression("gzip", files=True)
+    server.api.add_component_instance("UNIT-1", "Board")
+
+    async def run():
+        entry = await aio.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+        entry.add_text("Firmware log", LOG)
+        entry.add_file("Flash log", log_file)
+        await entry.submit()
+        await aio.close()
+
+    asyncio.run(run())
+    assert [point["value"] for point in server.api.process_entry_data if "value" in point] == [LOG]
+    assert next(iter(server.api.files.values()))["size"] > len(LOG)
+    assert serial.get_compression_stats().stats()["bodies"] == 2
@@ -0,0 +1,27 @@
+import pytest
+import serialmfg as serial
+from serialmfg.testing import FakeSerialAPI, MockSerialServer
+
+def _invalidate_caches():
+    for resource in (serial.Datasets, serial.ComponentInstances, serial.Components, serial.PartNumbers,
+                     serial.Operators):
+        resource.invalidate_cache()
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    # The resource caches are module-level, so one test's lookups must not leak into the next
+    _invalidate_caches()
+    yield
+    _invalidate_caches()
+
+@pytest.fixture
+def api():
+    """The FakeSerialAPI behind `server`; override it in a test module to serve a subclass"""
+    return FakeSerialAPI()
+
+@pytest.fixture
+def server(api, monkeypatch):
+    with MockSerialServer(api) as server:
+        monkeypatch.setattr(serial.config, "api_key", "test-key")
+        monkeypatch.setattr(serial.config, "base_url", server.url)
+        yield server
@@ -0,0 +1,46 @@
+import pytest
+import serialmfg as serial
+from serialmfg.testing import FakeSerialAPI
+
+class FlakyAPI(FakeSerialAPI):
+    def _put_component_instance(self, data):
+        if data.get("identifier") == "SN-13":
+            return 400, {"message": "Identifier rejected"}
+        return super()._put_component_instance(data)
+
+@pytest.fixture
+def api():
+    return FlakyAPI()
+
+def test_create_many_reports_per_item_results(server):
+    server.api.add_component_instance("SN-0", "Reel")
+    server.api.reset_request_log()
+    identifiers = [f"SN-{i}" for i in range(100)]
+    result = serial.ComponentInstances.create_many(identifiers, "Reel", part_number="PN-1")
+
+    assert set(result.failed) == {"SN-13"}
+    assert result.existing == ["SN-0"]
+    assert len(result.created) == 98
+    assert result.created["SN-5"].identifier == "SN-5"
+    # Records hold copies, so changing one does not change the cached instance
+    result.created["SN-5"].data["status"] = "COMPLETE"
+    assert serial.ComponentInstances.get("SN-5").data["status"] == "PLANNED"
+    assert result.stats()["per_second"] > 0
+    # The component and part number are resolved once for the whole batch
+    assert server.api.request_count("GET", "/components") == 1
+    assert server.api.request_count("GET", "/part-numbers") == 1
+    assert server.api.request_count("PUT", "/components/instances") == 100
+
+def test_create_many_resumes_from_checkpoint(server, tmp_path):
+    server.api.add_component("Reel")
+    checkpoint = str(tmp_path / "reel.jsonl")
+    identifiers = [f"SN-{i}" for i in range(20, 60)]
+    serial.ComponentInstances.create_many(identifiers[:25], "Reel", checkpoint=checkpoint)
+    with open(checkpoint, "a") as file:
+        file.write('{"identif')  # interrupted mid-write
+
+    result = serial.ComponentInstances.create_many(identifiers, "Reel", checkpoint=checkpoint)
+    assert len(result.skipped) == 25
+    assert len(result.created) == 15
+    assert len(server.api.component_instances) == 40
+    assert len(serial.ComponentInstances.create_many(identifiers, "Reel", checkpoint=checkpoint).skipped) == 40
@@ -0,0 +1,84 @@
+import os
+import time
+import pytest
+import serialmfg as serial
+from serialmfg.api_client import APIClient
+from serialmfg.retry import RetryPolicy
+from serialmfg.testing import FakeSerialAPI, FakeTransport
+
+@pytest.fixture
+def use_transport(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", "test-key")
+    monkeypatch.setattr(serial.config, "base_url", "https://api.example.com/v1")
+
+    def use(**options):
+        transport = FakeTransport(**options)
+        serial.set_transport(transport)
+        return transport
+
+    yield use
+    serial.set_transport(None)
+
+@pytest.fixture
+def transport(use_transport):
+    return use_transport()
+
+def test_submit_through_fake_transport(transport):
+    transport.api.add_component_instance("UNIT-1", "Board")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    entry.add_number("Voltage", 3.3)
+    entry.add_file("Log", os.path.join(os.path.dirname(__file__), "test.txt"))
+    result = entry.submit(is_pass=True)
+
+    assert result["is_complete"] is True
+    assert len(transport.api.process_entry_data) == 2
+    file_name, upload = next(iter(transport.api.files.items()))
+    assert upload["file_name"] == "test.txt" and upload["size"] > 0
+
+def test_errors_keep_their_status(transport):
+    with pytest.raises(serial.SerialAPIException) as error:
+        APIClient().make_api_request("/missing", "GET")
+    assert error.value.status_code == 404
+
+def test_set_transport_replaces_http(transport):
+    assert APIClient().pool_stats() == []
+    serial.set_transport(None)
+    assert APIClient().session.adapters["https://"] is not transport
+
+def test_injected_latency(use_transport):
+    transport = use_transport(latency=0.05)
+    transport.api.add_component_instance("UNIT-1", "Board")
+    started = time.perf_counter()
+    serial.ComponentInstances.get("UNIT-1")
+    assert time.perf_counter() - started >= 0.05
+
+def test_injected_errors_are_retried(use_transport, monkeypatch):
+    monkeypatch.setattr(serial.config, "retry_policy", RetryPolicy(max_retries=3, backoff_factor=0))
+    transport = use_transport()
+    transport.api.add_component_instance("UNIT-1", "Board")
+    transport.fail_next(2, status=503, path="/components/instances")
+    assert serial.ComponentInstances.get("UNIT-1").data["identifier"] == "UNIT-1"
+    assert transport.injected_errors == 2
+
+    transport.fail_next(1, status=None)
+    with pytest.raises(serial.SerialConnectionError):
+        APIClient().make_api_request("/processes/entries", "POST", data={})
+
+def test_error_rate_is_repeatable(use_transport, monkeypatch):
+    monkeypatch.setattr(serial.config, "retry_policy", RetryPolicy(max_retries=0))
+
+    def failures(seed):
+        use_transport(error_rate=0.3, seed=seed)
+        outcomes = []
+        for _ in range(50):
+            try:
+                APIClient().make_api_request("/operators", "GET")
+                outcomes.append(True)
+            except serial.SerialAPIException as e:
+                assert e.status_code == 503
+                outcomes.append(False)
+        return outcomes
+
+    first = failures(seed=7)
+    assert 5 < first.count(False) < 25
+    assert failures(seed=7) == first
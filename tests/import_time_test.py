@@ -0,0 +1,54 @@
+import os
+import statistics
+import subprocess
+import sys
+import pytest
+import serialmfg as serial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Milliseconds a bare `import serialmfg` may take. Wall-clock time depends on the machine and its load, so the
+# budget is only checked when set, e.g. on the station PCs it was chosen for
+IMPORT_BUDGET_MS = os.environ.get("SERIALMFG_IMPORT_BUDGET_MS")
+
+def _run(*args):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+def _import_times(statement):
+    # Cumulative import time in microseconds of each module the statement imports
+    result = _run("-X", "importtime", "-c", statement)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+def test_import_defers_dependencies():
+    startup = set(_import_times("pass"))
+    imported = set(_import_times("import serialmfg; serialmfg.set_api_key('key')")) - startup
+    assert imported <= {"serialmfg", "serialmfg.config", "importlib"}
+    used = set(_import_times("import serialmfg; serialmfg.ProcessEntries")) - startup
+    assert {"requests", "serialmfg.api_client"} <= used
+    assert not {"asyncio", "serialmfg.serial"} & used
+
+def test_import_loads_no_dependencies():
+    statement = "import sys, serialmfg; serialmfg.set_api_key('key'); print(' '.join(sys.modules))"
+    modules = set(_run("-c", statement).stdout.split())
+    assert not {"requests", "aiohttp", "orjson", "sqlite3", "asyncio"} & modules
+    assert not [name for name in modules if name.startswith(("serialmfg.serial_resources", "serialmfg.aio"))]
+
+@pytest.mark.skipif(IMPORT_BUDGET_MS is None, reason="SERIALMFG_IMPORT_BUDGET_MS is not set")
+def test_import_time_budget():
+    runs = [_import_times("import serialmfg")["serialmfg"] for _ in range(5)]
+    assert statistics.median(runs) / 1000 < float(IMPORT_BUDGET_MS)
+
+def test_lazy_attributes():
+    for name in serial._LAZY_ATTRIBUTES:
+        assert getattr(serial, name).__name__ == name
+        assert name in dir(serial)
+    assert serial.api_client.APIClient is not None
+    from serialmfg import ProcessEntries, set_transport  # noqa: F401
+    with pytest.raises(AttributeError):
+        serial.not_an_attribute
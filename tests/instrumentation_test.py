@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+import serialmfg as serial
+from serialmfg.api_client import APIClient
+from serialmfg.exceptions import SerialAPIException
+from serialmfg.instrumentation import MetricsRegistry, RequestEvent
+
+@pytest.fixture
+def server(server):
+    serial.get_metrics_registry().reset()
+    yield server
+    serial.get_metrics_registry().reset()
+
+def test_request_hooks(server):
+    before, after = [], []
+    serial.add_request_hooks(before=before.append, after=after.append)
+    try:
+        server.api.add_component_instance("UNIT-1", "Board")
+        entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+        with pytest.raises(SerialAPIException):
+            APIClient().make_api_request("/missing", "GET")
+    finally:
+        serial.remove_request_hooks(before=before.append, after=after.append)
+
+    assert [event.endpoint for event in before] == [event.endpoint for event in after]
+    create = next(event for event in after if event.method == "POST")
+    assert create.endpoint == "/processes/entries"
+    assert create.status == 200
+    assert create.bytes_sent > 0 and create.bytes_received > 0
+    assert create.retries == 0 and create.error is None and create.seconds > 0
+    assert after[-1].status == 404 and isinstance(after[-1].error, SerialAPIException)
+
+    count = len(after)
+    serial.ComponentInstances.get("UNIT-1")
+    assert len(after) == count
+
+def test_metrics_registry(server):
+    server.api.add_component_instance("UNIT-1", "Board")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    for i in range(5):
+        entry.add_number("Voltage", i)
+    entry.submit()
+
+    stats = serial.get_metrics_registry().stats()
+    data = stats["PUT /processes/entries/{id}"]
+    assert data["requests"] == 5 and data["statuses"] == {"200": 5}
+    assert data["errors"] == 0
+    assert data["p50_seconds"] is not None
+
+    text = serial.get_metrics_registry().to_prometheus()
+    assert '# TYPE serialmfg_request_duration_seconds histogram' in text
+    assert 'serialmfg_requests_total{method="PUT",endpoint="/processes/entries/{id}",status="200"} 5' in text
+    assert 'serialmfg_request_duration_seconds_count{method="PUT",endpoint="/processes/entries/{id}"} 5' in text
+    assert 'le="+Inf"} 5' in text
+
+def test_metrics_can_be_disabled(server, monkeypatch):
+    monkeypatch.setattr(serial.config, "collect_metrics", False)
+    server.api.add_component_instance("UNIT-1", "Board")
+    serial.ComponentInstances.get("UNIT-1")
+    assert serial.get_metrics_registry().stats() == {}
+
+def test_histogram_quantiles():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    for seconds in (0.05, 0.05, 0.5, 5):
+        event = RequestEvent("GET", "/datasets", "/datasets")
+        event.status, event.seconds = 200, seconds
+        registry.record(event)
+    stats = registry.stats()["GET /datasets"]
+    assert (stats["p50_seconds"], stats["p90_seconds"]) == (0.1, None)
+    assert 'serialmfg_request_duration_seconds_bucket{method="GET",endpoint="/datasets",le="1.0"} 3' in registry.to_prometheus()
+
+def test_async_requests_are_recorded(server):
+    aio = pytest.importorskip("serialmfg.aio")
+    pytest.importorskip("aiohttp")
+    server.api.add_component_instance("UNIT-1", "Board")
+
+    async def run():
+        entry = await aio.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+        entry.add_text("Firmware", "v1")
+        await entry.submit()
+        await aio.close()
+
+    asyncio.run(run())
+    data = serial.get_metrics_registry().stats()["PATCH /processes/entries/{id}"]
+    assert data["requests"] == 1 and data["bytes_sent"] > 0 and data["bytes_received"] > 0
@@ -0,0 +1,26 @@
+import pytest
+import serialmfg as serial
+
+def test_link_children_are_resolved_once(server):
+    server.api.add_component_instance("HARNESS-1", "Harness")
+    for i in range(30):
+        server.api.add_component_instance(f"PIN-{i}", "Pin")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="HARNESS-1")
+    for i in range(60):
+        entry.add_link("Pins", f"PIN-{i % 30}")
+    entry.submit()
+
+    assert len(server.api.component_instance_links) == 60
+    assert len(server.api.component_links) == 1
+    # One lookup for the parent when the entry was created, then one per distinct child
+    assert server.api.request_count("GET", "/components/instances") == 31
+
+def test_missing_link_child_fails_submit(server):
+    server.api.add_component_instance("HARNESS-1", "Harness")
+    server.api.add_component_instance("PIN-1", "Pin")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="HARNESS-1")
+    entry.add_link("Pins", "PIN-1")
+    entry.add_link("Pins", "MISSING")
+    with pytest.raises(serial.SerialAPIException, match="MISSING"):
+        entry.submit()
+    assert len(server.api.component_instance_links) == 1
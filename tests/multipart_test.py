@@ -0,0 +1,46 @@
+import io
+import os
+from email.parser import BytesParser
+from serialmfg.utils.multipart import MultipartEncoder, UploadStats
+
+def _parse(encoder):
+    body = b""
+    while True:
+        chunk = encoder.read(8192)
+        if not chunk:
+            break
+        body += chunk
+    assert len(body) == len(encoder)
+    message = BytesParser().parsebytes(f"Content-Type: {encoder.content_type}\r\n\r\n".encode() + body)
+    return message.get_payload()
+
+def test_multipart_encoder_streams_file():
+    payload = os.urandom(300 * 1024)
+    encoder = MultipartEncoder({"file": ("scope.bin", io.BytesIO(payload), "application/octet-stream")})
+    parts = _parse(encoder)
+    assert len(parts) == 1
+    assert parts[0].get_filename() == "scope.bin"
+    assert parts[0].get_content_type() == "application/octet-stream"
+    assert parts[0].get_payload(decode=True) == payload
+    assert encoder.bytes_read == len(encoder)
+
+def test_multipart_encoder_reset_rewinds_body():
+    encoder = MultipartEncoder({"file": ("test.txt", io.BytesIO(b"hello"), "text/plain")})
+    first = encoder.read()
+    encoder.reset()
+    assert encoder.read() == first
+
+def test_multipart_encoder_escapes_file_name():
+    name = 'log"\r\nX-Injected: 1\\.txt'
+    encoder = MultipartEncoder({"file": (name, io.BytesIO(b"hello"), "text/plain")})
+    [part] = _parse(encoder)
+    assert part.get_filename() == "log%22%0D%0AX-Injected: 1%5C.txt"
+    assert part["X-Injected"] is None
+    assert part.get_payload(decode=True) == b"hello"
+
+def test_upload_stats():
+    stats = UploadStats()
+    stats.record(1000, 0.5)
+    stats.record(1000, 0.5, ok=False)
+    assert stats.stats()["bytes_per_second"] == 2000
+    assert stats.stats()["failures"] == 1
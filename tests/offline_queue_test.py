@@ -0,0 +1,108 @@
+import os
+import pytest
+import serialmfg as serial
+from serialmfg.retry import RetryPolicy
+from serialmfg.testing import FakeTransport
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "test.txt")
+
+@pytest.fixture
+def server(server, monkeypatch):
+    # Requests fail until a test points base_url back at the server
+    monkeypatch.setattr(serial.config, "base_url", "http://127.0.0.1:9")
+    monkeypatch.setattr(serial.config, "retry_policy", RetryPolicy(max_retries=0))
+    yield server
+    serial.disable_offline_queue()
+
+def test_entries_are_journaled_and_replayed_in_order(server, tmp_path, monkeypatch):
+    server.api.add_component_instance("UNIT-1", "Board")
+    queue = serial.enable_offline_queue(str(tmp_path / "queue.db"), drain_interval=60)
+
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    assert entry.id.startswith("local-")
+    entry.add_text("Firmware", "1.2.3")
+    entry.add_number("Voltage", 3.3, usl=3.6)
+    entry.add_file("Log", TEST_FILE)
+    result = entry.submit(cycle_time=5, is_pass=True)
+    assert result["queued_offline"] is True
+    assert queue.stats()["pending"] == 5
+    assert queue.drain() == 0
+
+    monkeypatch.setattr(serial.config, "base_url", server.url)
+    assert queue.drain() == 5
+    stats = queue.stats()
+    assert stats["pending"] == 0
+    assert stats["offline"] is False
+    assert stats["replayed"] == 5
+
+    [created] = server.api.process_entries.values()
+    assert created["is_complete"] is True
+    assert created["cycle_time"] == 5
+    assert created["timestamp"] == result["timestamp"]
+    assert len(server.api.process_entry_data) == 3
+
+def test_permanent_replay_failures_are_dead_lettered(server, tmp_path, monkeypatch):
+    queue = serial.enable_offline_queue(str(tmp_path / "queue.db"), drain_interval=60)
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="MISSING")
+    entry.add_text("Firmware", "1.2.3")
+    entry.submit()
+
+    monkeypatch.setattr(serial.config, "base_url", server.url)
+    assert queue.drain() == 0
+    assert queue.stats()["pending"] == 0
+    assert [letter["kind"] for letter in queue.dead_letters()] == ["create", "data", "submit"]
+
+def test_queue_is_bounded(server, tmp_path):
+    queue = serial.enable_offline_queue(str(tmp_path / "queue.db"), max_bytes=64 * 1024, drain_interval=60)
+    entry = serial.ProcessEntries.create("process-1", component_instance_id="ci-1")
+    entry.add_text("Log", "x" * 128 * 1024)
+    with pytest.raises(serial.offline_queue.OfflineQueueFull):
+        entry.submit()
+
+def test_queue_survives_restart(server, tmp_path, monkeypatch):
+    path = str(tmp_path / "queue.db")
+    serial.enable_offline_queue(path, drain_interval=60)
+    serial.ProcessEntries.create("process-1", component_instance_id="ci-1").submit()
+    serial.disable_offline_queue()
+
+    queue = serial.enable_offline_queue(path, drain_interval=60)
+    assert queue.stats()["pending"] == 2
+    assert queue.is_offline()
+
+@pytest.fixture
+def transport(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", "test-key")
+    monkeypatch.setattr(serial.config, "base_url", FakeTransport.url)
+    monkeypatch.setattr(serial.config, "retry_policy", RetryPolicy(max_retries=0))
+    transport = FakeTransport()
+    serial.set_transport(transport)
+    transport.api.add_component_instance("UNIT-1", "Board")
+    yield transport
+    serial.set_transport(None)
+    serial.disable_offline_queue()
+
+def test_only_unprocessed_requests_are_journaled(transport, tmp_path):
+    queue = serial.enable_offline_queue(str(tmp_path / "queue.db"), drain_interval=60)
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    entry.add_text("Firmware", "1.2.3")
+    transport.fail_next(1, status=503, path=f"/processes/entries/{entry.id}")
+    result = entry.submit(cycle_time=5)
+    assert result["queued_offline"] is True
+    queue.drain()
+    assert queue.stats()["replayed"] == 2
+    assert transport.api.process_entries[entry.id]["cycle_time"] == 5
+    assert len(transport.api.process_entry_data) == 1
+
+@pytest.mark.parametrize("status", [500, 502, 504])
+def test_server_errors_are_not_journaled(transport, tmp_path, status):
+    queue = serial.enable_offline_queue(str(tmp_path / "queue.db"), drain_interval=60)
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    entry.add_text("Firmware", "1.2.3")
+    entry.add_number("Voltage", 3.3)
+    # One data point may have been applied, the other was turned away; neither half is journaled
+    transport.fail_next(1, status=status, path=f"/processes/entries/{entry.id}")
+    transport.fail_next(1, status=503, path=f"/processes/entries/{entry.id}")
+    with pytest.raises(serial.SerialAPIException):
+        entry.submit(cycle_time=5)
+    assert queue.stats()["pending"] == 0
+    assert not queue.is_offline()
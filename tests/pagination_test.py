@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import pytest
+import serialmfg as serial
+from serialmfg.api_client import APIClient
+from serialmfg.testing import FakeSerialAPI
+from serialmfg.utils.pagination import iter_pages
+
+class NoOffsetAPI(FakeSerialAPI):
+    """
+    Honours limit but ignores offset, so every page is the first one
+    """
+    def _list(self, records, params):
+        return super()._list(records, {key: value for key, value in params.items() if key != "offset"})
+
+class NoPagingAPI(FakeSerialAPI):
+    """
+    Ignores limit and offset and always returns every record
+    """
+    def _list(self, records, params):
+        return super()._list(records, {key: value for key, value in params.items() if key not in ("limit", "offset")})
+
+IDENTIFIERS = [f"SN-{i}" for i in range(25)] + ["OTHER-1"]
+
+@pytest.fixture
+def api(request):
+    """FakeSerialAPI, or the subclass a test passes through indirect parametrization"""
+    return getattr(request, "param", FakeSerialAPI)()
+
+@pytest.fixture
+def server(server):
+    for identifier in IDENTIFIERS:
+        server.api.add_component_instance(identifier, "Gadget" if identifier == "OTHER-1" else "Widget")
+    return server
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_list_pages_through_results(server, prefetch):
+    server.api.reset_request_log()
+    instances = serial.ComponentInstances.iter_list(page_size=10, prefetch=prefetch)
+    assert [instance.data["identifier"] for instance in instances] == IDENTIFIERS
+    assert server.api.request_count("GET", "/components/instances") == 3
+
+def test_iter_list_applies_filters_and_stops_early(server):
+    component_id = next(iter(server.api.components.values()))["id"]
+    server.api.reset_request_log()
+    instances = serial.ComponentInstances.iter_list({"component_id": component_id}, page_size=25)
+    assert len(list(instances)) == 25
+    # A full last page costs one extra, empty request
+    assert server.api.request_count("GET", "/components/instances") == 2
+    server.api.reset_request_log()
+    instances = serial.ComponentInstances.iter_list(page_size=5)
+    first = next(instances)
+    instances.close()
+    assert first.data["identifier"] == "SN-0"
+    assert server.api.request_count("GET", "/components/instances") <= 2
+
+def test_iter_pages_state_does_not_grow(server):
+    for i in range(475):
+        server.api.add_component_instance(f"BULK-{i}", "Widget")
+    pages = iter_pages(APIClient(), "/components/instances", page_size=10, prefetch=False)
+    sizes = []
+    for page in pages:
+        state = {name: value for name, value in pages.gi_frame.f_locals.items() if name not in ("page", "page_key")}
+        sizes.append(sum(sys.getsizeof(value) for value in state.values()))
+    assert len(sizes) == 51
+    assert len(set(sizes)) == 1
+
+def test_async_iter_list(server):
+    aio = pytest.importorskip("serialmfg.aio")
+    pytest.importorskip("aiohttp")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="SN-0")
+
+    async def run():
+        try:
+            return [e.id async for e in aio.ProcessEntries.iter_list({"process_id": "process-1"}, page_size=1)]
+        finally:
+            await aio.close()
+
+    assert asyncio.run(run()) == [entry.id]
+
+# NoPagingAPI returns every record, so its first page is only full, and paging
+# only continues, when the page size matches the number of records
+@pytest.mark.parametrize("api, page_size", [(NoOffsetAPI, 10), (NoPagingAPI, len(IDENTIFIERS))],
+                         indirect=["api"])
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_list_stops_when_server_ignores_offset(server, page_size, prefetch):
+    server.api.reset_request_log()
+    identifiers = [instance.data["identifier"]
+                   for instance in serial.ComponentInstances.iter_list(page_size=page_size, prefetch=prefetch)]
+    assert identifiers == IDENTIFIERS[:page_size]
+    assert server.api.request_count("GET", "/components/instances") <= 3
+
+@pytest.mark.parametrize("api", [NoOffsetAPI], indirect=True)
+def test_async_iter_list_stops_when_server_ignores_offset(server):
+    aio = pytest.importorskip("serialmfg.aio")
+    pytest.importorskip("aiohttp")
+
+    async def run():
+        try:
+            return [instance.data["identifier"] async for instance in aio.ComponentInstances.iter_list(page_size=10)]
+        finally:
+            await aio.close()
+
+    assert asyncio.run(run()) == IDENTIFIERS[:10]
@@ -0,0 +1,34 @@
+import serialmfg as serial
+from serialmfg.serial_resources.process_entry import ProcessEntry, ProcessEntryRecord
+
+def test_records_are_compact_and_read_only_until_used(server):
+    server.api.add_component_instance("SN-1", "Widget")
+    created = serial.ProcessEntries.create("process-1", component_instance_identifier="SN-1")
+    [record] = serial.ProcessEntries.list({"process_id": "process-1"})
+
+    assert isinstance(record, ProcessEntryRecord)
+    assert not hasattr(record, "__dict__")
+    assert (record.id, record.process_id, record.component_instance_id) == (created.id, "process-1", created.component_instance_id)
+    assert record["station_id"] is None
+    assert record._full is None
+    assert not hasattr(record, "add_txt")
+    assert getattr(record, "station", None) is None
+    assert record._full is None
+
+def test_adding_data_promotes_record(server):
+    server.api.add_component_instance("SN-1", "Widget")
+    serial.ProcessEntries.create("process-1", component_instance_identifier="SN-1")
+    record = next(serial.ProcessEntries.iter_list({"process_id": "process-1"}))
+    record.add_text("Firmware", "v1")
+    assert isinstance(record.promote(), ProcessEntry)
+    assert record.text_data_queue == [{"dataset_name": "Firmware", "value": "v1", "expected_value": None}]
+
+    record.submit(is_pass=True)
+    assert record.data["is_complete"] is True
+    assert len(server.api.process_entry_data) == 1
+
+def test_component_instance_records(server):
+    server.api.add_component_instance("SN-1", "Widget")
+    [record] = serial.ComponentInstances.list({"identifier": "SN-1"})
+    assert (record.identifier, record.data["status"]) == ("SN-1", "PLANNED")
+    assert record.created_links == []
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import pytest
+import serialmfg as serial
+from serialmfg.exceptions import SerialAPIException
+from serialmfg.testing import FakeTransport
+from serialmfg.utils.serialization import JSONArrayParser, StdlibSerializer, get_serializer
+
+ROWS = [{"id": f"entry-{i}", "cycle_time": i / 4, "is_pass": i % 2 == 0, "note": "ünïcode ✓ [1, 2]"}
+        for i in range(50)] + [7, -1.5e3, None, "x", [], {}]
+
+def _parse(body, chunk_size):
+    parser = JSONArrayParser()
+    items = []
+    for i in range(0, len(body), chunk_size):
+        items.extend(parser.feed(body[i:i + chunk_size]))
+    parser.close()
+    return items
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_incremental_parser(chunk_size):
+    body = json.dumps(ROWS, indent=1).encode("utf-8")
+    assert _parse(body, chunk_size) == ROWS
+    assert _parse(b" [ ] ", chunk_size) == []
+    assert _parse(b"[12345]", chunk_size) == [12345]
+
+@pytest.mark.parametrize("body", [b"[1, 2", b'{"a": 1}', b"[1 2]", b"[1,]", b"[1] x"])
+def test_incremental_parser_rejects_invalid(body):
+    with pytest.raises(ValueError):
+        _parse(body, 3)
+
+def test_incremental_parser_decodes_a_large_element_once():
+    row = {"id": "entry-1", "values": list(range(20000)), "note": 'a \\"quoted\\" note ' * 500}
+    body = json.dumps([row, [row], "x" * 50000, 1]).encode("utf-8")
+    parser = JSONArrayParser()
+    decoder, calls = parser._decoder, []
+    def raw_decode(text, position):
+        calls.append(position)
+        return decoder.raw_decode(text, position)
+    parser._decoder = type("CountingDecoder", (), {"raw_decode": staticmethod(raw_decode)})
+    items = []
+    for i in range(0, len(body), 64):
+        items.extend(parser.feed(body[i:i + 64]))
+    parser.close()
+    assert items == [row, [row], "x" * 50000, 1]
+    # One failed attempt when each element is first cut off, and one once the scan finds its end
+    assert len(calls) <= 10
+
+def test_set_serializer(monkeypatch):
+    monkeypatch.setattr(serial.config, "serializer", None)
+    serial.set_serializer("stdlib")
+    assert get_serializer() is StdlibSerializer
+    assert StdlibSerializer.dumps({"a": [1, 2]}) == b'{"a":[1,2]}'
+    with pytest.raises(ValueError):
+        serial.set_serializer("yaml")
+
+@pytest.fixture
+def transport(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", "test-key")
+    monkeypatch.setattr(serial.config, "base_url", FakeTransport.url)
+    monkeypatch.setattr(serial.config, "stream_chunk_size", 256)
+    transport = FakeTransport()
+    serial.set_transport(transport)
+    yield transport
+    serial.set_transport(None)
+
+@pytest.mark.parametrize("serializer", ["stdlib", "orjson"])
+def test_requests_use_the_serializer(transport, monkeypatch, serializer):
+    if serializer == "orjson":
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(serial.config, "serializer", serializer)
+    transport.api.add_component_instance("UNIT-1", "Board")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    entry.add_text("Note", "ünïcode ✓")
+    entry.submit(is_pass=True)
+    assert [point["value"] for point in transport.api.process_entry_data] == ["ünïcode ✓"]
+
+@pytest.mark.parametrize("serializer", ["stdlib", "orjson"])
+def test_non_finite_values_are_rejected(transport, monkeypatch, serializer):
+    if serializer == "orjson":
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(serial.config, "serializer", serializer)
+    assert get_serializer().dumps({1: [True, None]}) == b'{"1":[true,null]}'
+    transport.api.add_component_instance("UNIT-1", "Board")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="UNIT-1")
+    entry.add_number("Voltage", float("nan"))
+    with pytest.raises(serial.SerialAPIException, match="not JSON compliant"):
+        entry.submit()
+    assert transport.api.process_entry_data == []
+    with pytest.raises(ValueError, match="not JSON compliant"):
+        get_serializer().dumps({"values": [1.0, float("inf")]})
+
+def test_stream_list(transport):
+    for i in range(40):
+        transport.api.add_component_instance(f"UNIT-{i}", "Board")
+    records = serial.ComponentInstances.stream_list({})
+    first = next(records)
+    assert first.identifier == "UNIT-0"
+    assert [record.identifier for record in records] == [f"UNIT-{i}" for i in range(1, 40)]
+
+    stats = serial.get_metrics_registry().stats()["GET /components/instances"]
+    assert stats["bytes_received"] > 256
+
+def test_stream_list_errors(transport):
+    transport.fail_next(status=404, path="/processes/entries")
+    with pytest.raises(SerialAPIException) as error:
+        list(serial.ProcessEntries.stream_list())
+    assert error.value.status_code == 404
+
+def test_async_stream_list(server, monkeypatch):
+    aio = pytest.importorskip("serialmfg.aio")
+    pytest.importorskip("aiohttp")
+    monkeypatch.setattr(serial.config, "stream_chunk_size", 64)
+    for i in range(10):
+        server.api.add_component_instance(f"UNIT-{i}", "Board")
+
+    async def run():
+        records = [record async for record in aio.ComponentInstances.stream_list()]
+        await aio.close()
+        return records
+
+    records = asyncio.run(run())
+    assert [record.identifier for record in records] == [f"UNIT-{i}" for i in range(10)]
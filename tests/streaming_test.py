@@ -0,0 +1,66 @@
+import asyncio
+import os
+from concurrent.futures import wait
+import pytest
+import serialmfg as serial
+from serialmfg.exceptions import SerialAPIException
+
+def test_streamed_data_is_sent_before_submit(server):
+    server.api.add_component_instance("PARENT-1", "Harness")
+    server.api.add_component_instance("CHILD-1", "Connector")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1", stream=True)
+    for i in range(10):
+        entry.add_text("Firmware", f"v{i}")
+        entry.add_number("Voltage", 3.3, usl=3.6, lsl=3.0)
+    entry.add_file("Log", os.path.join(os.path.dirname(__file__), "test.txt"))
+    entry.add_link("Connector", "CHILD-1")
+
+    wait([future for _, _, future in entry._streamed])
+    assert len(server.api.process_entry_data) == 21
+    assert len(server.api.component_instance_links) == 1
+    assert server.api.request_count("PATCH") == 0
+
+    result = entry.submit(cycle_time=12)
+    assert result["is_complete"] is True
+    assert len(server.api.process_entry_data) == 21
+
+def test_data_queued_before_streaming_is_flushed(server, monkeypatch):
+    monkeypatch.setattr(serial.config, "stream_data", False)
+    server.api.add_component_instance("PARENT-1", "Harness")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1")
+    entry.add_text("Firmware", "v1")
+    assert entry._streamed == []
+    entry.start_streaming()
+    entry.add_text("Firmware", "v2")
+    assert len(entry._streamed) == 2
+    entry.submit()
+    assert len(server.api.process_entry_data) == 2
+
+def test_streamed_failures_are_raised_by_submit(server):
+    server.api.add_component_instance("PARENT-1", "Harness")
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1", stream=True)
+    entry.add_text("Firmware", "v1")
+    entry.add_link("Connector", "MISSING-1")
+    with pytest.raises(SerialAPIException):
+        entry.submit()
+    assert len(server.api.process_entry_data) == 1
+    assert server.api.request_count("PATCH") == 0
+
+def test_async_streaming(server):
+    aio = pytest.importorskip("serialmfg.aio")
+    pytest.importorskip("aiohttp")
+    server.api.add_component_instance("PARENT-1", "Harness")
+
+    async def run():
+        entry = await aio.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1", stream=True)
+        for i in range(10):
+            entry.add_text("Firmware", f"v{i}")
+        await asyncio.gather(*entry._streamed)
+        sent_before_submit = len(server.api.process_entry_data)
+        result = await entry.submit()
+        await aio.close()
+        return sent_before_submit, result
+
+    sent_before_submit, result = asyncio.run(run())
+    assert sent_before_submit == 10
+    assert result["is_complete"] is True
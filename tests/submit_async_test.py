@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import threading
+import pytest
+import serialmfg as serial
+from serialmfg.testing import FakeSerialAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class GatedAPI(FakeSerialAPI):
+    """Holds data point requests until the gate is opened"""
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.waiting = threading.Event()
+
+    def handle(self, method, path, params=None, body=None):
+        if method == "PUT" and path.startswith("/processes/entries/"):
+            self.waiting.set()
+            self.gate.wait(10)
+        return super().handle(method, path, params, body)
+
+@pytest.fixture
+def api():
+    return GatedAPI()
+
+@pytest.fixture
+def server(server):
+    server.api.add_component_instance("PARENT-1", "Harness")
+    yield server
+    server.api.gate.set()
+    serial.drain_submissions(5)
+
+def test_submit_async(server):
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1")
+    for i in range(10):
+        entry.add_text("Firmware", f"v{i}")
+    handle = entry.submit_async(cycle_time=12)
+    assert handle.status in ("pending", "running")
+    assert not handle.done()
+
+    server.api.gate.set()
+    result = handle.result(timeout=10)
+    assert result["is_complete"] is True
+    assert handle.status == "done"
+    assert handle.progress() == (10, 10)
+    assert serial.pending_submissions() == []
+
+def test_submit_async_counts_streamed_data(server):
+    server.api.gate.set()
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1", stream=True)
+    for i in range(5):
+        entry.add_number("Voltage", 3.3)
+    handle = entry.submit_async()
+    handle.result(timeout=10)
+    assert handle.progress() == (5, 5)
+    assert len(server.api.process_entry_data) == 5
+
+def test_cancel_running_submission(server):
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1")
+    for i in range(100):
+        entry.add_text("Firmware", f"v{i}")
+    handle = entry.submit_async()
+    assert server.api.waiting.wait(10)
+    assert handle.cancel() is True
+    server.api.gate.set()
+
+    with pytest.raises(serial.SubmitCancelled):
+        handle.result(timeout=10)
+    assert handle.status == "cancelled"
+    assert len(server.api.process_entry_data) < 100
+    assert server.api.request_count("PATCH") == 0
+    assert handle.cancel() is False
+
+def test_drain_cancels_submissions_after_timeout(server):
+    entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1")
+    entry.add_text("Firmware", "v1")
+    handle = entry.submit_async()
+    assert serial.drain_submissions(timeout=0.2) == 1
+    server.api.gate.set()
+    with pytest.raises(serial.SubmitCancelled):
+        handle.result(timeout=10)
+    assert serial.drain_submissions(timeout=1) == 0
+
+EXIT_SCRIPT = """
+import atexit, sys, time
+from serialmfg.testing import FakeSerialAPI, MockSerialServer
+
+class SlowAPI(FakeSerialAPI):
+    def handle(self, method, path, params=None, body=None):
+        if method == "PUT" and path.startswith("/processes/entries/"):
+            time.sleep(float(sys.argv[1]))
+        return super().handle(method, path, params, body)
+
+api = SlowAPI()
+server = MockSerialServer(api).__enter__()
+# Registered before serialmfg is imported, so it runs after the drain
+atexit.register(lambda: print("completed", api.request_count("PATCH")))
+
+import serialmfg as serial
+serial.config.api_key = "test-key"
+serial.config.base_url = server.url
+serial.config.submit_drain_timeout = float(sys.argv[2])
+api.add_component_instance("PARENT-1", "Harness")
+entry = serial.ProcessEntries.create("process-1", component_instance_identifier="PARENT-1")
+entry.add_text("Firmware", "v1")
+entry.submit_async()
+"""
+
+@pytest.mark.parametrize("delay, timeout, completed", [(0, 10, 1), (1, 0.2, 0)])
+def test_submissions_are_drained_at_exit(delay, timeout, completed):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-c", EXIT_SCRIPT, str(delay), str(timeout)],
+                            capture_output=True, text=True, env=env, check=True, timeout=30)
+    assert f"completed {completed}" in result.stdout
+    assert ("Cancelled 1 process entry submissions" in result.stdout) == (not completed)
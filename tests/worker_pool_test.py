@@ -0,0 +1,54 @@
+import threading
+import pytest
+import serialmfg as serial
+from serialmfg.api_client import APIClient
+from serialmfg.serial_resources.dataset import Datasets
+from serialmfg.serial_resources.process_entry import ProcessEntry
+from serialmfg.worker_pool import WorkerPool
+
+@pytest.fixture(autouse=True)
+def offline_config(monkeypatch):
+    monkeypatch.setattr(serial.config, "api_key", serial.config.api_key or "test-key")
+    monkeypatch.setattr(serial.config, "base_url", serial.config.base_url or "http://localhost")
+
+def test_worker_pool_stats():
+    pool = WorkerPool(2)
+    futures = [pool.submit(lambda x: x * 2, i) for i in range(5)]
+    assert [future.result() for future in futures] == [0, 2, 4, 6, 8]
+    stats = pool.stats()
+    assert stats["max_workers"] == 2
+    assert stats["completed"] == 5
+    assert stats["queue_depth"] == 0
+    assert stats["active_workers"] == 0
+    assert stats["peak_active_workers"] <= 2
+    pool.shutdown()
+
+def test_submit_reuses_shared_pool(monkeypatch):
+    requests_made = []
+    lock = threading.Lock()
+
+    def fake_request(self, endpoint, method, params=None, data=None, files=None):
+        with lock:
+            requests_made.append((method, endpoint))
+        if endpoint == "/datasets" and method == "GET":
+            return [{"name": params["name"], "id": f"dataset-{params['name']}"}]
+        if method == "PATCH":
+            return {**data, "id": "entry-1"}
+        return {}
+
+    monkeypatch.setattr(APIClient, "make_api_request", fake_request)
+    Datasets.invalidate_cache()
+    entry = ProcessEntry({"process_id": "p1", "id": "entry-1", "unique_identifier_id": "ci-1"})
+    for i in range(50):
+        entry.add_text("Serial", f"value-{i}")
+        entry.add_number("Torque", i)
+        entry.add_boolean("Passed", True, True)
+    threads_before = threading.active_count()
+    entry.submit(cycle_time=10)
+
+    assert entry.data["cycle_time"] == 10
+    assert requests_made.count(("PUT", "/processes/entries/entry-1")) == 150
+    assert requests_made.count(("GET", "/datasets")) == 3
+    assert threading.active_count() - threads_before <= serial.config.max_workers
+    assert serial.get_worker_pool().stats()["queue_depth"] == 0
+    Datasets.invalidate_cache()